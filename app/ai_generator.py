@@ -1,59 +1,335 @@
 import asyncio
-import csv
+import atexit
+import contextlib
+import contextvars
+import functools
+import json
 import os
-from pathlib import Path
+import queue
+import re
+import threading
+import traceback
+from collections.abc import AsyncIterator, Awaitable, Callable, Coroutine, Iterator
+from typing import TYPE_CHECKING, Any, TypeVar
 
 # CRITICAL: Unset CLAUDECODE env var to allow this app to use Claude Code
-# This must happen before importing claude_agent_sdk
+# This must happen before claude_agent_sdk starts the CLI
 _ORIGINAL_CLAUDECODE = os.environ.pop("CLAUDECODE", None)
 
-from claude_agent_sdk import query, AssistantMessage, TextBlock, ClaudeAgentOptions
+from app import circuit_breaker, event_loop, jobs, resilience, scheduler, telemetry, validators
+from app.backends import ClaudeCLIBackend, GenerationBackend, backend_from_env
+from app.canonical_inputs import canonicalise_inputs
+from app.claude_cli import locate_claude_cli
+from app.lesson_plan_parser import LessonPlanParser
+from app.outline_compaction import compact_course_outline
+from app.response_cache import ResponseCache, fingerprint, make_key
+from app.session_pool import SessionPool
+from app.single_flight import SingleFlight
+from app.skills_catalogue import SkillsCatalogue, load_skills_catalogue
 
-_SKILLS_CSV = Path(__file__).resolve().parent.parent / ".claude" / "skills" / "generate_topics" / "skills_description.csv"
+if TYPE_CHECKING:
+    from claude_agent_sdk import ClaudeSDKClient
 
+T = TypeVar("T")
 
-def _find_claude_cli() -> str | None:
-    """Find Claude Code CLI executable path.
 
-    Note: ``AppData/Local/AnthropicClaude/claude.exe`` is the Claude DESKTOP
-    app, not the CLI — driving it via the Agent SDK hangs on the initialize
-    handshake, so we deliberately do NOT look there.
+@functools.cache
+def get_claude_cli_path() -> str | None:
+    """Return the Claude CLI path, discovering it (or reading the disk cache) on first use."""
+    return locate_claude_cli()
+
+
+# Options that change what the model returns; part of every response cache key.
+_MODEL_OPTIONS: dict = {}
+
+
+def _new_claude_client() -> "ClaudeSDKClient":
+    """Create an unconnected Claude SDK client using the discovered CLI path.
+
+    The SDK is imported here rather than at module level: it accounts for
+    most of this module's import time and is not needed until the first
+    generation.
+    """
+    from claude_agent_sdk import ClaudeAgentOptions, ClaudeSDKClient
+
+    options = ClaudeAgentOptions(**_MODEL_OPTIONS, include_partial_messages=True)
+    cli_path = get_claude_cli_path()
+    if cli_path:
+        options.cli_path = cli_path
+    return ClaudeSDKClient(options=options)
+
+
+# Model calls allowed at once across all sessions; sizes both the scheduler and the pool.
+_MAX_IN_FLIGHT = int(os.environ.get("CP_MAX_IN_FLIGHT", "") or scheduler.DEFAULT_MAX_IN_FLIGHT)
+
+# Warm CLI sessions shared by every generate_* function: one per admitted
+# call, all kept connected ahead of demand.
+_SESSION_POOL = SessionPool(_new_claude_client, max_size=_MAX_IN_FLIGHT, warm_spares=_MAX_IN_FLIGHT)
+
+# Backend every prompt is sent to; CP_GENERATOR_BACKEND=fixture selects the
+# offline stand-in (see app.backends).
+_BACKEND: GenerationBackend = backend_from_env() or ClaudeCLIBackend(_SESSION_POOL)
+
+
+def get_backend() -> GenerationBackend:
+    """Return the backend prompts are currently sent to."""
+    return _BACKEND
+
+
+def set_backend(backend: GenerationBackend) -> GenerationBackend:
+    """Send all further prompts to *backend*; returns the previous backend."""
+    global _BACKEND
+    previous, _BACKEND = _BACKEND, backend
+    # The new backend starts with a clean bill of health.
+    event_loop.get_loop().call_soon_threadsafe(_BREAKER.reset)
+    return previous
+
+
+async def _aclose_backends() -> None:
+    await _BREAKER.aclose()
+    await _BACKEND.aclose()
+    if getattr(_BACKEND, "pool", None) is not _SESSION_POOL:
+        await _SESSION_POOL.aclose()
+
+
+@atexit.register
+def _shutdown_generation() -> None:
+    """Stop background jobs, close the backend and pooled CLI sessions, then stop the shared event loop."""
+    _JOBS.shutdown()
+    if event_loop.is_running():
+        try:
+            event_loop.run(_aclose_backends(), timeout=5)
+        except Exception:
+            pass
+    event_loop.shutdown()
+
+# On-disk cache of generated responses (settings/config/response_cache.db).
+_RESPONSE_CACHE = ResponseCache()
+# Build cache keys from canonical course titles/topics (app.canonical_inputs);
+# CP_NORMALISE_INPUTS=0 keys on the exact text instead.
+_NORMALISE_INPUTS = os.environ.get("CP_NORMALISE_INPUTS", "1") != "0"
+
+
+def get_cache_stats() -> dict[str, int]:
+    """Return response cache hit/miss counters and on-disk totals."""
+    return _RESPONSE_CACHE.stats()
+
+
+# Per-call latency / outcome records behind the "Performance" page
+# (settings/config/telemetry.db).
+_TELEMETRY = telemetry.TelemetryStore()
+
+# Concurrent identical requests (same cache key) share one model call.
+_IN_FLIGHT = SingleFlight()
+
+
+def get_single_flight_stats() -> dict[str, int]:
+    """Return how many calls ran and how many joined an identical in-flight call."""
+    return _IN_FLIGHT.stats()
+
+
+# Name of the generate_* function whose prompt _agenerate is serving.
+_CURRENT_GENERATOR: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "_CURRENT_GENERATOR", default="_generate"
+)
+
+
+# Retries / deadlines / hedging for every model call (see app.resilience).
+# Hedging sends duplicate prompts, so it is opt-in: CP_HEDGE_REQUESTS=1 or
+# the toggle on the Performance page.
+_RETRY_POLICY = resilience.RetryPolicy(hedge=os.environ.get("CP_HEDGE_REQUESTS", "") == "1")
+
+
+def get_retry_policy() -> resilience.RetryPolicy:
+    """Return the live retry policy; changes to it apply to the next call."""
+    return _RETRY_POLICY
+
+
+async def _probe_backend() -> None:
+    probe = getattr(_BACKEND, "probe", None)
+    if probe is not None:
+        # A probe starts a CLI session, so it takes a scheduler slot like a call.
+        async with _SCHEDULER.slot("health-check"):
+            await probe()
+
+
+def _is_backend_failure(error: Exception) -> bool:
+    # An empty reply still came from a working backend.
+    return resilience.classify(error) != resilience.EMPTY
+
+
+# Fails model calls fast while the backend is down (see app.circuit_breaker):
+# CP_BREAKER_FAILURES consecutive failed calls open it (0 disables it), and
+# the backend is then re-checked every CP_HEALTH_PROBE_INTERVAL seconds.
+_BREAKER = circuit_breaker.CircuitBreaker(
+    _probe_backend,
+    failure_threshold=int(
+        os.environ.get("CP_BREAKER_FAILURES", "") or circuit_breaker.DEFAULT_FAILURE_THRESHOLD
+    ),
+    probe_interval=float(
+        os.environ.get("CP_HEALTH_PROBE_INTERVAL", "") or circuit_breaker.DEFAULT_PROBE_INTERVAL
+    ),
+)
+
+
+def get_backend_health() -> dict:
+    """Return the backend's circuit state ("closed", "open" or "half-open"), last error and counters."""
+    return _BREAKER.snapshot()
+
+
+def check_backend_health() -> dict:
+    """Probe an unavailable backend now rather than at its next scheduled check."""
+    event_loop.run(_BREAKER.probe_now())
+    return _BREAKER.snapshot()
+
+
+# Process-wide admission control shared by every Streamlit session (see
+# app.scheduler); CP_MAX_IN_FLIGHT caps concurrent model calls.
+INTERACTIVE, BULK = scheduler.INTERACTIVE, scheduler.BULK
+_SCHEDULER = scheduler.GenerationScheduler(_MAX_IN_FLIGHT)
+_REQUEST_OWNER: contextvars.ContextVar[str] = contextvars.ContextVar("_REQUEST_OWNER", default="default")
+_REQUEST_PRIORITY: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "_REQUEST_PRIORITY", default=INTERACTIVE
+)
+# Cancels this context's model calls (e.g. a prefetch made stale by new course details).
+_CANCEL_TOKEN: contextvars.ContextVar[event_loop.CancelToken | None] = contextvars.ContextVar(
+    "_CANCEL_TOKEN", default=None
+)
+# Time limit in seconds for each model call, queue wait included: section
+# pages, jobs, the pipeline and prefetches all get CP_GENERATION_TIME_LIMIT
+# (0 for none); generation_timeout() sets another for a block.
+DEFAULT_GENERATION_TIME_LIMIT = 600.0
+_TIME_LIMIT: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "_TIME_LIMIT",
+    default=float(os.environ.get("CP_GENERATION_TIME_LIMIT", "") or DEFAULT_GENERATION_TIME_LIMIT) or None,
+)
+# Receives QueueStatus updates while a GenerationStream waits for a slot.
+_QUEUE_SINK: contextvars.ContextVar[Callable[[scheduler.QueueStatus], None] | None] = (
+    contextvars.ContextVar("_QUEUE_SINK", default=None)
+)
+
+
+def set_request_owner(owner: str) -> None:
+    """Attribute this thread's generations to *owner* (e.g. a Streamlit session id) for fair queuing."""
+    _REQUEST_OWNER.set(owner)
+
+
+@contextlib.contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Queue generations made inside the block as INTERACTIVE or BULK."""
+    token = _REQUEST_PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _REQUEST_PRIORITY.reset(token)
+
+
+@contextlib.contextmanager
+def generation_timeout(seconds: float) -> Iterator[None]:
+    """Abandon any model call made inside the block that takes longer than *seconds*,
+    queue wait and retries included; its CLI session is stopped and the call
+    fails with :class:`resilience.DeadlineExceeded`."""
+    token = _TIME_LIMIT.set(seconds)
+    try:
+        yield
+    finally:
+        _TIME_LIMIT.reset(token)
+
+
+def in_request_context(
+    fn: Callable[..., str],
+    *args,
+    priority: int | None = None,
+    cancel: event_loop.CancelToken | None = None,
+    **kwargs,
+) -> Callable[[], str]:
+    """Bind ``fn(*args, **kwargs)`` to the caller's owner/priority for running on a worker thread.
+
+    Worker threads do not inherit context variables; the returned callable
+    carries a copy of the caller's (optionally with *priority* overridden).
+    Cancelling *cancel* stops the model calls it makes.
     """
-    home = Path(os.path.expanduser("~"))
-
-    # Pick the highest-numbered installed CLI version under the native installer dir.
-    native_dir = home / "AppData" / "Roaming" / "Claude" / "claude-code"
-    if native_dir.is_dir():
-        versions = []
-        for child in native_dir.iterdir():
-            exe = child / "claude.exe"
-            if exe.exists():
-                parts = child.name.split(".")
-                try:
-                    key = tuple(int(p) for p in parts)
-                except ValueError:
-                    key = (0,)
-                versions.append((key, exe))
-        if versions:
-            versions.sort()
-            return str(versions[-1][1])
-
-    # npm global install fallback
-    npm_cmd = home / "AppData" / "Roaming" / "npm" / "claude.cmd"
-    if npm_cmd.exists():
-        return str(npm_cmd)
-
-    # PATH fallback
-    import shutil
-    claude_in_path = shutil.which("claude")
-    if claude_in_path:
-        return claude_in_path
-
-    return None
-
-
-# Find Claude CLI path on module load
-_CLAUDE_CLI_PATH = _find_claude_cli()
+    context = contextvars.copy_context()
+
+    def run() -> str:
+        if priority is not None:
+            _REQUEST_PRIORITY.set(priority)
+        if cancel is not None:
+            _CANCEL_TOKEN.set(cancel)
+        return fn(*args, **kwargs)
+
+    return lambda: context.run(run)
+
+
+def get_queue_status() -> dict:
+    """Return the scheduler's current load (slots in use, waiting requests per owner)."""
+    async def snapshot() -> dict:
+        return _SCHEDULER.snapshot()
+    return event_loop.run(snapshot())
+
+
+def set_max_in_flight(max_in_flight: int) -> None:
+    """Change how many model calls may run at once across all sessions."""
+    async def apply() -> None:
+        _SCHEDULER.set_max_in_flight(max_in_flight)
+        await _SESSION_POOL.resize(max_in_flight)
+    event_loop.submit(apply())
+
+
+def _track_generator(fn: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+    """Attribute the telemetry of every _agenerate call made by the coroutine
+    function *fn* to its ``generate_*`` name."""
+    name = fn.__name__.removeprefix("a")
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        token = _CURRENT_GENERATOR.set(name)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            _CURRENT_GENERATOR.reset(token)
+    return wrapper
+
+
+def _record_call(record: telemetry.CallRecord) -> None:
+    try:
+        _TELEMETRY.record(record)
+    except Exception:
+        pass  # telemetry must never break generation
+
+
+def get_performance_summary(since: float = 0.0) -> list[dict]:
+    """Return per-generator call counts and latency percentiles."""
+    return _TELEMETRY.summary(since)
+
+
+def get_recent_calls(limit: int = 100, errors_only: bool = False) -> list[dict]:
+    """Return the newest recorded generation calls, newest first."""
+    return _TELEMETRY.recent(limit, errors_only)
+
+
+def clear_telemetry() -> None:
+    _TELEMETRY.clear()
+
+
+# Receives text deltas from _agenerate while a GenerationStream is running.
+_STREAM_SINK: contextvars.ContextVar[Callable[[str], None] | None] = contextvars.ContextVar(
+    "_STREAM_SINK", default=None
+)
+
+
+def get_skills_catalogue() -> SkillsCatalogue:
+    """Return the CASL skills catalogue, re-read only when the CSV changes."""
+    return load_skills_catalogue()
+
+
+def rank_skills_for_course(course_title: str, limit: int = 10) -> list[tuple[str, float]]:
+    """Return up to *limit* (skill name, relevance score) pairs for a course title, best first.
+
+    Ranking is local (BM25 over skill names and descriptions) and takes a
+    few milliseconds; skills sharing no word with the title are omitted.
+    """
+    return get_skills_catalogue().rank(course_title, limit)
 
 
 def load_skills_data() -> tuple[list[str], dict[str, str]]:
@@ -62,19 +338,8 @@ def load_skills_data() -> tuple[list[str], dict[str, str]]:
     Returns (names_list, descriptions_dict) where descriptions_dict maps
     skill name -> description.
     """
-    names: list[str] = []
-    descriptions: dict[str, str] = {}
-    with open(_SKILLS_CSV, encoding="utf-8", errors="replace") as f:
-        reader = csv.reader(f)
-        next(reader)  # skip header row 1 (title)
-        next(reader)  # skip header row 2 (S/N, Skill, Skills Description)
-        for row in reader:
-            if len(row) >= 3 and row[1].strip():
-                name = row[1].strip()
-                desc = row[2].strip()
-                names.append(name)
-                descriptions[name] = desc
-    return names, descriptions
+    catalogue = get_skills_catalogue()
+    return list(catalogue.names), dict(zip(catalogue.names, catalogue.descriptions))
 
 ABOUT_COURSE_PROMPT_TEMPLATE = """\
 You are an expert course description writer for professional training and \
@@ -136,59 +401,184 @@ skills for making informed decisions that drive organisational success.
 Respond with ONLY the paragraph text, nothing else."""
 
 
-async def _generate_async(prompt: str) -> str:
-    """Async function to generate content using Claude Agent SDK."""
-    result_text = ""
+_TEMPLATE_NAMES: dict[str, str] = {}
+
 
-    # Configure options with CLI path if found
-    options = None
-    if _CLAUDE_CLI_PATH:
-        options = ClaudeAgentOptions(cli_path=_CLAUDE_CLI_PATH)
+def _template_name(template: str) -> str:
+    """Return the module constant name of a built-in *template*, or ``"custom"``."""
+    if not _TEMPLATE_NAMES:
+        _TEMPLATE_NAMES.update(
+            (value, name) for name, value in globals().items()
+            if name.endswith("_TEMPLATE") and isinstance(value, str)
+        )
+    return _TEMPLATE_NAMES.get(template, "custom")
 
-    # Iterate through messages from Claude Code
-    async for message in query(prompt=prompt, options=options):
-        # Extract text from AssistantMessage blocks
-        if isinstance(message, AssistantMessage):
-            for block in message.content:
-                if isinstance(block, TextBlock):
-                    result_text += block.text
 
+async def _generate_async(
+    prompt: str,
+    on_text: Callable[[str], None] | None = None,
+    record: telemetry.CallRecord | None = None,
+) -> str:
+    """Async function to generate content on the active backend (warm Claude CLI sessions by default)."""
+    record = record or telemetry.CallRecord(_CURRENT_GENERATOR.get(), "custom", len(prompt))
+    token = telemetry.current_call.set(record)
+
+    def forward(text: str) -> None:
+        record.mark_first_token()
+        if on_text:
+            on_text(text)
+
+    try:
+        result_text = await _BACKEND.generate(prompt, forward, record.template)
+    finally:
+        telemetry.current_call.reset(token)
+    if not result_text or not result_text.strip():
+        raise resilience.EmptyResponseError("No text was generated. Please try again.")
     return result_text.strip()
 
 
-def _generate(prompt_template: str, **format_kwargs: str) -> str:
+def _hedge_slot(owner: str, priority: int) -> Callable[[], None] | None:
+    """A scheduler slot for a hedged attempt, which runs its own CLI session;
+    None (no hedge) unless one is free with nobody waiting for it."""
+    ticket = _SCHEDULER.try_acquire(owner, priority)
+    return None if ticket is None else functools.partial(_SCHEDULER.release, ticket)
+
+
+async def _generate_resilient(
+    prompt: str,
+    on_text: Callable[[str], None] | None,
+    record: telemetry.CallRecord,
+    hedge_after: float | None = None,
+    owner: str = "default",
+    priority: int = INTERACTIVE,
+    on_status: Callable[[scheduler.QueueStatus], None] | None = None,
+    time_limit: float | None = None,
+    key: str | None = None,
+) -> str:
+    """Pass the circuit breaker, take a scheduler slot, then run
+    _generate_async with retries, backoff, a deadline and optional hedging,
+    all within *time_limit* seconds.  *key* lets the queued call be promoted."""
+    stats = resilience.AttemptStats()
+    try:
+        async with asyncio.timeout(time_limit) as limit:
+            async with _BREAKER.guard(_is_backend_failure), _SCHEDULER.slot(owner, priority, on_status, key):
+                return await resilience.run_with_retries(
+                    lambda forward: _generate_async(prompt, forward, record),
+                    _RETRY_POLICY,
+                    on_text,
+                    hedge_after,
+                    stats,
+                    lambda: _hedge_slot(owner, priority),
+                )
+    except TimeoutError:
+        if limit.expired():
+            raise resilience.DeadlineExceeded(f"No response within the {time_limit:g}s time limit") from None
+        raise
+    finally:
+        record.attempts, record.hedged = stats.attempts, stats.hedged
+
+
+async def _agenerate(
+    prompt_template: str,
+    bypass_cache: bool = False,
+    key_kwargs: dict[str, str] | None = None,
+    cacheable: Callable[[str], bool] | None = None,
+    **format_kwargs: str,
+) -> str:
     """Generate content using Claude Agent SDK (Claude Code subscription only - NO API key needed).
 
     This function uses your local Claude Code CLI and your Claude Code subscription.
     NO API key required!
+
+    Responses are cached on disk keyed on the rendered prompt (with course
+    titles and topics in canonical form), template and model options; a
+    caller that renders titles/topics into another argument passes
+    *key_kwargs*, the format arguments to key on instead.  *bypass_cache* skips the lookup (e.g. for "Regenerate")
+    but still stores the fresh response, unless *cacheable* (if given)
+    returns False for it.  Concurrent identical requests are
+    coalesced into one model call.  Every call, cached or not, is recorded in
+    the telemetry store.  Awaited from any event loop, the call itself runs
+    on the shared loop, where the session pool and scheduler live.
     """
+    if not event_loop.in_loop_thread():
+        return await asyncio.wrap_future(
+            event_loop.submit(_agenerate(prompt_template, bypass_cache, key_kwargs, cacheable, **format_kwargs))
+        )
     prompt = prompt_template.format(**format_kwargs)
+    sink = _STREAM_SINK.get()
+    record = telemetry.CallRecord(
+        generator=_CURRENT_GENERATOR.get(),
+        template=_template_name(prompt_template),
+        prompt_chars=len(prompt),
+    )
+    # Key on the prompt rendered from canonical titles/topics, so cosmetic
+    # variants of the same course share one cached response.
+    key_prompt = prompt
+    if _NORMALISE_INPUTS:
+        key_prompt = prompt_template.format(**(key_kwargs or canonicalise_inputs(format_kwargs)))
+    cache_key = make_key(key_prompt, prompt_template, _MODEL_OPTIONS)
+    source = fingerprint(prompt)
+    # SQLite reads and writes run off the loop thread so they never stall other calls.
+    if not bypass_cache:
+        entry = await asyncio.to_thread(_RESPONSE_CACHE.get_entry, cache_key)
+        if entry is not None:
+            cached, cached_source = entry
+            record.cache_hit, record.attempts = True, 0
+            record.normalised = bool(cached_source) and cached_source != source
+            await asyncio.to_thread(_record_call, record.finish(cached))
+            if sink:
+                sink(cached)
+            return cached
+
+    hedge_after = None
+    if _RETRY_POLICY.hedge:
+        # Hedge only once this generator has a trustworthy p95 latency.
+        hedge_after = await asyncio.to_thread(
+            _TELEMETRY.latency_percentile, record.generator, 95, _RETRY_POLICY.hedge_min_samples
+        )
 
     try:
-        # CRITICAL FIX: Windows requires ProactorEventLoop for subprocess support
-        if os.name == 'nt':  # Windows
-            asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-
-        # Run the async query function in a synchronous context
-        result_text = asyncio.run(_generate_async(prompt))
-
-        if not result_text or not result_text.strip():
-            raise RuntimeError("No text was generated. Please try again.")
-
-        return result_text.strip()
-
+        # Identical requests already in flight share that call instead; a
+        # more urgent follower raises the shared call's queue priority to its own.
+        owner, priority = _REQUEST_OWNER.get(), _REQUEST_PRIORITY.get()
+        result_text, shared = await _IN_FLIGHT.run(
+            cache_key,
+            lambda publish: _generate_resilient(
+                prompt, publish, record, hedge_after,
+                owner=owner, priority=priority,
+                on_status=_QUEUE_SINK.get(), time_limit=_TIME_LIMIT.get(), key=cache_key,
+            ),
+            sink,
+            on_follow=lambda: _SCHEDULER.promote(cache_key, owner, priority),
+        )
+        if shared:
+            record.coalesced, record.attempts = True, 0
+        elif cacheable is None or cacheable(result_text):
+            await asyncio.to_thread(_RESPONSE_CACHE.put, cache_key, prompt_template, result_text, source)
+        await asyncio.to_thread(_record_call, record.finish(result_text))
+        return result_text
+
+    except asyncio.CancelledError:
+        record.finish()
+        record.outcome = "cancelled"
+        # Awaiting here would be cancelled too; hand the write to a worker thread.
+        asyncio.get_running_loop().run_in_executor(None, _record_call, record)
+        raise
+    except resilience.DeadlineExceeded as e:
+        # Out of time, not a broken CLI: keep the timeout for the caller.
+        await asyncio.to_thread(_record_call, record.finish(error=str(e)))
+        raise
+    except circuit_breaker.BackendUnavailable as e:
+        # Never reached the backend: a one-line record instead of a traceback.
+        record.finish()
+        record.outcome, record.error, record.attempts = "unavailable", str(e), 0
+        await asyncio.to_thread(_record_call, record)
+        raise
     except Exception as e:
-        import traceback
         error_msg = str(e)
-        full_trace = traceback.format_exc()
-
-        # Log to file for debugging
-        with open("ai_generator_error.log", "a") as f:
-            f.write(f"\n\n=== Error at {os.environ.get('DATE', 'unknown')} ===\n")
-            f.write(f"CLAUDECODE env var: {os.environ.get('CLAUDECODE', 'NOT SET')}\n")
-            f.write(f"CLI Path: {_CLAUDE_CLI_PATH}\n")
-            f.write(f"Error: {error_msg}\n")
-            f.write(f"Full trace:\n{full_trace}\n")
+        await asyncio.to_thread(_record_call, record.finish(
+            error=f"CLI Path: {get_claude_cli_path()}\n{traceback.format_exc()}"
+        ))
 
         if "claude: command not found" in error_msg.lower() or "clinotfounderror" in error_msg.lower():
             raise RuntimeError(
@@ -202,7 +592,7 @@ def _generate(prompt_template: str, **format_kwargs: str) -> str:
             )
         raise RuntimeError(
             f"Failed to generate content using Claude Code subscription: {error_msg}\n\n"
-            "Check ai_generator_error.log for details.\n\n"
+            "See the Performance page for the full error.\n\n"
             "Make sure:\n"
             "- Claude Code CLI is installed and in your PATH\n"
             "- You have an active Claude Code subscription\n"
@@ -210,10 +600,233 @@ def _generate(prompt_template: str, **format_kwargs: str) -> str:
         )
 
 
-def generate_about_course(course_title: str, course_topics: str, prompt_template: str | None = None) -> str:
+def _run_sync(
+    coro: Coroutine[Any, Any, T],
+    events: queue.SimpleQueue | None = None,
+    on_event: Callable[..., None] | None = None,
+) -> T:
+    """Run *coro* on the shared loop for a synchronous caller and block for its result.
+
+    The caller's cancel token (see :data:`_CANCEL_TOKEN`) cancels it.  Argument
+    tuples that *coro* puts on *events* are passed to *on_event* on the
+    calling thread while it runs.
+    """
+    token = _CANCEL_TOKEN.get()
+    if events is None:
+        return event_loop.run(coro, token=token)
+    future = event_loop.submit(coro)
+    future.add_done_callback(lambda _: events.put(_STREAM_DONE))
+    if token is not None:
+        token.track(future)
+    try:
+        while (args := events.get()) is not _STREAM_DONE:
+            on_event(*args)
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+    finally:
+        if token is not None:
+            token.untrack(future)
+
+
+def _sync(agenerator: Callable[..., Coroutine[Any, Any, T]]) -> Callable[..., T]:
+    """Blocking form of the coroutine function ``agenerate_*``, named ``generate_*``.
+
+    It runs on the shared loop under the caller's cancel token; an
+    ``on_result`` callback is invoked on the calling thread, so it may update
+    the Streamlit UI.
+    """
+    @functools.wraps(agenerator)
+    def generate(*args, **kwargs):
+        on_result = kwargs.get("on_result")
+        if on_result is None:
+            return _run_sync(agenerator(*args, **kwargs))
+        events: queue.SimpleQueue = queue.SimpleQueue()
+        kwargs["on_result"] = lambda *result: events.put(result)
+        return _run_sync(agenerator(*args, **kwargs), events, on_result)
+
+    generate.__name__ = generate.__qualname__ = agenerator.__name__.removeprefix("a")
+    return generate
+
+
+def _generate(prompt_template: str, bypass_cache: bool = False, **format_kwargs: str) -> str:
+    """Blocking form of :func:`_agenerate`."""
+    return _run_sync(_agenerate(prompt_template, bypass_cache, **format_kwargs))
+
+
+_STREAM_DONE = object()
+
+
+class GenerationStream:
+    """Iterator over the text deltas of a running ``generate_*`` call.
+
+    The generator runs on a worker thread; iterating yields text as the model
+    produces it (a cached response arrives as one chunk).  Once exhausted,
+    :attr:`result` holds the generator's return value.  The deltas are a live
+    preview: generators that post-process their output (e.g. the course
+    outline's condense pass) may return text that differs from them, and a
+    :data:`resilience.RESTART` delta (an empty string) means the text so far
+    is void and the preview starts again.
+    :meth:`cancel` abandons the call and stops its CLI session.
+    """
+
+    def __init__(self, generator: Callable[..., str], *args, **kwargs) -> None:
+        self.result: str | None = None
+        self._error: Exception | None = None
+        self._queue: queue.Queue = queue.Queue()
+        self._token = event_loop.CancelToken(parent=_CANCEL_TOKEN.get())
+        context = contextvars.copy_context()
+        self._thread = threading.Thread(
+            target=context.run, args=(self._run, generator, args, kwargs), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, generator: Callable[..., str], args: tuple, kwargs: dict) -> None:
+        _STREAM_SINK.set(self._queue.put)
+        _QUEUE_SINK.set(self._queue.put)
+        _CANCEL_TOKEN.set(self._token)
+        try:
+            self.result = generator(*args, **kwargs)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._queue.put(_STREAM_DONE)
+
+    def cancel(self) -> None:
+        """Stop the generation; iterating then raises ``concurrent.futures.CancelledError``."""
+        self._token.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._token.cancelled
+
+    def __iter__(self) -> "GenerationStream":
+        return self
+
+    def __next__(self) -> str:
+        while True:
+            item = self._next_event()
+            if isinstance(item, str):
+                return item
+
+    def _next_event(self) -> "str | scheduler.QueueStatus":
+        item = self._queue.get()
+        if item is _STREAM_DONE:
+            self._queue.put(_STREAM_DONE)  # keep later next() calls finished
+            self._thread.join()
+            if self._error is not None:
+                raise self._error
+            raise StopIteration
+        return item
+
+    def events(self) -> Iterator["str | scheduler.QueueStatus"]:
+        """Yield text deltas interleaved with :class:`scheduler.QueueStatus`
+        updates while the call waits for a scheduler slot."""
+        while True:
+            try:
+                yield self._next_event()
+            except StopIteration:
+                return
+
+
+def stream_generation(generator: Callable[..., str], *args, **kwargs) -> GenerationStream:
+    """Run ``generator(*args, **kwargs)`` (any ``generate_*`` function) and stream its text.
+
+    Example::
+
+        stream = stream_generation(generate_about_course, title, topics)
+        for delta in stream:
+            print(delta, end="")
+        text = stream.result
+    """
+    return GenerationStream(generator, *args, **kwargs)
+
+
+async def astream_generation(
+    generator: Callable[..., str], *args, **kwargs
+) -> AsyncIterator[str]:
+    """Async-iterator form of :func:`stream_generation`."""
+    stream = GenerationStream(generator, *args, **kwargs)
+    while True:
+        delta = await asyncio.to_thread(next, stream, _STREAM_DONE)
+        if delta is _STREAM_DONE:
+            return
+        yield delta
+
+
+# Background jobs: generations that keep running across Streamlit reruns.
+_JOBS = jobs.JobRunner(max_workers=int(os.environ.get("CP_JOB_WORKERS", jobs.DEFAULT_MAX_WORKERS)))
+
+
+def submit_generation_job(label: str, generator: Callable[..., str], *args, **kwargs) -> str:
+    """Run ``generator(*args, **kwargs)`` as a background job and return its id.
+
+    The job belongs to the current request owner (see
+    :func:`set_request_owner`), runs with a copy of the caller's context and
+    streams its text into :attr:`jobs.Job.partial_text`; poll it with
+    :func:`get_generation_job` and stop it with :func:`cancel_generation_job`.
+    """
+    return _submit_job(label, lambda on_text: generator(*args, **kwargs))
+
+
+def submit_batch_generation_job(
+    label: str, generator: Callable[..., dict[str, str]], *args, **kwargs
+) -> str:
+    """Like :func:`submit_generation_job` for the batch generators returning
+    {name: text}: the job's result is that dict as JSON, and each item is
+    streamed as a ``### name`` section as soon as it is ready."""
+    def run(on_text: Callable[[str], None]) -> str:
+        def on_result(name: str, text: str) -> None:
+            on_text(f"### {name}\n{text}\n\n")
+        return json.dumps(generator(*args, on_result=on_result, **kwargs))
+    return _submit_job(label, run)
+
+
+def _submit_job(label: str, fn: Callable[[Callable[[str], None]], str]) -> str:
+    context = contextvars.copy_context()
+    token = event_loop.CancelToken(parent=_CANCEL_TOKEN.get())
+
+    def run(on_text: Callable[[str], None]) -> str:
+        def body() -> str:
+            _STREAM_SINK.set(on_text)
+            _CANCEL_TOKEN.set(token)
+            return fn(on_text)
+        return context.run(body)
+
+    return _JOBS.submit(_REQUEST_OWNER.get(), label, run, cancel=token.cancel)
+
+
+def cancel_generation_job(job_id: str) -> bool:
+    """Stop a queued or running job and its model calls; False if it had already finished."""
+    return _JOBS.cancel(job_id)
+
+
+def get_generation_job(job_id: str) -> jobs.Job | None:
+    """Return the job's current status, streamed text and (once done) result or error."""
+    return _JOBS.get(job_id)
+
+
+def get_generation_jobs(limit: int = 50) -> list[jobs.Job]:
+    """Return the current request owner's jobs, newest first."""
+    return _JOBS.jobs(_REQUEST_OWNER.get(), limit)
+
+
+@_track_generator
+async def agenerate_about_course(
+    course_title: str,
+    course_topics: str,
+    prompt_template: str | None = None,
+    bypass_cache: bool = False,
+) -> str:
     """Generate an 'About the Course' description using the Claude Agent SDK."""
     template = prompt_template or ABOUT_COURSE_PROMPT_TEMPLATE
-    return _generate(template, course_title=course_title, course_topics=course_topics)
+    return await _agenerate(
+        template, bypass_cache=bypass_cache, course_title=course_title, course_topics=course_topics
+    )
+
+
+generate_about_course = _sync(agenerate_about_course)
 
 
 WHAT_YOULL_LEARN_PROMPT_TEMPLATE = """\
@@ -296,10 +909,21 @@ measures.
 Respond with ONLY the bullet points, nothing else."""
 
 
-def generate_what_youll_learn(course_title: str, course_topics: str, prompt_template: str | None = None) -> str:
+@_track_generator
+async def agenerate_what_youll_learn(
+    course_title: str,
+    course_topics: str,
+    prompt_template: str | None = None,
+    bypass_cache: bool = False,
+) -> str:
     """Generate a 'What You'll Learn' section using the Claude Agent SDK."""
     template = prompt_template or WHAT_YOULL_LEARN_PROMPT_TEMPLATE
-    return _generate(template, course_title=course_title, course_topics=course_topics)
+    return await _agenerate(
+        template, bypass_cache=bypass_cache, course_title=course_title, course_topics=course_topics
+    )
+
+
+generate_what_youll_learn = _sync(agenerate_what_youll_learn)
 
 
 BACKGROUND_PART_A_PROMPT_TEMPLATE = """\
@@ -347,10 +971,21 @@ planning, and decarbonisation strategy development.
 Respond with ONLY the paragraph text, nothing else."""
 
 
-def generate_background_part_a(course_title: str, course_topics: str, prompt_template: str | None = None) -> str:
+@_track_generator
+async def agenerate_background_part_a(
+    course_title: str,
+    course_topics: str,
+    prompt_template: str | None = None,
+    bypass_cache: bool = False,
+) -> str:
     """Generate a 'Background Part A' section using the Claude Agent SDK."""
     template = prompt_template or BACKGROUND_PART_A_PROMPT_TEMPLATE
-    return _generate(template, course_title=course_title, course_topics=course_topics)
+    return await _agenerate(
+        template, bypass_cache=bypass_cache, course_title=course_title, course_topics=course_topics
+    )
+
+
+generate_background_part_a = _sync(agenerate_background_part_a)
 
 
 BACKGROUND_PART_B_PROMPT_TEMPLATE = """\
@@ -429,10 +1064,194 @@ competitiveness.
 Respond with ONLY the text, nothing else."""
 
 
-def generate_background_part_b(course_title: str, course_topics: str, prompt_template: str | None = None) -> str:
+@_track_generator
+async def agenerate_background_part_b(
+    course_title: str,
+    course_topics: str,
+    prompt_template: str | None = None,
+    bypass_cache: bool = False,
+) -> str:
     """Generate a 'Background Part B' section using the Claude Agent SDK."""
     template = prompt_template or BACKGROUND_PART_B_PROMPT_TEMPLATE
-    return _generate(template, course_title=course_title, course_topics=course_topics)
+    return await _agenerate(
+        template, bypass_cache=bypass_cache, course_title=course_title, course_topics=course_topics
+    )
+
+
+generate_background_part_b = _sync(agenerate_background_part_b)
+
+
+# Sections users almost always open right after saving Course Details; see
+# prefetch_sections().
+PREFETCH_GENERATORS = (
+    agenerate_about_course,
+    agenerate_what_youll_learn,
+    agenerate_background_part_a,
+    agenerate_background_part_b,
+)
+_PREFETCH_STATS = {"started": 0, "completed": 0, "cancelled": 0, "failed": 0}
+_PREFETCH_STATS_LOCK = threading.Lock()
+
+
+def _count_prefetch(outcome: str) -> None:
+    with _PREFETCH_STATS_LOCK:
+        _PREFETCH_STATS[outcome] += 1
+
+
+def prefetch_sections(
+    course_title: str,
+    course_topics: str,
+    prompt_templates: dict[str, str | None] | None = None,
+) -> event_loop.CancelToken:
+    """Warm the response cache for the :data:`PREFETCH_GENERATORS` sections.
+
+    Each section is generated in the background as BULK work, so it never
+    delays an interactive request; when the user then opens the page, the
+    same call is a cache hit (or joins the prefetch still in flight).
+    *prompt_templates* maps ``generate_*`` name to the template the page will
+    use (the cache key includes it).  Cancel the returned token when the
+    course details change: queued and running prefetches are abandoned.
+    """
+    token = event_loop.CancelToken()
+    prompt_templates = prompt_templates or {}
+
+    async def prefetch(generator: Callable[..., Awaitable[str]]) -> None:
+        _REQUEST_PRIORITY.set(BULK)
+        _count_prefetch("started")
+        template = prompt_templates.get(generator.__name__.removeprefix("a"))
+        try:
+            await generator(course_title, course_topics, prompt_template=template)
+        except asyncio.CancelledError:
+            _count_prefetch("cancelled")
+            raise
+        except Exception:
+            _count_prefetch("failed")   # details are in the telemetry store
+        else:
+            _count_prefetch("completed")
+
+    for generator in PREFETCH_GENERATORS:
+        future = event_loop.submit(prefetch(generator))
+        token.track(future)
+        future.add_done_callback(token.untrack)
+    return token
+
+
+def get_prefetch_stats() -> dict[str, int]:
+    """Return how many section prefetches were started, completed, cancelled or failed."""
+    with _PREFETCH_STATS_LOCK:
+        return dict(_PREFETCH_STATS)
+
+
+COMBINED_SECTIONS_PROMPT_TEMPLATE = """\
+You are writing four sections of a course proposal for the same course in a \
+single response. The full instructions for each section are given below, \
+each introduced by its JSON key.
+
+{section_instructions}
+Respond with ONLY a JSON object with exactly these keys: {section_keys}. \
+Each value must be the plain text of that section as a JSON string (use \\n \
+for line breaks) following that section's instructions. Where a section's \
+instructions say "Respond with ONLY ...", that applies to the section's value. \
+Do NOT wrap the JSON in markdown code fences."""
+
+# Section key -> (default template, single-section coroutine function, local validator)
+COMBINED_SECTIONS = {
+    "about_course": (ABOUT_COURSE_PROMPT_TEMPLATE, agenerate_about_course, validators.check_about_course),
+    "what_youll_learn": (
+        WHAT_YOULL_LEARN_PROMPT_TEMPLATE, agenerate_what_youll_learn, validators.check_what_youll_learn,
+    ),
+    "background_part_a": (
+        BACKGROUND_PART_A_PROMPT_TEMPLATE, agenerate_background_part_a, validators.check_background_part_a,
+    ),
+    "background_part_b": (
+        BACKGROUND_PART_B_PROMPT_TEMPLATE, agenerate_background_part_b, validators.check_background_part_b,
+    ),
+}
+
+# Max per-section fallback generations run at once after the combined call.
+COMBINED_SECTIONS_CONCURRENCY = len(COMBINED_SECTIONS)
+
+
+def _parse_json_object(text: str) -> dict:
+    """Extract the outermost JSON object from a model reply, or {} if there is none."""
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        parsed = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+@_track_generator
+async def agenerate_course_sections(
+    course_title: str,
+    course_topics: str,
+    prompt_templates: dict[str, str | None] | None = None,
+    bypass_cache: bool = False,
+) -> dict[str, str]:
+    """Generate About, What You'll Learn and Background A/B in one round-trip.
+
+    All four sections share the same inputs, so they are requested together
+    as one JSON response.  Each section is then checked locally against its
+    length/format rules, and only sections that are missing or fail are
+    regenerated individually (concurrently).  *prompt_templates* maps section
+    keys (see ``COMBINED_SECTIONS``) to edited templates.  Returns
+    {section_key: text}; a section whose fallback also fails holds
+    ``"Error: ..."``.
+    """
+    prompt_templates = prompt_templates or {}
+    templates = {
+        key: prompt_templates.get(key) or default
+        for key, (default, _, _) in COMBINED_SECTIONS.items()
+    }
+    inputs = {"course_title": course_title, "course_topics": course_topics}
+    # The per-section calls key on the canonical title/topics; key the
+    # combined call on them too, so cosmetic variants share its cache entry.
+    key_inputs = canonicalise_inputs(inputs)
+
+    def combined_kwargs(fields: dict[str, str]) -> dict[str, str]:
+        return {
+            "section_instructions": "".join(
+                f'=== "{key}" ===\n{template.format(**fields)}\n\n'
+                for key, template in templates.items()
+            ),
+            "section_keys": ", ".join(f'"{key}"' for key in COMBINED_SECTIONS),
+        }
+
+    # A reply that is not a JSON object is not cached, so the next request
+    # asks again instead of always falling back to four separate calls.
+    try:
+        combined = _parse_json_object(await _agenerate(
+            COMBINED_SECTIONS_PROMPT_TEMPLATE,
+            bypass_cache=bypass_cache,
+            key_kwargs=combined_kwargs(key_inputs),
+            cacheable=lambda reply: bool(_parse_json_object(reply)),
+            **combined_kwargs(inputs),
+        ))
+    except (RuntimeError, ValueError, KeyError, IndexError):
+        combined = {}
+
+    sections: dict[str, str] = {}
+    retry: dict[str, Callable[[], Awaitable[str]]] = {}
+    for key, (_, generator, check) in COMBINED_SECTIONS.items():
+        text = combined.get(key)
+        text = text.strip() if isinstance(text, str) else ""
+        if text and not check(text):
+            sections[key] = text
+        else:
+            retry[key] = (
+                lambda generator=generator, key=key: generator(
+                    course_title, course_topics,
+                    prompt_template=templates[key], bypass_cache=bypass_cache,
+                )
+            )
+    sections.update(await _agenerate_batch(retry, COMBINED_SECTIONS_CONCURRENCY))
+    return {key: sections[key] for key in COMBINED_SECTIONS}
+
+
+generate_course_sections = _sync(agenerate_course_sections)
 
 
 INSTRUCTION_METHOD_PROMPT_TEMPLATE = """\
@@ -614,11 +1433,13 @@ Target age group: 21-65 years old
 Respond with ONLY the text, nothing else."""
 
 
-def generate_minimum_entry_requirement(
+@_track_generator
+async def agenerate_minimum_entry_requirement(
     course_title: str,
     course_topics: str,
     prompt_template: str | None = None,
     special_requirements: str = "",
+    bypass_cache: bool = False,
 ) -> str:
     """Generate a 'Minimum Entry Requirement' section using the Claude Agent SDK."""
     template = prompt_template or MINIMUM_ENTRY_REQUIREMENT_PROMPT_TEMPLATE
@@ -629,14 +1450,18 @@ def generate_minimum_entry_requirement(
         )
     else:
         special_req_text = ""
-    return _generate(
+    return await _agenerate(
         template,
+        bypass_cache=bypass_cache,
         course_title=course_title,
         course_topics=course_topics,
         special_requirements=special_req_text,
     )
 
 
+generate_minimum_entry_requirement = _sync(agenerate_minimum_entry_requirement)
+
+
 LEARNING_OUTCOME_PROMPT_TEMPLATE = """\
 You are an expert instructional designer for professional training and \
 continuing education programmes. Generate learning outcomes for each \
@@ -677,12 +1502,30 @@ LO4: Develop an Agentic AI workforce strategy covering role-based design, team s
 Respond with ONLY the formatted topics and learning outcomes, nothing else."""
 
 
-def generate_learning_outcomes(
-    course_title: str, course_topics: str, prompt_template: str | None = None
+@_track_generator
+async def agenerate_learning_outcomes(
+    course_title: str,
+    course_topics: str,
+    prompt_template: str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
-    """Generate learning outcomes for each topic using the Claude Agent SDK."""
+    """Generate learning outcomes for each topic using the Claude Agent SDK.
+
+    With the built-in template, topics left without a learning outcome or
+    with one of 25+ words are regenerated on their own and spliced in.
+    """
     template = prompt_template or LEARNING_OUTCOME_PROMPT_TEMPLATE
-    return _generate(template, course_title=course_title, course_topics=course_topics)
+    text = await _agenerate(
+        template, bypass_cache=bypass_cache, course_title=course_title, course_topics=course_topics
+    )
+    if template != LEARNING_OUTCOME_PROMPT_TEMPLATE:
+        return text
+    return await _enforce_contract(
+        text, _repair_learning_outcomes, bypass_cache, course_title=course_title, course_topics=course_topics
+    )
+
+
+generate_learning_outcomes = _sync(agenerate_learning_outcomes)
 
 
 COURSE_TOPICS_PROMPT_TEMPLATE = """\
@@ -752,12 +1595,14 @@ Example (Course: Business Innovation with Agentic AI, 6 topics):
 Respond with ONLY the formatted topics and learning outcomes, nothing else."""
 
 
-def generate_course_topics(
+@_track_generator
+async def agenerate_course_topics(
     course_title: str,
     num_days: int,
     prompt_template: str | None = None,
     skill_description: str = "",
     special_requirements: str = "",
+    bypass_cache: bool = False,
 ) -> str:
     """Generate course topics using the Claude Agent SDK.
 
@@ -785,8 +1630,9 @@ def generate_course_topics(
         )
     else:
         special_req_text = ""
-    return _generate(
+    return await _agenerate(
         template,
+        bypass_cache=bypass_cache,
         course_title=course_title,
         num_days=str(num_days),
         max_topics=str(max_topics),
@@ -796,6 +1642,9 @@ def generate_course_topics(
     )
 
 
+generate_course_topics = _sync(agenerate_course_topics)
+
+
 JOB_ROLES_PROMPT_TEMPLATE = """\
 You are an expert in Singapore's workforce development ecosystem. Generate \
 10 relevant job roles for the following course. The job role names must follow \
@@ -820,12 +1669,30 @@ Skills Framework / MySkillsFuture Jobs-Skills Portal
 Respond with ONLY the comma-separated job roles, nothing else."""
 
 
-def generate_job_roles(
-    course_title: str, course_topics: str, prompt_template: str | None = None
+@_track_generator
+async def agenerate_job_roles(
+    course_title: str,
+    course_topics: str,
+    prompt_template: str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
-    """Generate job roles following SSG Skills Jobs portal naming."""
+    """Generate job roles following SSG Skills Jobs portal naming.
+
+    With the built-in template the reply is de-duplicated and held to
+    exactly 10 roles, asking the model only for any roles still missing.
+    """
     template = prompt_template or JOB_ROLES_PROMPT_TEMPLATE
-    return _generate(template, course_title=course_title, course_topics=course_topics)
+    text = await _agenerate(
+        template, bypass_cache=bypass_cache, course_title=course_title, course_topics=course_topics
+    )
+    if template != JOB_ROLES_PROMPT_TEMPLATE:
+        return text
+    return await _enforce_contract(
+        text, _repair_job_roles, bypass_cache, course_title=course_title, course_topics=course_topics
+    )
+
+
+generate_job_roles = _sync(agenerate_job_roles)
 
 
 LESSON_PLAN_PROMPT_TEMPLATE = """\
@@ -914,69 +1781,17 @@ def parse_ai_lesson_plan(ai_text: str) -> dict[int, list[dict]]:
     """Parse AI-generated lesson plan text into a schedule dict.
 
     Returns {day_num: [{"timing": ..., "duration": ..., "description": ..., "methods": ...}, ...]}.
+    Use :class:`LessonPlanParser` directly to parse while the text streams
+    in or to see which lines were not understood.
     """
-    import re
-    schedule: dict[int, list[dict]] = {}
-    current_day = 0
-    current_entry: dict | None = None
-    rows: list[dict] = []
-
-    for line in ai_text.split("\n"):
-        line = line.strip()
-        if not line:
-            continue
-
-        # Match "Day N" header
-        day_match = re.match(r"Day\s+(\d+)", line)
-        if day_match:
-            if current_entry:
-                rows.append(current_entry)
-                current_entry = None
-            if current_day > 0:
-                schedule[current_day] = rows
-            current_day = int(day_match.group(1))
-            rows = []
-            continue
-
-        # Match time slot line: "9:00 AM - 10:30 AM | Description"
-        slot_match = re.match(
-            r"(\d{1,2}:\d{2}\s*(?:AM|PM))\s*-\s*(\d{1,2}:\d{2}\s*(?:AM|PM))\s*\|\s*(.+)",
-            line,
-        )
-        if slot_match:
-            if current_entry:
-                rows.append(current_entry)
-            current_entry = {
-                "timing": f"{slot_match.group(1)} - {slot_match.group(2)}",
-                "duration": "",
-                "description": slot_match.group(3).strip(),
-                "methods": "",
-            }
-            continue
-
-        if current_entry:
-            # Match "Duration: X mins"
-            dur_match = re.match(r"Duration:\s*(.+)", line)
-            if dur_match:
-                current_entry["duration"] = dur_match.group(1).strip()
-                continue
-
-            # Match "Instructional Method: ..."
-            method_match = re.match(r"Instructional Method:\s*(.+)", line)
-            if method_match:
-                current_entry["methods"] = method_match.group(1).strip()
-                continue
-
-    # Flush last entry and day
-    if current_entry:
-        rows.append(current_entry)
-    if current_day > 0:
-        schedule[current_day] = rows
-
-    return schedule
-
-
-def generate_lesson_plan_content(
+    parser = LessonPlanParser()
+    parser.feed(ai_text)
+    parser.close()
+    return parser.schedule
+
+
+@_track_generator
+async def agenerate_lesson_plan_content(
     course_title: str,
     course_topics: str,
     course_duration: int,
@@ -985,12 +1800,14 @@ def generate_lesson_plan_content(
     instructional_methods: list[str],
     assessment_methods: list[str],
     prompt_template: str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
     """Generate a lesson plan using the Claude Agent SDK."""
     template = prompt_template or LESSON_PLAN_PROMPT_TEMPLATE
     num_days = max(1, course_duration // 8)
-    return _generate(
+    return await _agenerate(
         template,
+        bypass_cache=bypass_cache,
         course_title=course_title,
         course_topics=course_topics,
         course_duration=str(course_duration),
@@ -1002,6 +1819,9 @@ def generate_lesson_plan_content(
     )
 
 
+generate_lesson_plan_content = _sync(agenerate_lesson_plan_content)
+
+
 COURSE_TITLE_SUGGESTIONS_PROMPT_TEMPLATE = """\
 You are an expert course naming strategist for professional training and \
 continuing education programmes. Brainstorm 20 course titles for the \
@@ -1048,12 +1868,198 @@ Example (Course Topic: Digital Marketing):
 Respond with ONLY the numbered list of titles, nothing else."""
 
 
-def generate_course_title_suggestions(
-    course: str, prompt_template: str | None = None
+@_track_generator
+async def agenerate_course_title_suggestions(
+    course: str, prompt_template: str | None = None, bypass_cache: bool = False
 ) -> str:
-    """Generate 20 course title suggestions using the Claude Agent SDK."""
+    """Generate 20 course title suggestions using the Claude Agent SDK.
+
+    With the built-in template the list is de-duplicated, held to exactly
+    20 and renumbered, asking the model only for any titles still missing.
+    """
     template = prompt_template or COURSE_TITLE_SUGGESTIONS_PROMPT_TEMPLATE
-    return asyncio.run(_generate_async(template, course=course))
+    text = await _agenerate(template, bypass_cache=bypass_cache, course=course)
+    if template != COURSE_TITLE_SUGGESTIONS_PROMPT_TEMPLATE:
+        return text
+    return await _enforce_contract(text, _repair_course_title_suggestions, bypass_cache, course=course)
+
+
+generate_course_title_suggestions = _sync(agenerate_course_title_suggestions)
+
+
+# --- Output contracts ---------------------------------------------------------
+# Outputs of the built-in prompts are checked against the rules those prompts
+# state (app.validators.CHECKS).  Whatever can be fixed locally (duplicates,
+# extra items) is; otherwise one small repair call asks for only the failing
+# items and they are spliced back into the output.  Outputs of edited prompt
+# templates are returned as they are, since their rules may differ.
+# CP_AUTO_REPAIR=0 turns repairs off (outputs are still checked and counted).
+_AUTO_REPAIR = os.environ.get("CP_AUTO_REPAIR", "1") != "0"
+
+LEARNING_OUTCOME_REPAIR_PROMPT_TEMPLATE = """\
+You are an expert instructional designer. Write the learning outcome for \
+ONLY the topics listed below of the course "{course_title}".
+
+Topics:
+{topics}
+
+Guidelines:
+- Exactly ONE learning outcome for EACH listed topic
+- Each learning outcome MUST summarise the entire topic in a single sentence
+- Each learning outcome MUST start with an action verb
+- Each learning outcome MUST be less than {max_words} words
+- Keep each topic's number: T2 gets LO2, etc.
+
+Respond with ONLY lines in this format, nothing else:
+T2: [Topic Name]
+LO2: [Learning outcome]"""
+
+JOB_ROLES_REPAIR_PROMPT_TEMPLATE = """\
+Suggest {count} more job roles relevant to the course "{course_title}", \
+following the naming used on the SSG Skills Framework / MySkillsFuture \
+Jobs-Skills Portal.
+
+Course Topics:
+{course_topics}
+
+Do NOT repeat any of these roles: {existing}
+
+Respond with ONLY the {count} job roles as a single comma-separated line, \
+nothing else."""
+
+COURSE_TITLE_REPAIR_PROMPT_TEMPLATE = """\
+Brainstorm {count} more course titles (3-10 words each, professional, \
+SEO-friendly) for the course topic: {course}
+
+Do NOT repeat or closely reword any of these titles:
+{existing}
+
+Respond with ONLY a numbered list of the {count} new titles, nothing else."""
+
+_CONTRACT_STATS = {
+    "checked": 0,         # outputs checked against their contract
+    "passed": 0,          # met it as generated
+    "fixed_locally": 0,   # met it after local fixes only
+    "repaired": 0,        # met it after a targeted repair call
+    "still_failing": 0,   # returned with problems remaining
+    "repair_calls": 0,    # targeted repair round-trips made
+}
+_CONTRACT_STATS_LOCK = threading.Lock()
+
+
+def get_contract_stats() -> dict[str, int]:
+    """Return how many outputs passed their contract, were fixed locally or needed a repair call."""
+    with _CONTRACT_STATS_LOCK:
+        return dict(_CONTRACT_STATS)
+
+
+async def _enforce_contract(
+    text: str,
+    repair: Callable[..., Awaitable[str]],
+    bypass_cache: bool = False,
+    **inputs: str,
+) -> str:
+    """Check *text* against the current generator's contract; on failure return
+    ``await repair(text, ask, **inputs)``, where ``await ask(template, **kwargs)``
+    makes (and counts) a generation call.  A failed repair call keeps *text*."""
+    generator = _CURRENT_GENERATOR.get()
+    counts = {"checked": 1}
+    if not validators.check(generator, text, **inputs):
+        counts["passed"] = 1
+    elif not _AUTO_REPAIR:
+        counts["still_failing"] = 1
+    else:
+        calls = 0
+
+        async def ask(template: str, **kwargs: str) -> str:
+            nonlocal calls
+            calls += 1
+            token = _CURRENT_GENERATOR.set("repair_" + generator.removeprefix("generate_"))
+            try:
+                return await _agenerate(template, bypass_cache=bypass_cache, **kwargs)
+            finally:
+                _CURRENT_GENERATOR.reset(token)
+
+        try:
+            text = await repair(text, ask, **inputs)
+        except RuntimeError:
+            pass   # recorded in telemetry; keep what we have
+        counts["repair_calls"] = calls
+        if validators.check(generator, text, **inputs):
+            counts["still_failing"] = 1
+        else:
+            counts["repaired" if calls else "fixed_locally"] = 1
+    with _CONTRACT_STATS_LOCK:
+        for name, count in counts.items():
+            _CONTRACT_STATS[name] += count
+    return text
+
+
+async def _repair_learning_outcomes(
+    text: str, ask: Callable[..., Awaitable[str]], course_title: str, course_topics: str
+) -> str:
+    """Regenerate only the missing and over-long learning outcomes."""
+    topics = validators.topic_names(course_topics)
+    failing = sorted(set(validators.missing_learning_outcomes(text, course_topics))
+                     | set(validators.long_learning_outcomes(text)))
+    outcomes = validators.parse_learning_outcomes(text)
+    if failing:
+        reply = await ask(
+            LEARNING_OUTCOME_REPAIR_PROMPT_TEMPLATE,
+            course_title=course_title,
+            topics="\n".join(f"T{n}: {topics.get(n, f'Topic {n}')}" for n in failing),
+            max_words=str(validators.MAX_LEARNING_OUTCOME_WORDS),
+        )
+        repaired = validators.parse_learning_outcomes(reply)
+        outcomes.update({n: repaired[n] for n in failing if n in repaired})
+    if topics:
+        # Rebuild in the prompt's format: one LO per input topic, in order.
+        return "\n\n".join(
+            f"T{n}: {name}\nLO{n}: {outcomes[n]}" if n in outcomes else f"T{n}: {name}"
+            for n, name in topics.items()
+        )
+    return validators.replace_learning_outcomes(text, outcomes)
+
+
+async def _repair_job_roles(
+    text: str, ask: Callable[..., Awaitable[str]], course_title: str, course_topics: str
+) -> str:
+    """De-duplicate and trim locally; ask only for the roles still missing."""
+    roles = validators.split_job_roles(text)
+    missing = validators.JOB_ROLE_COUNT - len(roles)
+    if missing > 0:
+        reply = await ask(
+            JOB_ROLES_REPAIR_PROMPT_TEMPLATE,
+            count=str(missing),
+            course_title=course_title,
+            course_topics=course_topics,
+            existing=", ".join(roles),
+        )
+        roles = validators.split_job_roles(", ".join(roles + validators.split_job_roles(reply)))
+    return ", ".join(roles[:validators.JOB_ROLE_COUNT])
+
+
+async def _repair_course_title_suggestions(
+    text: str, ask: Callable[..., Awaitable[str]], course: str
+) -> str:
+    """De-duplicate and trim locally; ask only for the titles still missing."""
+    titles = validators.split_titles(text)
+    missing = validators.TITLE_SUGGESTION_COUNT - len(titles)
+    if missing > 0:
+        reply = await ask(
+            COURSE_TITLE_REPAIR_PROMPT_TEMPLATE,
+            count=str(missing),
+            course=course,
+            existing="\n".join(titles),
+        )
+        seen = {title.casefold() for title in titles}
+        for title in validators.split_titles(reply):
+            if title.casefold() not in seen:
+                seen.add(title.casefold())
+                titles.append(title)
+    return "\n".join(
+        f"{n}. {title}" for n, title in enumerate(titles[:validators.TITLE_SUGGESTION_COUNT], 1)
+    )
 
 
 _CONDENSE_TEMPLATE = """\
@@ -1109,39 +2115,83 @@ Topic 2: [duration]mins
 ..."""
 
 
-def generate_course_outline(
+COURSE_OUTLINE_CHAR_LIMIT = 2000
+
+_OUTLINE_STATS = {
+    "outlines": 0,           # outlines generated
+    "within_limit": 0,       # first response already fit
+    "compacted_locally": 0,  # fit after local compaction, no condense call
+    "llm_condensed": 0,      # still needed the condense prompt
+    "condense_calls": 0,     # total condense round-trips made
+}
+_OUTLINE_STATS_LOCK = threading.Lock()
+
+
+def _record_outline_stats(counts: dict[str, int]) -> None:
+    with _OUTLINE_STATS_LOCK:
+        for name, count in counts.items():
+            _OUTLINE_STATS[name] += count
+
+
+def get_outline_compaction_stats() -> dict[str, int]:
+    """Return how often course outlines needed local compaction or an LLM condense."""
+    with _OUTLINE_STATS_LOCK:
+        return dict(_OUTLINE_STATS)
+
+
+@_track_generator
+async def agenerate_course_outline(
     course_title: str,
     course_topics: str,
     instructional_methods: str,
     duration_per_topic: str,
     prompt_template: str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
     """Generate a course outline using the Claude Agent SDK."""
     template = prompt_template or COURSE_OUTLINE_PROMPT_TEMPLATE
-    result = asyncio.run(
-        _generate_async(
-            template,
-            course_title=course_title,
-            course_topics=course_topics,
-            instructional_methods=instructional_methods,
-            duration_per_topic=duration_per_topic,
-        )
+    result = await _agenerate(
+        template,
+        bypass_cache=bypass_cache,
+        course_title=course_title,
+        course_topics=course_topics,
+        instructional_methods=instructional_methods,
+        duration_per_topic=duration_per_topic,
     )
-    # If output exceeds 2000 chars, ask AI to condense it
+    # If output exceeds 2000 chars, compact it locally first and only ask
+    # AI to condense it when that is not enough
+    stats = {"outlines": 1}
+    if len(result) <= COURSE_OUTLINE_CHAR_LIMIT:
+        stats["within_limit"] = 1
+    else:
+        result = compact_course_outline(result, COURSE_OUTLINE_CHAR_LIMIT)
+        if len(result) <= COURSE_OUTLINE_CHAR_LIMIT:
+            stats["compacted_locally"] = 1
+        else:
+            stats["llm_condensed"] = 1
     max_retries = 2
     for _ in range(max_retries):
-        if len(result) <= 2000:
+        if len(result) <= COURSE_OUTLINE_CHAR_LIMIT:
             break
-        result = asyncio.run(
-            _generate_async(
+        stats["condense_calls"] = stats.get("condense_calls", 0) + 1
+        token = _CURRENT_GENERATOR.set("condense_course_outline")
+        try:
+            result = await _agenerate(
                 _CONDENSE_TEMPLATE,
+                bypass_cache=bypass_cache,
                 text=result,
-                char_limit="2000",
+                char_limit=str(COURSE_OUTLINE_CHAR_LIMIT),
             )
-        )
+        finally:
+            _CURRENT_GENERATOR.reset(token)
+        result = compact_course_outline(result, COURSE_OUTLINE_CHAR_LIMIT)
+    _record_outline_stats(stats)
     return result
 
 
+generate_course_outline = _sync(agenerate_course_outline)
+
+
 LU_SEQUENCING_TYPES = [
     "Step by Step",
     "Simple to Complex",
@@ -1369,27 +2419,31 @@ LU_SEQUENCING_TEMPLATES = {
 }
 
 
-def generate_lu_sequencing_rationale(
+@_track_generator
+async def agenerate_lu_sequencing_rationale(
     course: str,
     learning_outcomes: str,
     course_outline: str,
     sequencing_type: str,
     prompt_template: str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
     """Generate a rationale for LU sequencing using the Claude Agent SDK."""
     template = prompt_template or LU_SEQUENCING_TEMPLATES.get(
         sequencing_type, LU_SEQUENCING_STEP_BY_STEP_TEMPLATE
     )
-    return asyncio.run(
-        _generate_async(
-            template,
-            course=course,
-            learning_outcomes=learning_outcomes,
-            course_outline=course_outline,
-        )
+    return await _agenerate(
+        template,
+        bypass_cache=bypass_cache,
+        course=course,
+        learning_outcomes=learning_outcomes,
+        course_outline=course_outline,
     )
 
 
+generate_lu_sequencing_rationale = _sync(agenerate_lu_sequencing_rationale)
+
+
 COURSE_VALIDATION_PROMPT_TEMPLATE = """\
 As a director in a company, your role is to assist users in determining \
 the relevance and potential impact of various courses for specific industries.
@@ -1437,24 +2491,87 @@ You will generate FIVE distinct sets of responses for the survey above.
 Respond with ONLY the five sets of responses, nothing else."""
 
 
-def generate_course_validation(
+@_track_generator
+async def agenerate_course_validation(
     course: str,
     industry: str,
     learning_outcomes: str,
     prompt_template: str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
     """Generate course validation survey responses using the Claude Agent SDK."""
     template = prompt_template or COURSE_VALIDATION_PROMPT_TEMPLATE
-    return asyncio.run(
-        _generate_async(
-            template,
-            course=course,
-            industry=industry,
-            learning_outcomes=learning_outcomes,
-        )
+    return await _agenerate(
+        template,
+        bypass_cache=bypass_cache,
+        course=course,
+        industry=industry,
+        learning_outcomes=learning_outcomes,
     )
 
 
+generate_course_validation = _sync(agenerate_course_validation)
+
+
+# One survey response set per call; generate_course_validation_sets() issues
+# one call per perspective below, so each set is written independently.
+COURSE_VALIDATION_SET_PROMPT_TEMPLATE = """\
+As a director in a company, your role is to assist users in determining \
+the relevance and potential impact of various courses for specific industries.
+
+Course Title: {course}
+Industry: {industry}
+Learning Outcomes:
+{learning_outcomes}
+
+TASKS:
+You will generate ONE set of responses (set {set_number} of several written \
+independently) to two survey questions:
+1. What are the performance gaps in the industry (1-2 paragraphs are sufficed)
+2. Why you think this WSQ course will address the training needs for the \
+industry (1-2 paragraphs are sufficed)
+
+PERSPECTIVE FOR THIS SET:
+Answer as {perspective}. Base the answers mainly on learning outcome \
+{set_number} (or the closest one if there are fewer outcomes).
+
+RULES:
+1. Do not mention learning outcomes in the response.
+2. Do not mention you are the director
+3. Do not mention the specific industry by name
+4. 1 or 2 paragraphs answers for each question in the survey
+5. Each paragraph is less than 120 words
+6. Only consider 1 or 2 of the learning outcomes for your response.
+7. The response need to related to the course, industry and learning outcomes
+
+OUTPUT FORMAT:
+1. What are the performance gaps in the industry (1-2 paragraphs are sufficed)
+
+(Enter your answer here)
+
+2. Why you think this WSQ course will address the training needs for the \
+industry (1-2 paragraphs are sufficed)
+
+(Enter your answer here)
+
+Respond with ONLY this set of responses, nothing else."""
+
+# Diversity seeds: set N is written from the Nth perspective.
+COURSE_VALIDATION_PERSPECTIVES = [
+    "an operations manager concerned with day-to-day productivity, errors and "
+    "rework, in a direct and practical style",
+    "a learning and development lead focused on skills gaps and career "
+    "progression, in a reflective, people-centred style",
+    "a business owner weighing costs, competitiveness and customer "
+    "expectations, in a concise, commercial style",
+    "a team supervisor who sees frontline staff at work, using one concrete "
+    "workplace example",
+    "a head of strategy looking at industry trends, technology and "
+    "regulation, in a forward-looking, analytical style",
+]
+
+
+# Snapshot taken at import; get_skills_catalogue() follows later CSV edits.
 UNIQUE_SKILL_NAMES_LIST, SKILL_DESCRIPTIONS = load_skills_data()
 
 
@@ -1496,20 +2613,36 @@ ASSESSMENT_METHODS_LIST = [
 ]
 
 
-def generate_instruction_method(
-    course_title: str, course_topics: str, method_name: str, prompt_template: str | None = None
+@_track_generator
+async def agenerate_instruction_method(
+    course_title: str,
+    course_topics: str,
+    method_name: str,
+    prompt_template: str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
     """Generate an appropriateness elaboration for an instructional method."""
     template = prompt_template or INSTRUCTION_METHOD_PROMPT_TEMPLATE
-    return _generate(template, course_title=course_title, course_topics=course_topics, method_name=method_name)
+    return await _agenerate(
+        template,
+        bypass_cache=bypass_cache,
+        course_title=course_title,
+        course_topics=course_topics,
+        method_name=method_name,
+    )
 
 
-def generate_assessment_method(
+generate_instruction_method = _sync(agenerate_instruction_method)
+
+
+@_track_generator
+async def agenerate_assessment_method(
     course_title: str,
     course_topics: str,
     method_name: str,
     prompt_template: str | None = None,
     num_days: int = 1,
+    bypass_cache: bool = False,
 ) -> str:
     """Generate an appropriateness elaboration for an assessment method.
 
@@ -1517,10 +2650,251 @@ def generate_assessment_method(
     outcomes distributed sequentially across the days.
     """
     template = prompt_template or ASSESSMENT_METHOD_PROMPT_TEMPLATE
-    return _generate(
+    return await _agenerate(
         template,
+        bypass_cache=bypass_cache,
         course_title=course_title,
         course_topics=course_topics,
         method_name=method_name,
         num_days=str(num_days),
     )
+
+
+generate_assessment_method = _sync(agenerate_assessment_method)
+
+
+# Max generations run at once by the batch method generators.
+METHOD_BATCH_CONCURRENCY = 3
+
+
+async def _agenerate_batch(
+    tasks: dict[str, Callable[[], Awaitable[str]]],
+    max_concurrency: int,
+    on_result: Callable[[str, str], None] | None = None,
+    priority: int | None = None,
+) -> dict[str, str]:
+    """Run independent generation coroutines concurrently.
+
+    At most *max_concurrency* tasks run at once.  Each task's failure is
+    isolated as an ``"Error: ..."`` result.  *on_result(key, text)* is called
+    as each task finishes.  Tasks are queued under the caller's owner and
+    *priority* (default: the caller's).  Results are returned in the order of
+    *tasks*.  If the batch is cancelled, the remaining tasks are cancelled too.
+    """
+    if not tasks:
+        return {}
+    limit = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(key: str, task: Callable[[], Awaitable[str]]) -> tuple[str, str]:
+        # Concurrent tasks would interleave their deltas in the caller's stream.
+        _STREAM_SINK.set(None)
+        if priority is not None:
+            _REQUEST_PRIORITY.set(priority)
+        async with limit:
+            try:
+                return key, await task()
+            except Exception as e:
+                return key, f"Error: {e}"
+
+    running = [asyncio.create_task(run(key, task)) for key, task in tasks.items()]
+    results: dict[str, str] = {}
+    try:
+        for finished in asyncio.as_completed(running):
+            key, text = await finished
+            results[key] = text
+            if on_result:
+                on_result(key, text)
+    finally:
+        for pending in running:
+            pending.cancel()
+    return {key: results[key] for key in tasks}
+
+
+async def agenerate_instruction_methods(
+    course_title: str,
+    course_topics: str,
+    methods: list[str],
+    prompt_template: str | None = None,
+    bypass_cache: bool = False,
+    max_concurrency: int = METHOD_BATCH_CONCURRENCY,
+    on_result: Callable[[str, str], None] | None = None,
+) -> dict[str, str]:
+    """Generate elaborations for several instructional methods concurrently.
+
+    Returns {method_name: text}; *on_result(method_name, text)* fires as each
+    method finishes.  The calls are queued as BULK work.
+    """
+    tasks = {
+        method: (
+            lambda method=method: agenerate_instruction_method(
+                course_title, course_topics, method,
+                prompt_template=prompt_template, bypass_cache=bypass_cache,
+            )
+        )
+        for method in methods
+    }
+    return await _agenerate_batch(tasks, max_concurrency, on_result, priority=BULK)
+
+
+generate_instruction_methods = _sync(agenerate_instruction_methods)
+
+
+async def agenerate_assessment_methods(
+    course_title: str,
+    course_topics: str,
+    methods: list[str],
+    prompt_template: str | None = None,
+    num_days: int = 1,
+    bypass_cache: bool = False,
+    max_concurrency: int = METHOD_BATCH_CONCURRENCY,
+    on_result: Callable[[str, str], None] | None = None,
+) -> dict[str, str]:
+    """Generate elaborations for several assessment methods concurrently.
+
+    Returns {method_name: text}; *on_result(method_name, text)* fires as each
+    method finishes.  The calls are queued as BULK work.
+    """
+    tasks = {
+        method: (
+            lambda method=method: agenerate_assessment_method(
+                course_title, course_topics, method,
+                prompt_template=prompt_template, num_days=num_days,
+                bypass_cache=bypass_cache,
+            )
+        )
+        for method in methods
+    }
+    return await _agenerate_batch(tasks, max_concurrency, on_result, priority=BULK)
+
+
+generate_assessment_methods = _sync(agenerate_assessment_methods)
+
+
+# Max generations run at once by the five-way batch generators below.
+VARIANT_BATCH_CONCURRENCY = 5
+
+_SET_HEADING = re.compile(r"^\s*\**\s*set\s*\d+\s*:?\s*\**\s*\n", re.IGNORECASE)
+
+
+def _emit_section(text: str) -> None:
+    """Pass one finished section to the caller's stream, if any, as a single chunk."""
+    sink = _STREAM_SINK.get()
+    if sink is not None:
+        sink(text)
+
+
+def _raise_if_all_failed(results: dict[str, str]) -> None:
+    if results and all(text.startswith("Error: ") for text in results.values()):
+        raise RuntimeError(next(iter(results.values())).removeprefix("Error: "))
+
+
+@_track_generator
+async def agenerate_course_validation_set(
+    course: str,
+    industry: str,
+    learning_outcomes: str,
+    set_number: int,
+    prompt_template: str | None = None,
+    bypass_cache: bool = False,
+) -> str:
+    """Generate one course validation response set, written from the set's perspective."""
+    template = prompt_template or COURSE_VALIDATION_SET_PROMPT_TEMPLATE
+    perspectives = COURSE_VALIDATION_PERSPECTIVES
+    text = await _agenerate(
+        template,
+        bypass_cache=bypass_cache,
+        course=course,
+        industry=industry,
+        learning_outcomes=learning_outcomes,
+        set_number=str(set_number),
+        perspective=perspectives[(set_number - 1) % len(perspectives)],
+    )
+    return _SET_HEADING.sub("", text, count=1).strip()
+
+
+generate_course_validation_set = _sync(agenerate_course_validation_set)
+
+
+async def agenerate_course_validation_sets(
+    course: str,
+    industry: str,
+    learning_outcomes: str,
+    prompt_template: str | None = None,
+    num_sets: int = len(COURSE_VALIDATION_PERSPECTIVES),
+    bypass_cache: bool = False,
+    max_concurrency: int = VARIANT_BATCH_CONCURRENCY,
+    on_result: Callable[[int, str], None] | None = None,
+) -> str:
+    """Generate the course validation response sets as independent concurrent calls.
+
+    Set N is written from ``COURSE_VALIDATION_PERSPECTIVES[N - 1]`` (the
+    template's ``{set_number}`` and ``{perspective}``), so the sets differ
+    without seeing each other.  Returns the sets merged in order, in the same
+    ``Set N:`` format as :func:`generate_course_validation`.
+    *on_result(set_number, text)* fires as each set finishes, and a
+    surrounding stream receives each finished set as one chunk.  A failed set
+    is kept as an ``Error: ...`` entry; if every set fails the first error is
+    raised.
+    """
+    tasks = {
+        str(n): (
+            lambda n=n: agenerate_course_validation_set(
+                course, industry, learning_outcomes, n,
+                prompt_template=prompt_template, bypass_cache=bypass_cache,
+            )
+        )
+        for n in range(1, num_sets + 1)
+    }
+
+    def finished(key: str, text: str) -> None:
+        _emit_section(f"Set {key}:\n{text}\n\n")
+        if on_result:
+            on_result(int(key), text)
+
+    results = await _agenerate_batch(tasks, max_concurrency, finished)
+    _raise_if_all_failed(results)
+    return "\n\n".join(f"Set {key}:\n{text}" for key, text in results.items())
+
+
+generate_course_validation_sets = _sync(agenerate_course_validation_sets)
+
+
+async def agenerate_lu_sequencing_rationales(
+    course: str,
+    learning_outcomes: str,
+    course_outline: str,
+    sequencing_types: list[str] | None = None,
+    prompt_templates: dict[str, str | None] | None = None,
+    bypass_cache: bool = False,
+    max_concurrency: int = VARIANT_BATCH_CONCURRENCY,
+    on_result: Callable[[str, str], None] | None = None,
+) -> dict[str, str]:
+    """Generate LU sequencing rationales for several frameworks concurrently.
+
+    *sequencing_types* defaults to all of ``LU_SEQUENCING_TYPES``;
+    *prompt_templates* maps a type to an edited template.  Returns
+    {sequencing_type: text} in the order requested; *on_result(type, text)*
+    fires as each rationale finishes.
+    """
+    prompt_templates = prompt_templates or {}
+    tasks = {
+        sequencing_type: (
+            lambda sequencing_type=sequencing_type: agenerate_lu_sequencing_rationale(
+                course, learning_outcomes, course_outline, sequencing_type,
+                prompt_template=prompt_templates.get(sequencing_type),
+                bypass_cache=bypass_cache,
+            )
+        )
+        for sequencing_type in sequencing_types or LU_SEQUENCING_TYPES
+    }
+
+    def finished(sequencing_type: str, text: str) -> None:
+        _emit_section(f"{sequencing_type}:\n{text}\n\n")
+        if on_result:
+            on_result(sequencing_type, text)
+
+    return await _agenerate_batch(tasks, max_concurrency, finished)
+
+
+generate_lu_sequencing_rationales = _sync(agenerate_lu_sequencing_rationales)
+
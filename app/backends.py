@@ -0,0 +1,264 @@
+"""Pluggable backends that turn a rendered prompt into generated text.
+
+``ai_generator._generate_async`` hands every prompt to the active backend:
+
+- :class:`ClaudeCLIBackend` (the default) runs it on a warm pooled Claude CLI
+  session.
+- :class:`FixtureBackend` answers locally from canned responses keyed by
+  prompt template name, with configurable latency, jitter and failure
+  injection, so the app's own overhead (caching, pooling, pipeline, UI) can
+  be exercised and benchmarked on a machine with no network or Claude login.
+
+Set ``CP_GENERATOR_BACKEND=fixture`` before starting Streamlit to run the
+whole app against the fixture backend (see :func:`backend_from_env` for the
+tuning variables), or swap backends at runtime with
+``ai_generator.set_backend``.
+"""
+import asyncio
+import json
+import os
+import random
+from collections.abc import Callable
+from pathlib import Path
+from typing import Protocol
+
+from app import telemetry
+from app.session_pool import SessionPool
+
+
+class GenerationBackend(Protocol):
+    """Anything that can answer a prompt, optionally streaming text deltas."""
+
+    name: str
+
+    async def generate(
+        self, prompt: str, on_text: Callable[[str], None] | None = None, template: str = ""
+    ) -> str:
+        """Return the full response to *prompt*, passing deltas to *on_text*.
+
+        *template* is the name of the prompt template the prompt was rendered
+        from (e.g. ``"ABOUT_COURSE_PROMPT_TEMPLATE"``), or ``"custom"``.
+        """
+        ...
+
+    async def probe(self) -> None:
+        """Check cheaply, without generating, that the backend can serve prompts; raise if not."""
+        ...
+
+    async def aclose(self) -> None:
+        """Release any resources held by the backend."""
+        ...
+
+
+class ClaudeCLIBackend:
+    """Generate on warm Claude CLI sessions from a :class:`SessionPool`."""
+
+    name = "claude-cli"
+
+    def __init__(self, pool: SessionPool) -> None:
+        self.pool = pool
+
+    async def generate(
+        self, prompt: str, on_text: Callable[[str], None] | None = None, template: str = ""
+    ) -> str:
+        return await self.pool.generate(prompt, on_text, telemetry.mark_dispatched)
+
+    async def probe(self) -> None:
+        await self.pool.probe()
+
+    async def aclose(self) -> None:
+        await self.pool.aclose()
+
+
+class FixtureError(RuntimeError):
+    """Failure injected by :class:`FixtureBackend`."""
+
+
+_FIXTURE_BULLETS = [
+    "Explain the core concepts and terminology of the subject",
+    "Apply recommended practices to realistic workplace scenarios",
+    "Evaluate options using structured criteria and evidence",
+    "Develop an action plan for implementation in the organisation",
+]
+
+_COURSE_OUTLINE_FIXTURE = "\n".join(
+    ["(1) The list of topics covered in this course"]
+    + [f"T{i}: Topic {i} - {bullet}." for i, bullet in enumerate(_FIXTURE_BULLETS, 1)]
+    + ["", "(2) Instructional methods",
+       "Interactive Presentation - Trainer introduces concepts with worked examples.",
+       "Case Study - Learners analyse workplace cases in small groups.",
+       "", "(3) Duration for each topic"]
+    + [f"Topic {i}: 120mins" for i in range(1, len(_FIXTURE_BULLETS) + 1)]
+)
+
+_ABOUT_COURSE_FIXTURE = (
+    "This course equips learners with the knowledge and practical skills to apply "
+    "the subject confidently at work. Through guided activities and case studies, "
+    "learners build the judgement needed to plan, implement and review improvements "
+    "in their organisation."
+)
+
+_BACKGROUND_PART_A_FIXTURE = " ".join([
+    "Organisations in Singapore are under sustained pressure to adopt new practices",
+    "that raise productivity and keep pace with changing customer expectations.",
+    "Industry transformation maps and sector skills frameworks consistently point to",
+    "a shortage of staff who can translate these practices into daily operations.",
+    "Employers report that existing training is often too theoretical, leaving",
+    "workers unsure how to apply concepts to their own processes and tools.",
+    "At the same time, regulators and customers expect higher standards of quality,",
+    "accountability and data-driven decision making.",
+    "These trends create a clear need for practical, job-relevant training that",
+    "builds confidence as well as knowledge.",
+    "Workers who can evaluate options, plan implementation and measure outcomes",
+    "are increasingly valued across roles and industries.",
+    "This course responds to that need by combining core concepts with realistic",
+    "workplace scenarios, so that learners leave able to contribute immediately",
+    "to their organisation's transformation efforts.",
+])
+
+_BACKGROUND_PART_B_FIXTURE = "\n".join([
+    "Current training offerings focus largely on theory and do not give learners "
+    "enough practice applying the subject to their own workplace.",
+    "",
+    "The gap was identified through employer feedback, job postings and the "
+    "relevant Skills Framework.",
+    "",
+    "Learners who complete this course will be able to:",
+] + [f"- {bullet}" for bullet in _FIXTURE_BULLETS])
+
+DEFAULT_FIXTURES: dict[str, str] = {
+    "ABOUT_COURSE_PROMPT_TEMPLATE": _ABOUT_COURSE_FIXTURE,
+    "WHAT_YOULL_LEARN_PROMPT_TEMPLATE": "\n".join(f"• {bullet}." for bullet in _FIXTURE_BULLETS),
+    "BACKGROUND_PART_A_PROMPT_TEMPLATE": _BACKGROUND_PART_A_FIXTURE,
+    "BACKGROUND_PART_B_PROMPT_TEMPLATE": _BACKGROUND_PART_B_FIXTURE,
+    "COMBINED_SECTIONS_PROMPT_TEMPLATE": json.dumps({
+        "about_course": _ABOUT_COURSE_FIXTURE,
+        "what_youll_learn": "\n".join(f"• {bullet}." for bullet in _FIXTURE_BULLETS),
+        "background_part_a": _BACKGROUND_PART_A_FIXTURE,
+        "background_part_b": _BACKGROUND_PART_B_FIXTURE,
+    }),
+    "LEARNING_OUTCOME_PROMPT_TEMPLATE": "\n\n".join(
+        f"T{i}: Topic {i}\nLO{i}: {bullet}." for i, bullet in enumerate(_FIXTURE_BULLETS, 1)
+    ),
+    "COURSE_TOPICS_PROMPT_TEMPLATE": "\n\n".join(
+        f"## Topic {i}: Topic {i}\n" + "\n".join(f"- {b}  " for b in _FIXTURE_BULLETS[:3])
+        for i in range(1, len(_FIXTURE_BULLETS) + 1)
+    ),
+    "JOB_ROLES_PROMPT_TEMPLATE": ", ".join(
+        f"{role} {level}"
+        for level in ("Executive", "Manager")
+        for role in ("Operations", "Business Development", "Project", "Quality", "Training")
+    ),
+    "COURSE_TITLE_SUGGESTIONS_PROMPT_TEMPLATE": "\n".join(
+        f"{i}. Course Title Suggestion {i}" for i in range(1, 21)
+    ),
+    "COURSE_OUTLINE_PROMPT_TEMPLATE": _COURSE_OUTLINE_FIXTURE,
+    "_CONDENSE_TEMPLATE": _COURSE_OUTLINE_FIXTURE,
+}
+DEFAULT_RESPONSE = "Fixture response for {template}."
+
+
+class FixtureBackend:
+    """Deterministic local stand-in for the model.
+
+    Each call sleeps for a latency drawn uniformly from
+    ``latency ± jitter`` seconds (``ttft`` of it before the first delta),
+    streams the canned response for its template in ``chunks`` pieces, and
+    fails with :class:`FixtureError` with probability ``failure_rate`` or
+    always for templates in ``fail_templates``.  A fixed ``seed`` makes
+    latencies and failures reproducible.
+    """
+
+    name = "fixture"
+
+    def __init__(
+        self,
+        responses: dict[str, str] | None = None,
+        latency: float = 1.0,
+        jitter: float = 0.0,
+        ttft: float = 0.2,
+        chunks: int = 8,
+        failure_rate: float = 0.0,
+        fail_templates: set[str] | frozenset[str] = frozenset(),
+        seed: int | None = None,
+    ) -> None:
+        self.responses = {**DEFAULT_FIXTURES, **(responses or {})}
+        self.latency = latency
+        self.jitter = jitter
+        self.ttft = ttft
+        self.chunks = max(1, chunks)
+        self.failure_rate = failure_rate
+        self.fail_templates = set(fail_templates)
+        self.calls = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+
+    def response_for(self, template: str) -> str:
+        return self.responses.get(template) or DEFAULT_RESPONSE.format(template=template or "custom")
+
+    async def generate(
+        self, prompt: str, on_text: Callable[[str], None] | None = None, template: str = ""
+    ) -> str:
+        self.calls += 1
+        telemetry.mark_dispatched()
+        total = max(0.0, self._random.uniform(self.latency - self.jitter, self.latency + self.jitter))
+        fail = template in self.fail_templates or self._random.random() < self.failure_rate
+        first = min(self.ttft, total)
+        await asyncio.sleep(first)
+        if fail:
+            self.failures += 1
+            raise FixtureError(f"Injected failure for {template or 'custom'} prompt")
+
+        text = self.response_for(template)
+        step = -(-len(text) // self.chunks)
+        pieces = [text[i:i + step] for i in range(0, len(text), step)] or [""]
+        gap = (total - first) / len(pieces)
+        for piece in pieces:
+            if on_text:
+                on_text(piece)
+            await asyncio.sleep(gap)
+        return text
+
+    async def probe(self) -> None:
+        if self.failure_rate >= 1:
+            raise FixtureError("Injected failure for health probe")
+
+    async def aclose(self) -> None:
+        pass
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name, "").strip()
+    return float(value) if value else default
+
+
+def backend_from_env() -> FixtureBackend | None:
+    """Build the backend selected by ``CP_GENERATOR_BACKEND``, or None for the default.
+
+    ``CP_GENERATOR_BACKEND=fixture`` selects :class:`FixtureBackend`, tuned by
+    ``CP_FIXTURE_LATENCY``, ``CP_FIXTURE_JITTER``, ``CP_FIXTURE_TTFT``,
+    ``CP_FIXTURE_FAILURE_RATE`` and ``CP_FIXTURE_SEED``;
+    ``CP_FIXTURE_FAIL_TEMPLATES`` is a comma-separated list of template names
+    that always fail and ``CP_FIXTURE_FILE`` a JSON object of
+    template name -> response overriding the built-in fixtures.
+    """
+    kind = os.environ.get("CP_GENERATOR_BACKEND", "").strip().lower()
+    if kind in ("", "claude", "claude-cli"):
+        return None
+    if kind != "fixture":
+        raise ValueError(f"Unknown CP_GENERATOR_BACKEND {kind!r}; expected 'claude-cli' or 'fixture'")
+    responses = None
+    fixture_file = os.environ.get("CP_FIXTURE_FILE", "").strip()
+    if fixture_file:
+        responses = json.loads(Path(fixture_file).read_text(encoding="utf-8"))
+    seed = os.environ.get("CP_FIXTURE_SEED", "").strip()
+    fail_templates = os.environ.get("CP_FIXTURE_FAIL_TEMPLATES", "")
+    return FixtureBackend(
+        responses=responses,
+        latency=_env_float("CP_FIXTURE_LATENCY", 1.0),
+        jitter=_env_float("CP_FIXTURE_JITTER", 0.0),
+        ttft=_env_float("CP_FIXTURE_TTFT", 0.2),
+        failure_rate=_env_float("CP_FIXTURE_FAILURE_RATE", 0.0),
+        fail_templates={name.strip() for name in fail_templates.split(",") if name.strip()},
+        seed=int(seed) if seed else None,
+    )
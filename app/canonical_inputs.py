@@ -0,0 +1,84 @@
+"""Canonical forms of course titles and topic lists for response cache keys.
+
+Cohorts of the same course are often entered with cosmetic differences:
+extra spaces or blank lines, different casing, "T1:" instead of
+"## Topic 1:", "*" instead of "-" bullets, or the bullets of a topic in a
+different order.  Each variant used to render a different prompt and so pay
+for a full generation.  ``_agenerate`` now builds its cache key from the
+prompt rendered with :func:`canonicalise_inputs`, so such variants share one
+cached response; the model itself still sees the text as entered.
+
+Topic order, topic names and bullet wording are kept: only formatting and
+the order of bullets within a topic are normalised.
+"""
+import re
+import unicodedata
+
+# Format arguments holding a course title or a topic list.
+TITLE_FIELDS = frozenset({"course_title", "course"})
+TOPIC_FIELDS = frozenset({"course_topics"})
+
+_TRANSLATE = str.maketrans({
+    "–": "-", "—": "-", "−": "-",
+    "‘": "'", "’": "'", "“": '"', "”": '"',
+})
+# "## Topic 1: Name", "Topic 1 - Name", "T1: Name", "T1. Name", "LU1: Name"
+_TOPIC_HEADER = re.compile(r"^#*\s*(?:topic|t|lu)\s*(\d+)\s*(?:[:.)\-]\s*|\s+)(.*)$")
+_MARKDOWN_HEADER = re.compile(r"^#+\s*(.*)$")
+# "-", "*", "•", "1.", "1)", "a)" bullet markers
+_BULLET = re.compile(r"^(?:[-*•·]|\d+[.)]|[a-z][.)])\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s.;:,]+$")
+
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).translate(_TRANSLATE).casefold()
+    return " ".join(text.split())
+
+
+def canonical_title(title: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a course title."""
+    return _TRAILING_PUNCTUATION.sub("", _fold(title))
+
+
+def canonical_topics(topics: str) -> str:
+    """Canonical form of a Course Topics list.
+
+    Every topic header becomes ``topic N: name``; lines under a topic become
+    ``- item`` lines, sorted; blank lines and bullet/number styles are dropped.
+    """
+    blocks: list[tuple[str, list[str]]] = [("", [])]
+    for raw in topics.splitlines():
+        line = _fold(raw)
+        if not line:
+            continue
+        header = _TOPIC_HEADER.match(line)
+        if header:
+            name = _TRAILING_PUNCTUATION.sub("", header.group(2))
+            blocks.append((f"topic {int(header.group(1))}: {name}", []))
+            continue
+        markdown = _MARKDOWN_HEADER.match(line)
+        if markdown:
+            blocks.append((f"# {_TRAILING_PUNCTUATION.sub('', markdown.group(1))}", []))
+            continue
+        item = _TRAILING_PUNCTUATION.sub("", _BULLET.sub("", line))
+        if item:
+            blocks[-1][1].append(item)
+    lines: list[str] = []
+    for header, items in blocks:
+        if header:
+            lines.append(header)
+        lines.extend(f"- {item}" for item in sorted(items))
+    return "\n".join(lines)
+
+
+def canonicalise_inputs(format_kwargs: dict[str, str]) -> dict[str, str]:
+    """Return *format_kwargs* with title and topic fields in canonical form."""
+    canonical = dict(format_kwargs)
+    for name, value in format_kwargs.items():
+        if not isinstance(value, str):
+            continue
+        if name in TITLE_FIELDS:
+            canonical[name] = canonical_title(value)
+        elif name in TOPIC_FIELDS:
+            canonical[name] = canonical_topics(value)
+    return canonical
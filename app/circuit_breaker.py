@@ -0,0 +1,188 @@
+"""Backend health: a circuit breaker in front of every model call.
+
+When the Claude CLI is missing or not logged in, every generation used to
+wait for the session handshake (and its retries) to fail, then record
+another traceback.  :class:`CircuitBreaker` tracks the backend's health as a
+three-state machine:
+
+- CLOSED: calls go through.  ``failure_threshold`` consecutive calls that
+  fail because of the backend (after their retries) open the circuit.
+- OPEN: calls fail at once with :class:`BackendUnavailable`.  Every
+  ``probe_interval`` seconds a cheap probe runs (for the CLI backend: start
+  a session and complete the handshake, without sending a prompt); when it
+  succeeds the circuit becomes half-open.
+- HALF_OPEN: one trial call is let through while the others still fail
+  fast.  If it succeeds the circuit closes; if it fails it opens again.
+
+Calls that end without a verdict on the backend (cancelled, or failed for
+a reason the caller's *is_failure* rejects) release the trial slot without
+changing state.  All methods run on the shared event loop
+(``app.event_loop``); :meth:`CircuitBreaker.snapshot` may be read from any
+thread.
+"""
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_PROBE_INTERVAL = 30.0
+DEFAULT_PROBE_TIMEOUT = 20.0
+
+
+class BackendUnavailable(RuntimeError):
+    """Raised instead of calling a backend the circuit breaker considers unhealthy."""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open health state for one generation backend.
+
+    *probe* checks the backend without generating (raising if it is
+    unhealthy).  *failure_threshold* of 0 disables the breaker.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], Awaitable[None]],
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        probe_interval: float = DEFAULT_PROBE_INTERVAL,
+        probe_timeout: float = DEFAULT_PROBE_TIMEOUT,
+    ) -> None:
+        self.probe = probe
+        self.failure_threshold = max(0, failure_threshold)
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.state = CLOSED
+        self.failures = 0               # consecutive backend failures
+        self.last_error = ""
+        self.opened_at: float | None = None     # wall-clock time the circuit last opened
+        self.next_probe_at: float | None = None
+        self.opened = 0
+        self.fast_failed = 0
+        self.probes = 0
+        self._trial = False
+        self._prober: asyncio.Task | None = None
+
+    # --- Admission ---------------------------------------------------------
+
+    def admit(self) -> None:
+        """Let a call through, or raise :class:`BackendUnavailable` at once."""
+        if self.state == CLOSED:
+            return
+        if self.state == HALF_OPEN and not self._trial:
+            self._trial = True
+            return
+        self.fast_failed += 1
+        raise BackendUnavailable(
+            "The AI backend is unavailable, so this request was not sent. "
+            f"Last error: {self.last_error or 'unknown'}"
+        )
+
+    @contextlib.asynccontextmanager
+    async def guard(self, is_failure: Callable[[Exception], bool]) -> AsyncIterator[None]:
+        """Admit one call and record its outcome.
+
+        Exceptions for which *is_failure* is True count against the backend;
+        other exceptions and cancellation leave the state unchanged.
+        """
+        self.admit()
+        try:
+            yield
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure(e)
+            else:
+                self._trial = False
+            raise
+        except BaseException:
+            self._trial = False
+            raise
+        else:
+            self.record_success()
+
+    def record_success(self) -> None:
+        self.state, self.failures, self._trial = CLOSED, 0, False
+        self.opened_at = self.next_probe_at = None
+        self._stop_prober()
+
+    def record_failure(self, error: BaseException) -> None:
+        self.failures += 1
+        self.last_error = str(error).splitlines()[0] if str(error) else type(error).__name__
+        self._trial = False
+        if self.state == HALF_OPEN or (
+            self.failure_threshold and self.failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def reset(self) -> None:
+        """Forget the backend's history (e.g. after switching backends)."""
+        self.record_success()
+        self.last_error = ""
+
+    async def aclose(self) -> None:
+        """Stop the periodic probe before the loop shuts down."""
+        prober, self._prober = self._prober, None
+        if prober is not None and prober is not asyncio.current_task():
+            prober.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await prober
+
+    # --- Probing -----------------------------------------------------------
+
+    def _stop_prober(self) -> None:
+        """Cancel the periodic probe once the circuit is no longer open."""
+        prober, self._prober = self._prober, None
+        if prober is not None and prober is not asyncio.current_task():
+            prober.cancel()
+
+    def _open(self) -> None:
+        if self.state != OPEN:
+            self.opened += 1
+            self.opened_at = time.time()
+        self.state = OPEN
+        self.next_probe_at = time.time() + self.probe_interval
+        if self._prober is None or self._prober.done():
+            self._prober = asyncio.get_running_loop().create_task(self._probe_while_open())
+
+    async def _probe_while_open(self) -> None:
+        while self.state == OPEN:
+            await asyncio.sleep(max(0.0, self.next_probe_at - time.time()))
+            if self.state == OPEN and time.time() >= self.next_probe_at:
+                await self.probe_now()
+
+    async def probe_now(self) -> bool:
+        """Probe the backend now if the circuit is open; return True unless it stays open."""
+        if self.state != OPEN:
+            return True
+        self.probes += 1
+        try:
+            async with asyncio.timeout(self.probe_timeout):
+                await self.probe()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            message = str(e) or f"no response within {self.probe_timeout:g}s"
+            self.last_error = f"health check failed: {message.splitlines()[0]}"
+            self.next_probe_at = time.time() + self.probe_interval
+            return False
+        if self.state == OPEN:
+            self.state, self._trial = HALF_OPEN, False
+            self.next_probe_at = None
+            self._stop_prober()
+        return True
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "opened_at": self.opened_at,
+            "next_probe_at": self.next_probe_at,
+            "opened": self.opened,
+            "fast_failed": self.fast_failed,
+            "probes": self.probes,
+        }
@@ -0,0 +1,93 @@
+"""Locating the Claude Code CLI executable.
+
+Discovery scans the native installer directory, the npm global bin and PATH,
+which is slow enough on Windows to show up in app start-up.  It now runs on
+first use only, and its result is remembered in
+``settings/config/claude_cli.json`` together with the modification times of
+the paths it depends on; a later run reuses the cached path until one of
+those changes (e.g. a CLI upgrade installs a new version directory).
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+
+DEFAULT_CLI_CACHE_PATH = Path(__file__).resolve().parent.parent / "settings" / "config" / "claude_cli.json"
+
+
+def _native_dir() -> Path:
+    return Path(os.path.expanduser("~")) / "AppData" / "Roaming" / "Claude" / "claude-code"
+
+
+def find_claude_cli() -> str | None:
+    """Find Claude Code CLI executable path.
+
+    Note: ``AppData/Local/AnthropicClaude/claude.exe`` is the Claude DESKTOP
+    app, not the CLI — driving it via the Agent SDK hangs on the initialize
+    handshake, so we deliberately do NOT look there.
+    """
+    home = Path(os.path.expanduser("~"))
+
+    # Pick the highest-numbered installed CLI version under the native installer dir.
+    native_dir = _native_dir()
+    if native_dir.is_dir():
+        versions = []
+        for child in native_dir.iterdir():
+            exe = child / "claude.exe"
+            if exe.exists():
+                parts = child.name.split(".")
+                try:
+                    key = tuple(int(p) for p in parts)
+                except ValueError:
+                    key = (0,)
+                versions.append((key, exe))
+        if versions:
+            versions.sort()
+            return str(versions[-1][1])
+
+    # npm global install fallback
+    npm_cmd = home / "AppData" / "Roaming" / "npm" / "claude.cmd"
+    if npm_cmd.exists():
+        return str(npm_cmd)
+
+    # PATH fallback
+    claude_in_path = shutil.which("claude")
+    if claude_in_path:
+        return claude_in_path
+
+    return None
+
+
+def _mtimes(path: str) -> dict[str, float | None]:
+    """Modification times of the found executable and the native install dir."""
+    mtimes: dict[str, float | None] = {}
+    for watched in (Path(path), _native_dir()):
+        try:
+            mtimes[str(watched)] = watched.stat().st_mtime
+        except OSError:
+            mtimes[str(watched)] = None
+    return mtimes
+
+
+def locate_claude_cli(cache_path: Path = DEFAULT_CLI_CACHE_PATH) -> str | None:
+    """Return the CLI path, from the on-disk cache when it is still valid.
+
+    Only successful discoveries are cached, so installing the CLI after a
+    failed lookup is picked up on the next start.
+    """
+    cache_path = Path(cache_path)
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if cached["mtimes"] == _mtimes(cached["path"]) and Path(cached["path"]).exists():
+            return cached["path"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    path = find_claude_cli()
+    if path:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps({"path": path, "mtimes": _mtimes(path)}), encoding="utf-8")
+        except OSError:
+            pass
+    return path
@@ -0,0 +1,136 @@
+"""One long-lived asyncio event loop shared by all AI generation.
+
+Streamlit runs each page script on its own thread.  Calling ``asyncio.run``
+per request created and tore down an event loop (and on Windows reset the
+Proactor policy) every time, and nothing created on one loop could be reused
+by the next.  Instead a single loop runs forever on a daemon thread; any
+thread hands it coroutines with :func:`submit` (returns a
+``concurrent.futures.Future``) or :func:`run` (blocks for the result), so
+calls from different script runs overlap on the same loop and share its
+warm resources such as the CLI session pool.
+
+A :class:`CancelToken` passed to :func:`run` lets another thread abandon the
+call: cancelling the token cancels the coroutine's task on the loop and the
+blocked caller gets ``concurrent.futures.CancelledError``.  A token created
+with a *parent* is also cancelled when its parent is.
+"""
+import asyncio
+import concurrent.futures
+import os
+import threading
+import weakref
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+_loop: asyncio.AbstractEventLoop | None = None
+_thread: threading.Thread | None = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared loop, starting its thread on first use."""
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            # Windows requires the Proactor loop for subprocess support.
+            if os.name == "nt":
+                asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=_loop.run_forever, name="ai-event-loop", daemon=True)
+            _thread.start()
+        return _loop
+
+
+def is_running() -> bool:
+    """Return True once the shared loop has been started and not shut down."""
+    return _loop is not None and _loop.is_running()
+
+
+def in_loop_thread() -> bool:
+    """Return True when called from the shared loop's own thread."""
+    return _thread is not None and threading.current_thread() is _thread
+
+
+class CancelToken:
+    """Cancels every :func:`run` call made with it, now or later."""
+
+    def __init__(self, parent: "CancelToken | None" = None) -> None:
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._futures: set[concurrent.futures.Future] = set()
+        self._children: weakref.WeakSet[CancelToken] = weakref.WeakSet()
+        if parent is not None:
+            with parent._lock:
+                parent._children.add(self)
+                self._cancelled = parent._cancelled
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._cancelled = True
+            futures = list(self._futures)
+            children = list(self._children)
+        for future in futures:
+            future.cancel()
+        for child in children:
+            child.cancel()
+
+    def track(self, future: concurrent.futures.Future) -> None:
+        """Cancel *future* when this token is cancelled (at once if it already is)."""
+        with self._lock:
+            if not self._cancelled:
+                self._futures.add(future)
+                return
+        future.cancel()
+
+    def untrack(self, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+
+def submit(coro: Coroutine[Any, Any, T]) -> concurrent.futures.Future[T]:
+    """Schedule *coro* on the shared loop from any thread."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run(
+    coro: Coroutine[Any, Any, T],
+    timeout: float | None = None,
+    token: CancelToken | None = None,
+) -> T:
+    """Run *coro* on the shared loop and block the calling thread for its result.
+
+    Raises ``concurrent.futures.CancelledError`` if *token* is cancelled first.
+    """
+    if in_loop_thread():
+        coro.close()
+        raise RuntimeError("event_loop.run() would deadlock when called from the loop thread")
+    future = submit(coro)
+    if token is not None:
+        token.track(future)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+    finally:
+        if token is not None:
+            token.untrack(future)
+
+
+def shutdown(timeout: float = 5.0) -> None:
+    """Stop the shared loop and wait briefly for its thread to exit."""
+    global _loop, _thread
+    with _lock:
+        loop, thread = _loop, _thread
+        _loop = _thread = None
+    if loop is None or not loop.is_running():
+        return
+    loop.call_soon_threadsafe(loop.stop)
+    if thread is not None:
+        thread.join(timeout)
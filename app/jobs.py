@@ -0,0 +1,287 @@
+"""Background generation jobs that outlive a Streamlit script run.
+
+Generating inline under ``st.spinner`` ties the model call to one script
+run: clicking any widget or changing page starts a rerun, the result is
+never stored and the quota spent on it is wasted.  A :class:`JobRunner`
+instead runs each submitted generation on its own worker pool, records it in
+a SQLite ``jobs`` table (status, timings, result or error) and keeps the
+text streamed so far in memory, so any later script run can poll the job
+and attach the result to the session once it is done.
+
+Jobs left queued or running by a previous server process are marked
+``interrupted`` when the store is opened.  A job submitted with a *cancel*
+callback can be stopped with :meth:`JobRunner.cancel`; it ends ``cancelled``.
+"""
+import contextlib
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from app.resilience import RESTART
+
+DEFAULT_JOBS_PATH = Path(__file__).resolve().parent.parent / "settings" / "config" / "jobs.db"
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_KEEP_SECONDS = 7 * 24 * 3600   # finished jobs older than this are purged
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+INTERRUPTED = "interrupted"
+CANCELLED = "cancelled"
+ACTIVE = frozenset({QUEUED, RUNNING})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    label TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs (owner, created_at);
+"""
+_COLUMNS = "id, owner, label, status, created_at, started_at, finished_at, result, error"
+
+
+@dataclass
+class Job:
+    """One submitted generation; times are UNIX timestamps."""
+    id: str
+    owner: str
+    label: str
+    status: str
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: str | None = None
+    error: str = ""
+    partial_text: str = ""   # streamed so far (running jobs only)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since submission, or the submission-to-finish time once finished."""
+        return (self.finished_at or time.time()) - self.created_at
+
+
+class JobStore:
+    """SQLite table of jobs, shared by every session of the server process."""
+
+    def __init__(self, path: Path = DEFAULT_JOBS_PATH, keep_seconds: float = DEFAULT_KEEP_SECONDS) -> None:
+        self.path = Path(path)
+        self.keep_seconds = keep_seconds
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE status IN (?, ?)",
+                    (INTERRUPTED, time.time(), "The server restarted before this job finished.", QUEUED, RUNNING),
+                )
+                self._conn.execute(
+                    "DELETE FROM jobs WHERE created_at < ?", (time.time() - self.keep_seconds,)
+                )
+        return self._conn
+
+    def insert(self, job: Job) -> None:
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                f"INSERT INTO jobs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.owner, job.label, job.status, job.created_at,
+                 job.started_at, job.finished_at, job.result, job.error),
+            )
+
+    def update(self, job_id: str, **fields) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._connection() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return Job(*row) if row else None
+
+    def for_owner(self, owner: str, limit: int = 50) -> list[Job]:
+        """The owner's newest jobs first."""
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE owner = ? ORDER BY created_at DESC LIMIT ?",
+                (owner, limit),
+            ).fetchall()
+        return [Job(*row) for row in rows]
+
+
+class JobRunner:
+    """Runs submitted callables on daemon worker threads and tracks them in a :class:`JobStore`.
+
+    Workers are daemon threads so that a job still waiting on the model does
+    not hold up server shutdown; it is reported as interrupted next start.
+    """
+
+    def __init__(self, store: JobStore | None = None, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+        self.store = store or JobStore()
+        self.max_workers = max(1, max_workers)
+        self._queue: queue.Queue = queue.Queue()
+        self._workers: list[threading.Thread] = []
+        self._partial: dict[str, list[str]] = {}
+        self._cancel: dict[str, Callable[[], None]] = {}
+        self._cancelled: set[str] = set()
+        self._finishing: set[str] = set()    # past the point where cancel() can stop them
+        self._unsaved: dict[str, dict] = {}  # final states the store refused; retried by get()
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        owner: str,
+        label: str,
+        fn: Callable[[Callable[[str], None]], str],
+        cancel: Callable[[], None] | None = None,
+    ) -> str:
+        """Queue ``fn(on_text)`` and return the new job's id.
+
+        *fn* receives a callback for the text it streams, which is exposed as
+        :attr:`Job.partial_text` while the job runs (:data:`resilience.RESTART`
+        discards the text so far); it must return text (any other result
+        fails the job).  *cancel* is called by
+        :meth:`cancel` and should make a running *fn* raise promptly.
+        """
+        job = Job(id=uuid.uuid4().hex, owner=owner, label=label, status=QUEUED, created_at=time.time())
+        self.store.insert(job)
+        with self._lock:
+            self._partial[job.id] = []
+            if cancel is not None:
+                self._cancel[job.id] = cancel
+            if len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, name=f"cp-job-{len(self._workers)}", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+        self._queue.put((job.id, fn))
+        return job.id
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                self._run(*item)
+            except Exception:
+                pass   # the job store is unusable; keep the worker for later jobs
+
+    def _run(self, job_id: str, fn: Callable[[Callable[[str], None]], str]) -> None:
+        try:
+            with self._lock:
+                if job_id in self._cancelled:
+                    return   # cancelled while queued
+                chunks = self._partial[job_id]
+
+            def on_text(text: str) -> None:
+                if text is RESTART:
+                    chunks.clear()
+                else:
+                    chunks.append(text)
+
+            try:
+                self.store.update(job_id, status=RUNNING, started_at=time.time())
+                result = fn(on_text)
+                if not isinstance(result, str):
+                    raise TypeError(f"The job returned {type(result).__name__}, not text")
+            except Exception as e:
+                if self._claim(job_id):
+                    self._finish(job_id, status=FAILED, error=str(e) or type(e).__name__)
+            else:
+                if self._claim(job_id):
+                    self._finish(job_id, status=DONE, result=result)
+        finally:
+            with self._lock:
+                self._partial.pop(job_id, None)
+                self._cancel.pop(job_id, None)
+                self._cancelled.discard(job_id)
+                self._finishing.discard(job_id)
+
+    def _claim(self, job_id: str) -> bool:
+        """Take a job out of :meth:`cancel`'s reach; False if it was cancelled first."""
+        with self._lock:
+            if job_id in self._cancelled:
+                return False
+            self._finishing.add(job_id)
+            return True
+
+    def _finish(self, job_id: str, **fields) -> None:
+        """Record a job's final state, or FAILED if that write itself fails.
+
+        If the store refuses both writes, the FAILED state is kept in memory
+        (so :meth:`get` reports it) and written by a later :meth:`get`.
+        """
+        try:
+            self.store.update(job_id, finished_at=time.time(), **fields)
+            return
+        except Exception as e:
+            fields = {
+                "status": FAILED, "finished_at": time.time(),
+                "error": f"Could not save the job's result: {str(e) or type(e).__name__}",
+            }
+        try:
+            self.store.update(job_id, **fields)
+        except Exception:
+            with self._lock:
+                self._unsaved[job_id] = fields
+
+    def cancel(self, job_id: str) -> bool:
+        """Stop a queued or running job; return False if it had already finished."""
+        with self._lock:
+            if job_id not in self._partial or job_id in self._cancelled or job_id in self._finishing:
+                return False
+            self._cancelled.add(job_id)
+            cancel = self._cancel.get(job_id)
+        self.store.update(job_id, status=CANCELLED, finished_at=time.time(), error="Cancelled.")
+        if cancel is not None:
+            cancel()
+        return True
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            unsaved = self._unsaved.get(job_id)
+        if unsaved is not None:
+            with contextlib.suppress(Exception):
+                self.store.update(job_id, **unsaved)
+                with self._lock:
+                    self._unsaved.pop(job_id, None)
+                unsaved = None
+        job = self.store.get(job_id)
+        if job is not None and unsaved is not None:
+            return replace(job, **unsaved)
+        if job is not None and job.active:
+            with self._lock:
+                job.partial_text = "".join(self._partial.get(job_id, ()))
+        return job
+
+    def jobs(self, owner: str, limit: int = 50) -> list[Job]:
+        return self.store.for_owner(owner, limit)
+
+    def shutdown(self) -> None:
+        """Stop idle workers; jobs still running are abandoned with the process."""
+        with self._lock:
+            for _ in self._workers:
+                self._queue.put(None)
+            self._workers.clear()
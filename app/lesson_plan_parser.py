@@ -0,0 +1,131 @@
+"""Incremental parser for AI-generated lesson plans.
+
+The lesson plan prompt asks for plain text of the form::
+
+    Day 1 (9:00 AM - 6:00 PM)
+
+    9:00 AM - 12:30 PM | T1: Introduction to Business Innovation
+    Duration: 210 mins
+    • Explain the evolution of business innovation
+    Instructional Method: Interactive presentation
+
+:class:`LessonPlanParser` accepts that text in arbitrary chunks as it streams
+from the model and returns each time-slot row as soon as it is complete: once
+its duration and instructional method have both arrived, or when the next
+slot, the next day or the end of the text closes it.  Lines that fit none of
+the expected shapes are collected in :attr:`LessonPlanParser.malformed`
+instead of being dropped silently.
+"""
+import re
+from dataclasses import dataclass
+
+_DAY_RE = re.compile(r"Day\s+(\d+)")
+_SLOT_RE = re.compile(r"(\d{1,2}:\d{2}\s*(?:AM|PM))\s*-\s*(\d{1,2}:\d{2}\s*(?:AM|PM))\s*\|\s*(.+)")
+_DURATION_RE = re.compile(r"Duration:\s*(.+)")
+_METHOD_RE = re.compile(r"Instructional Method:\s*(.+)")
+_BULLET_RE = re.compile(r"(?:[•\-*–]|\d+[.)])\s*")
+_SLOT_LIKE_RE = re.compile(r"\d{1,2}:\d{2}|\|")
+
+
+@dataclass
+class MalformedLine:
+    line_no: int   # 1-based, counting blank lines
+    text: str
+    reason: str
+
+
+class LessonPlanParser:
+    """Builds ``{day_num: [{"timing", "duration", "description", "methods"}, ...]}``
+    from streamed lesson plan text."""
+
+    def __init__(self) -> None:
+        self.schedule: dict[int, list[dict]] = {}
+        self.malformed: list[MalformedLine] = []
+        self._buffer = ""
+        self._line_no = 0
+        self._day = 0
+        self._entry: dict | None = None
+        self._entry_emitted = False
+        self._closed = False
+
+    def feed(self, chunk: str) -> list[tuple[int, dict]]:
+        """Add streamed text; return the ``(day, row)`` pairs completed by it."""
+        if self._closed:
+            raise ValueError("feed() called after close()")
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        completed: list[tuple[int, dict]] = []
+        for line in lines:
+            self._parse_line(line, completed)
+        return completed
+
+    def close(self) -> list[tuple[int, dict]]:
+        """Flush the last (unterminated) line and the open row."""
+        completed: list[tuple[int, dict]] = []
+        if not self._closed:
+            self._closed = True
+            if self._buffer:
+                self._parse_line(self._buffer, completed)
+                self._buffer = ""
+            self._finish_entry(completed)
+        return completed
+
+    def _parse_line(self, line: str, completed: list[tuple[int, dict]]) -> None:
+        self._line_no += 1
+        line = line.strip()
+        if not line:
+            return
+
+        day_match = _DAY_RE.match(line)
+        if day_match:
+            self._finish_entry(completed)
+            self._day = int(day_match.group(1))
+            self.schedule[self._day] = []
+            return
+
+        slot_match = _SLOT_RE.match(line)
+        if slot_match:
+            self._finish_entry(completed)
+            if self._day == 0:
+                self._report(line, "time slot before the first Day header")
+                return
+            self._entry = {
+                "timing": f"{slot_match.group(1)} - {slot_match.group(2)}",
+                "duration": "",
+                "description": slot_match.group(3).strip(),
+                "methods": "",
+            }
+            self._entry_emitted = False
+            self.schedule[self._day].append(self._entry)
+            return
+
+        field_match = _DURATION_RE.match(line) or _METHOD_RE.match(line)
+        if field_match:
+            if self._entry is None:
+                self._report(line, "field outside a time slot")
+                return
+            key = "duration" if field_match.re is _DURATION_RE else "methods"
+            self._entry[key] = field_match.group(1).strip()
+            if self._entry["duration"] and self._entry["methods"] and not self._entry_emitted:
+                self._entry_emitted = True
+                completed.append((self._day, self._entry))
+            return
+
+        if _BULLET_RE.match(line):
+            if self._entry is None:
+                self._report(line, "learning point outside a time slot")
+            return
+
+        if _SLOT_LIKE_RE.match(line):
+            self._report(line, "time slot not in 'H:MM AM - H:MM PM | Topic' form")
+        else:
+            self._report(line, "unrecognised line")
+
+    def _finish_entry(self, completed: list[tuple[int, dict]]) -> None:
+        if self._entry is not None and not self._entry_emitted:
+            completed.append((self._day, self._entry))
+        self._entry = None
+        self._entry_emitted = False
+
+    def _report(self, line: str, reason: str) -> None:
+        self.malformed.append(MalformedLine(self._line_no, line, reason))
@@ -0,0 +1,114 @@
+"""Deterministic compaction of generated course outlines.
+
+``generate_course_outline`` asks for a 3-section plain-text outline under
+2000 characters.  When the model overshoots, these local passes are tried
+(cheapest and least lossy first) before falling back to an LLM condense
+call:
+
+1. Whitespace normalisation (trailing spaces, repeated spaces/blank lines)
+2. Duplicate line collapsing (e.g. an instructional method listed twice)
+3. Cutting each topic/method description to its first sentence
+4. Dropping the last clause (after a ``,`` or ``;``) of the longest
+   descriptions, keeping at least ``MIN_DESCRIPTION_WORDS`` words
+
+Descriptions are only ever cut at sentence or clause boundaries; one that
+cannot be shortened that way is left for the LLM condense call.  Topic
+names, method names and the duration section are never changed.
+"""
+import re
+
+MIN_DESCRIPTION_WORDS = 6
+
+_SECTION_HEADER = re.compile(r"^\(\d\)")
+# "T1: Topic Name - Description" / "Method - How it is applied"; split at the
+# last dash, since names may contain one ("Pre - Assessment Planning").
+_DESCRIBED_LINE = re.compile(r"^(?P<head>.+)\s+[-–—]\s+(?P<desc>.+)$")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_CLAUSE_BREAK = re.compile(r"\s*[,;]\s+")
+
+
+def _normalise_whitespace(text: str) -> str:
+    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in text.strip().splitlines()]
+    text = "\n".join(lines)
+    return re.sub(r"\n{3,}", "\n\n", text)
+
+
+def _collapse_duplicates(text: str) -> str:
+    seen: set[str] = set()
+    kept = []
+    for line in text.splitlines():
+        key = line.casefold()
+        if line and not _SECTION_HEADER.match(line) and key in seen:
+            continue
+        seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def _split_described(lines: list[str]) -> list[list[str] | str]:
+    """Split "head - description" lines of sections (1) and (2) into [head, desc]."""
+    items: list[list[str] | str] = []
+    section = 0
+    for line in lines:
+        header = _SECTION_HEADER.match(line)
+        if header:
+            section = int(line[1])
+            items.append(line)
+            continue
+        match = _DESCRIBED_LINE.match(line) if section in (1, 2) else None
+        items.append([match["head"], match["desc"]] if match else line)
+    return items
+
+
+def _render(items: list[list[str] | str]) -> str:
+    return "\n".join(item if isinstance(item, str) else f"{item[0]} - {item[1]}" for item in items)
+
+
+def _first_sentence(desc: str) -> str:
+    return _SENTENCE_END.split(desc.strip(), maxsplit=1)[0]
+
+
+def _drop_last_clause(desc: str) -> str | None:
+    """Return *desc* without its last clause, or None if it has none to spare."""
+    breaks = list(_CLAUSE_BREAK.finditer(desc))
+    if not breaks:
+        return None
+    head = desc[:breaks[-1].start()]
+    if len(head.split()) < MIN_DESCRIPTION_WORDS:
+        return None
+    return head + "."
+
+
+def compact_course_outline(text: str, char_limit: int = 2000) -> str:
+    """Shrink *text* towards *char_limit* without a model call.
+
+    Returns the first stage's output that fits, or the most compact version
+    reached (which may still exceed the limit).
+    """
+    text = _normalise_whitespace(text)
+    if len(text) <= char_limit:
+        return text
+    text = _collapse_duplicates(text)
+    if len(text) <= char_limit:
+        return text
+
+    items = _split_described(text.splitlines())
+    described = [item for item in items if not isinstance(item, str)]
+    for item in described:
+        item[1] = _first_sentence(item[1])
+    text = _render(items)
+    if len(text) <= char_limit:
+        return text
+
+    # Drop one clause at a time from the currently longest description.
+    excess = len(text) - char_limit
+    shorter = [_drop_last_clause(item[1]) for item in described]
+    while excess > 0:
+        candidates = [i for i, desc in enumerate(shorter) if desc is not None]
+        if not candidates:
+            break
+        i = max(candidates, key=lambda j: len(described[j][1]))
+        excess -= len(described[i][1]) - len(shorter[i])
+        described[i][1] = shorter[i]
+        shorter[i] = _drop_last_clause(shorter[i])
+    return _render(items)
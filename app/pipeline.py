@@ -0,0 +1,326 @@
+"""Dependency-graph pipeline behind "Generate entire CP".
+
+Models the CP generators in ``app.ai_generator`` as a dependency graph and
+runs every node whose dependencies are met concurrently, so a full CP takes
+roughly as long as its longest dependency chain rather than the sum of all
+sections:
+
+- About, What You'll Learn, Background A/B, Learning Outcomes, Min Entry
+  Requirements, Job Roles, Course Outline and each instruction/assessment
+  method elaboration need only the saved course details.  Optionally the
+  first four are requested together in one round-trip (see
+  ``generate_course_sections``).
+- LU Sequencing needs the Learning Outcomes and the Course Outline.
+- Course Validation needs the Learning Outcomes (and an industry).
+
+Each node's output is written into the session under the same key its page
+uses, and per-node timing is reported as nodes finish.
+"""
+import math
+import time
+from collections.abc import Callable, Mapping, MutableMapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+from app import ai_generator as ai
+from app import event_loop
+
+PIPELINE_CONCURRENCY = 4
+
+
+@dataclass
+class PipelineNode:
+    """One generation step.
+
+    *run* receives the outputs of *depends_on* (by node name) and returns the
+    generated output (usually text); *save* writes it into the session.
+    """
+    name: str
+    label: str
+    run: Callable[[dict[str, Any]], Any]
+    save: Callable[[MutableMapping, Any], None]
+    depends_on: tuple[str, ...] = ()
+
+
+@dataclass
+class NodeResult:
+    name: str
+    label: str
+    status: str = "pending"          # pending | running | done | failed | skipped
+    output: Any = ""
+    error: str = ""
+    started_at: float = 0.0          # seconds since the pipeline started
+    seconds: float = 0.0
+    depends_on: tuple[str, ...] = field(default_factory=tuple)
+
+
+def _set_key(key: str) -> Callable[[MutableMapping, str], None]:
+    def save(session: MutableMapping, text: str) -> None:
+        session[key] = text
+    return save
+
+
+def _set_item(key: str, item: str) -> Callable[[MutableMapping, str], None]:
+    def save(session: MutableMapping, text: str) -> None:
+        results = dict(session.get(key) or {})
+        results[item] = text
+        session[key] = results
+    return save
+
+
+# Combined section key -> session key its page reads.
+_COMBINED_SECTION_KEYS = {
+    "about_course": "about_course_text",
+    "what_youll_learn": "wyl_text",
+    "background_part_a": "bg_text",
+    "background_part_b": "bgb_text",
+}
+
+
+def _save_sections(session: MutableMapping, sections: dict[str, str]) -> None:
+    for section, key in _COMBINED_SECTION_KEYS.items():
+        if not sections[section].startswith("Error:"):
+            session[key] = sections[section]
+
+
+def build_cp_pipeline(session: Mapping, combine_sections: bool = False) -> list[PipelineNode]:
+    """Build the CP dependency graph from the saved course details in *session*.
+
+    Inputs and prompt templates are read from the same session keys the
+    individual pages use, so edited templates are honoured.  They are read
+    here, on the caller's thread: the nodes run on worker threads, where
+    Streamlit's session state is not available.  With
+    *combine_sections*, About / What You'll Learn / Background A/B are one
+    node backed by a single combined request.
+    """
+    title = session.get("saved_course_title", "")
+    topics = session.get("saved_course_topics", "")
+    instr_methods = session.get("saved_instr_methods", [])
+    assess_methods = session.get("saved_assess_methods", [])
+    duration = session.get("saved_course_duration", 16)
+    num_topics = session.get("saved_num_topics", 4) or 1
+    duration_per_topic = f"{duration * 60 / num_topics:.0f}"
+    num_days = max(1, math.ceil(duration / 8))
+    sequencing_type = session.get("lu_seq_type") or ai.LU_SEQUENCING_TYPES[0]
+    industry = (session.get("cv_industry") or "").strip()
+    cv_parallel = session.get("cv_parallel", True)
+    prompts = {
+        key: session.get(key)
+        for key in (
+            "about_prompt", "wyl_prompt", "bg_prompt", "bgb_prompt", "lo_prompt", "mer_prompt",
+            "jr_prompt", "co_prompt", f"lu_seq_prompt_{sequencing_type}", "cv_set_prompt",
+            "cv_prompt", "im_prompt", "am_prompt",
+        )
+    }
+
+    def section(generator: Callable[..., str], prompt_key: str) -> Callable[[dict[str, str]], str]:
+        prompt_template = prompts[prompt_key]
+        return lambda _inputs: generator(title, topics, prompt_template=prompt_template)
+
+    if combine_sections:
+        nodes = [
+            PipelineNode(
+                "sections", "About / What You'll Learn / Background A & B",
+                lambda _inputs: ai.generate_course_sections(
+                    title, topics,
+                    prompt_templates={
+                        "about_course": prompts["about_prompt"],
+                        "what_youll_learn": prompts["wyl_prompt"],
+                        "background_part_a": prompts["bg_prompt"],
+                        "background_part_b": prompts["bgb_prompt"],
+                    },
+                ),
+                _save_sections,
+            ),
+        ]
+    else:
+        nodes = [
+            PipelineNode("about", "About This Course",
+                         section(ai.generate_about_course, "about_prompt"), _set_key("about_course_text")),
+            PipelineNode("wyl", "What You'll Learn",
+                         section(ai.generate_what_youll_learn, "wyl_prompt"), _set_key("wyl_text")),
+            PipelineNode("background_a", "Background Part A",
+                         section(ai.generate_background_part_a, "bg_prompt"), _set_key("bg_text")),
+            PipelineNode("background_b", "Background Part B",
+                         section(ai.generate_background_part_b, "bgb_prompt"), _set_key("bgb_text")),
+        ]
+    nodes += [
+        PipelineNode("learning_outcomes", "Learning Outcomes",
+                     section(ai.generate_learning_outcomes, "lo_prompt"), _set_key("lo_text")),
+        PipelineNode("mer", "Min Entry Requirements",
+                     section(ai.generate_minimum_entry_requirement, "mer_prompt"), _set_key("mer_text")),
+        PipelineNode("job_roles", "Job Roles",
+                     section(ai.generate_job_roles, "jr_prompt"), _set_key("jr_text")),
+        PipelineNode(
+            "course_outline", "Course Outline",
+            lambda _inputs: ai.generate_course_outline(
+                title, topics, ", ".join(instr_methods), duration_per_topic,
+                prompt_template=prompts["co_prompt"],
+            ),
+            _set_key("co_text"),
+        ),
+        PipelineNode(
+            "lu_sequencing", f"LU Sequencing ({sequencing_type})",
+            lambda inputs: ai.generate_lu_sequencing_rationale(
+                course=title,
+                learning_outcomes=inputs["learning_outcomes"],
+                course_outline=inputs["course_outline"],
+                sequencing_type=sequencing_type,
+                prompt_template=prompts[f"lu_seq_prompt_{sequencing_type}"],
+            ),
+            _set_key("lu_seq_text"),
+            depends_on=("learning_outcomes", "course_outline"),
+        ),
+    ]
+    if industry:
+        nodes.append(PipelineNode(
+            "course_validation", "Course Validation",
+            lambda inputs: (
+                ai.generate_course_validation_sets(
+                    course=title,
+                    industry=industry,
+                    learning_outcomes=inputs["learning_outcomes"],
+                    prompt_template=prompts["cv_set_prompt"],
+                )
+                if cv_parallel else
+                ai.generate_course_validation(
+                    course=title,
+                    industry=industry,
+                    learning_outcomes=inputs["learning_outcomes"],
+                    prompt_template=prompts["cv_prompt"],
+                )
+            ),
+            _set_key("cv_text"),
+            depends_on=("learning_outcomes",),
+        ))
+    for method in instr_methods:
+        nodes.append(PipelineNode(
+            f"im:{method}", f"Instructional Method: {method}",
+            lambda _inputs, method=method: ai.generate_instruction_method(
+                title, topics, method, prompt_template=prompts["im_prompt"],
+            ),
+            _set_item("im_results", method),
+        ))
+    for method in assess_methods:
+        nodes.append(PipelineNode(
+            f"am:{method}", f"Assessment Method: {method}",
+            lambda _inputs, method=method: ai.generate_assessment_method(
+                title, topics, method, prompt_template=prompts["am_prompt"], num_days=num_days,
+            ),
+            _set_item("am_results", method),
+        ))
+    return nodes
+
+
+def _validate(nodes: list[PipelineNode]) -> None:
+    names = {node.name for node in nodes}
+    if len(names) != len(nodes):
+        raise ValueError("Pipeline node names must be unique")
+    for node in nodes:
+        missing = set(node.depends_on) - names
+        if missing:
+            raise ValueError(f"Node {node.name!r} depends on unknown node(s): {sorted(missing)}")
+    # Kahn's algorithm: every node must be reachable in topological order.
+    remaining = {node.name: set(node.depends_on) for node in nodes}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Pipeline has a dependency cycle among: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def critical_path_seconds(results: dict[str, NodeResult]) -> float:
+    """Return the summed duration of the slowest dependency chain."""
+    memo: dict[str, float] = {}
+
+    def chain(name: str) -> float:
+        if name not in memo:
+            result = results[name]
+            memo[name] = result.seconds + max((chain(d) for d in result.depends_on), default=0.0)
+        return memo[name]
+
+    return max((chain(name) for name in results), default=0.0)
+
+
+def run_pipeline(
+    nodes: list[PipelineNode],
+    session: MutableMapping,
+    max_concurrency: int = PIPELINE_CONCURRENCY,
+    on_update: Callable[[NodeResult], None] | None = None,
+    cancel: event_loop.CancelToken | None = None,
+) -> dict[str, NodeResult]:
+    """Run *nodes* in dependency order, independent nodes concurrently.
+
+    Outputs are saved into *session* and *on_update* is called on the
+    caller's thread whenever a node changes state, so both may be Streamlit
+    objects.  Generations are queued as BULK work under the caller's request
+    owner.  A failed node marks everything downstream of it as skipped;
+    unrelated nodes still run.  The nodes' model calls run under *cancel*
+    (a new token by default); if the caller is interrupted (e.g. a Streamlit
+    rerun), it is cancelled and nodes that have not started are dropped.
+    """
+    _validate(nodes)
+    by_name = {node.name: node for node in nodes}
+    results = {
+        node.name: NodeResult(node.name, node.label, depends_on=node.depends_on) for node in nodes
+    }
+    pending = [node.name for node in nodes]
+    running: dict[Future, str] = {}
+    t0 = time.monotonic()
+    cancel = cancel or event_loop.CancelToken()
+
+    def notify(result: NodeResult) -> None:
+        if on_update:
+            on_update(result)
+
+    def timed(node: PipelineNode, inputs: dict[str, str]) -> tuple[float, float, str, str]:
+        start = time.monotonic()
+        try:
+            output, error = node.run(inputs), ""
+        except Exception as e:
+            output, error = "", str(e) or type(e).__name__
+        return start - t0, time.monotonic() - start, output, error
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency))
+    try:
+        while pending or running:
+            for name in list(pending):
+                node = by_name[name]
+                deps = [results[d] for d in node.depends_on]
+                if any(d.status in ("failed", "skipped") for d in deps):
+                    pending.remove(name)
+                    results[name].status = "skipped"
+                    results[name].error = "A dependency failed"
+                    notify(results[name])
+                elif all(d.status == "done" for d in deps):
+                    pending.remove(name)
+                    inputs = {d.name: d.output for d in deps}
+                    job = ai.in_request_context(timed, node, inputs, priority=ai.BULK, cancel=cancel)
+                    running[executor.submit(job)] = name
+                    results[name].status = "running"
+                    notify(results[name])
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                result = results[name]
+                result.started_at, result.seconds, result.output, result.error = future.result()
+                if result.error:
+                    result.status = "failed"
+                else:
+                    result.status = "done"
+                    by_name[name].save(session, result.output)
+                notify(result)
+    except BaseException:
+        # Nobody will see the rest of the CP: stop running nodes' model calls
+        # and drop the queued ones instead of letting them use up sessions.
+        cancel.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    return results
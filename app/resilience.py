@@ -0,0 +1,244 @@
+"""Retries, backoff, deadlines and hedging for single generation attempts.
+
+A flaky CLI session used to surface as an immediate failure, leaving the user
+to click again and wait for a whole new generation.  :func:`run_with_retries`
+wraps one generation attempt (a coroutine function) and:
+
+- classifies failures (:func:`classify`): empty output, transport errors and
+  timeouts are retried; anything else (e.g. the CLI is not installed) is
+  raised at once;
+- waits a jittered, exponentially growing delay between attempts;
+- bounds each attempt by ``attempt_timeout`` and the whole call by
+  ``deadline``;
+- optionally hedges: if an attempt has not finished after ``hedge_after``
+  seconds (normally the generator's observed p95 latency), a second identical
+  attempt is started and whichever succeeds first wins.  A caller that bounds
+  concurrency passes *hedge_slot*, which must grant the hedge a slot of its own.
+
+Only one attempt at a time streams text to ``on_text`` (the first to produce
+a delta).  When a retry or hedge replaces text already streamed, ``on_text``
+receives :data:`RESTART` before the replacement, so a sink never shows one
+attempt's text followed by another's.
+"""
+import asyncio
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from app.backends import FixtureError
+from app.session_pool import SessionError
+
+EMPTY = "empty"
+TRANSPORT = "transport"
+TIMEOUT = "timeout"
+FATAL = "fatal"
+RETRYABLE = frozenset({EMPTY, TRANSPORT, TIMEOUT})
+
+
+class _Restart(str):
+    """Type of :data:`RESTART`."""
+
+
+# Passed to a text sink when the text streamed so far is void and the stream
+# starts again (e.g. a single-flight follower re-running the call).  It is an
+# empty string, so a sink that only appends text is unaffected.
+RESTART = _Restart()
+
+# Errors worth another attempt on a fresh session (plus ClaudeSDKError).
+_TRANSPORT_ERRORS = (SessionError, FixtureError, ConnectionError, EOFError)
+
+
+class EmptyResponseError(RuntimeError):
+    """The model finished without producing any text."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """No attempt succeeded within the per-call deadline."""
+
+
+@dataclass
+class RetryPolicy:
+    """How hard to try for one generation; all times are in seconds."""
+    max_attempts: int = 3
+    base_delay: float = 1.0          # backoff before the 2nd attempt
+    max_delay: float = 8.0
+    attempt_timeout: float = 180.0   # one attempt on one session
+    deadline: float = 300.0          # the whole call, including backoff
+    hedge: bool = False              # start a 2nd attempt past hedge_after
+    hedge_min_samples: int = 20      # calls needed before trusting a p95
+
+
+@dataclass
+class AttemptStats:
+    attempts: int = 0
+    hedged: bool = False
+    failures: list[str] = field(default_factory=list)   # classification per failed attempt
+
+
+def classify(exc: BaseException) -> str:
+    """Return EMPTY, TRANSPORT, TIMEOUT or FATAL for a failed attempt."""
+    # Imported here so the SDK stays out of app start-up.
+    from claude_agent_sdk import ClaudeSDKError, CLINotFoundError
+
+    chain = []
+    while exc is not None and exc not in chain:
+        chain.append(exc)
+        exc = exc.__cause__
+    if any(isinstance(e, CLINotFoundError) for e in chain):
+        return FATAL
+    first = chain[0]
+    if isinstance(first, EmptyResponseError):
+        return EMPTY
+    if isinstance(first, TimeoutError):
+        return TIMEOUT
+    if any(isinstance(e, (ClaudeSDKError, *_TRANSPORT_ERRORS)) for e in chain):
+        return TRANSPORT
+    return FATAL
+
+
+def backoff_delay(retry: int, policy: RetryPolicy) -> float:
+    """Full-jitter exponential backoff before retry number *retry* (1-based)."""
+    return random.uniform(0, min(policy.max_delay, policy.base_delay * 2 ** (retry - 1)))
+
+
+class _StreamClaim:
+    """Lets one attempt at a time stream text, shared by every attempt of a call.
+
+    The first attempt to produce text streams it.  Other attempts buffer
+    theirs; if the streaming attempt fails, or another attempt wins, the
+    stream is restarted (:data:`RESTART`) and replayed from the attempt that
+    takes over, so the sink never holds two attempts' text at once.
+    """
+
+    def __init__(self, on_text: Callable[[str], None] | None) -> None:
+        self.on_text = on_text
+        self.owner: object | None = None
+        self.streamed = False
+        self._texts: dict[object, list[str]] = {}
+
+    def forwarder(self) -> tuple[object, Callable[[str], None]]:
+        token = object()
+        self._texts[token] = []
+
+        def forward(text: str) -> None:
+            if self.on_text is None or token not in self._texts:
+                return
+            if self.owner is token:
+                self.on_text(text)
+                return
+            self._texts[token].append(text)
+            if self.owner is None:
+                self._take(token)
+        return token, forward
+
+    def _take(self, token: object) -> None:
+        if self.streamed:
+            self.on_text(RESTART)
+        self.owner, self.streamed = token, True
+        for text in self._texts[token]:
+            self.on_text(text)
+        self._texts[token] = []
+
+    def drop(self, token: object) -> None:
+        """Forget an attempt that failed or was cancelled."""
+        self._texts.pop(token, None)
+        if self.owner is token:
+            self.owner = None
+
+    def settle(self, token: object) -> None:
+        """Make the winning attempt's text the streamed text."""
+        if self.on_text is not None and self.owner is not token and token in self._texts:
+            self._take(token)
+
+
+async def _race(
+    attempt: Callable[[Callable[[str], None]], Awaitable[str]],
+    policy: RetryPolicy,
+    claim: _StreamClaim,
+    hedge_after: float | None,
+    stats: AttemptStats,
+    hedge_slot: Callable[[], Callable[[], None] | None] | None = None,
+) -> str:
+    """Run one attempt (plus a hedge if it is slow and *hedge_slot* grants it a
+    slot); return the first success."""
+    tokens: dict[asyncio.Future, object] = {}
+
+    async def bounded(forward: Callable[[str], None]) -> str:
+        stats.attempts += 1
+        async with asyncio.timeout(policy.attempt_timeout):
+            return await attempt(forward)
+
+    def start() -> asyncio.Future:
+        token, forward = claim.forwarder()
+        task = asyncio.ensure_future(bounded(forward))
+        tokens[task] = token
+        return task
+
+    pending = {start()}
+    try:
+        if hedge_after is not None:
+            done, _ = await asyncio.wait(pending, timeout=hedge_after)
+            release = None
+            if not done:
+                release = hedge_slot() if hedge_slot else (lambda: None)
+            if release is not None:
+                stats.hedged = True
+                hedge = start()
+                hedge.add_done_callback(lambda _: release())
+                pending.add(hedge)
+        errors: list[BaseException] = []
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    claim.settle(tokens[task])
+                    return task.result()
+                claim.drop(tokens[task])
+                errors.append(task.exception())
+        raise errors[0]
+    finally:
+        for task in pending:
+            task.cancel()
+            claim.drop(tokens[task])
+
+
+async def run_with_retries(
+    attempt: Callable[[Callable[[str], None]], Awaitable[str]],
+    policy: RetryPolicy,
+    on_text: Callable[[str], None] | None = None,
+    hedge_after: float | None = None,
+    stats: AttemptStats | None = None,
+    hedge_slot: Callable[[], Callable[[], None] | None] | None = None,
+) -> str:
+    """Call ``attempt(on_text)`` until it succeeds, per *policy*.
+
+    Raises the last attempt's error once retries or the deadline run out,
+    or immediately for a FATAL failure.  *stats* (if given) is updated with
+    the number of attempts made and whether a hedge was fired.  If given,
+    *hedge_slot()* is asked before each hedge and returns a function that
+    frees the slot it took, or None to skip the hedge.
+    """
+    stats = stats if stats is not None else AttemptStats()
+    claim = _StreamClaim(on_text)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + policy.deadline
+    for retry in range(max(1, policy.max_attempts)):
+        if retry:
+            delay = backoff_delay(retry, policy)
+            if loop.time() + delay >= deadline:
+                break
+            await asyncio.sleep(delay)
+        try:
+            async with asyncio.timeout_at(deadline):
+                return await _race(attempt, policy, claim, hedge_after, stats, hedge_slot)
+        except Exception as e:
+            kind = classify(e)
+            stats.failures.append(kind)
+            if kind not in RETRYABLE:
+                raise
+            if loop.time() >= deadline:
+                raise DeadlineExceeded(
+                    f"No response within the {policy.deadline:g}s deadline"
+                ) from e
+            last_error = e
+    raise last_error
@@ -0,0 +1,172 @@
+"""Content-addressed on-disk cache of AI generator responses.
+
+Responses are keyed on a SHA-256 of the fully rendered prompt, the template
+it was rendered from and the model options, so identical requests are served
+from disk instead of re-running the model.  Entries live in a small SQLite
+database next to ``settings/config/api_config.db`` and are evicted by age
+and by total size (least recently used first).
+
+Keys may be built from a canonical form of the prompt (see
+``app.canonical_inputs``); each entry also records a fingerprint of the
+exact prompt that produced it, so a hit from a differently-worded request
+can be told apart from a repeat of the same one.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / "settings" / "config" / "response_cache.db"
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024     # 50 MB of response text
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60      # 30 days
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    template_id TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    source TEXT NOT NULL DEFAULT '',
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+CREATE INDEX IF NOT EXISTS idx_responses_created ON responses (created_at);
+"""
+# Columns added after the first release: name -> definition.
+_ADDED_COLUMNS = {
+    "source": "TEXT NOT NULL DEFAULT ''",
+}
+
+
+def template_id(template: str) -> str:
+    """Return a short content hash identifying a prompt template version."""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+def fingerprint(prompt: str) -> str:
+    """Return a short hash of the exact prompt text."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def make_key(prompt: str, template: str, options: dict | None = None) -> str:
+    """Build the cache key for a rendered *prompt* of *template* under *options*."""
+    payload = json.dumps(
+        {
+            "prompt": prompt,
+            "template": template_id(template),
+            "options": options or {},
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response store with size/age eviction and hit counters."""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: float = DEFAULT_MAX_AGE,
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+            for name, definition in _ADDED_COLUMNS.items():
+                if name not in existing:
+                    self._conn.execute(f"ALTER TABLE responses ADD COLUMN {name} {definition}")
+        return self._conn
+
+    def get(self, key: str) -> str | None:
+        """Return the cached response for *key*, or None on a miss."""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> tuple[str, str] | None:
+        """Return ``(response, source fingerprint)`` for *key*, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT response, created_at, source FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age:
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE responses SET hit_count = hit_count + 1, accessed_at = ? WHERE key = ?",
+                (now, key),
+            )
+            conn.commit()
+            self.hits += 1
+            return row[0], row[2]
+
+    def put(self, key: str, template: str, response: str, source: str = "") -> None:
+        """Store *response* under *key* and evict expired / over-budget entries.
+
+        *source* is the :func:`fingerprint` of the prompt actually sent.
+        """
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, template_id, response, size, source, hit_count, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?)",
+                (key, template_id(template), response, size, source, now, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.max_age,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until back under the size budget.
+        excess = total - self.max_bytes
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters for this process plus on-disk totals."""
+        with self._lock:
+            entries, total_bytes = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": total_bytes,
+        }
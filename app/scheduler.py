@@ -0,0 +1,223 @@
+"""Process-wide admission control for model calls.
+
+One deployed Streamlit instance is shared by several trainers, all drawing on
+one Claude subscription.  Every generation therefore takes a slot from a single
+:class:`GenerationScheduler` before it reaches the CLI:
+
+- at most ``max_in_flight`` generations run at once;
+- waiting requests are grouped by owner (one Streamlit session) and served
+  round-robin, so one user's "Generate Entire CP" cannot starve another's
+  single click;
+- ``INTERACTIVE`` requests (a single section) are always admitted before
+  ``BULK`` ones ("Generate All" batches and the full-CP pipeline);
+- waiters are told their queue position and an ETA, estimated from a moving
+  average of recent slot hold times;
+- a waiting request acquired with a *key* can be promoted (:meth:`promote`),
+  e.g. when an interactive request starts sharing a queued bulk one.
+
+All methods run on the shared event loop (``app.event_loop``); the scheduler
+itself is not thread-safe.
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+DEFAULT_MAX_IN_FLIGHT = 4
+_SERVICE_TIME_WEIGHT = 0.2   # EWMA weight of the newest slot hold time
+
+
+@dataclass
+class QueueStatus:
+    """Where a request stands; ``position`` is 0 once it is running."""
+    position: int
+    waiting: int
+    in_flight: int
+    eta_seconds: float | None
+
+
+class _Ticket:
+    def __init__(self, owner: str, priority: int, on_status: Callable[[QueueStatus], None] | None):
+        self.owner = owner
+        self.priority = priority
+        self.on_status = on_status
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.started = 0.0
+
+
+class GenerationScheduler:
+    """Bounded, fair, two-class queue in front of the generation backend."""
+
+    def __init__(self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> None:
+        self.max_in_flight = max(1, max_in_flight)
+        self.in_flight = 0
+        self.admitted = 0
+        self.max_waiting_seen = 0
+        self.avg_service_seconds: float | None = None
+        # priority -> owner -> that owner's waiting tickets (FIFO); owners
+        # rotate to the back after each admission.
+        self._queues: dict[int, OrderedDict[str, deque[_Ticket]]] = {
+            INTERACTIVE: OrderedDict(), BULK: OrderedDict(),
+        }
+        self._keyed: dict[str, _Ticket] = {}   # waiting tickets acquired with a key
+
+    # --- Queue order --------------------------------------------------------
+
+    def _waiting_order(self) -> list[_Ticket]:
+        """Waiting tickets in the order they will be admitted."""
+        order: list[_Ticket] = []
+        for priority in sorted(self._queues):
+            lanes = [list(tickets) for tickets in self._queues[priority].values()]
+            for depth in range(max((len(lane) for lane in lanes), default=0)):
+                order.extend(lane[depth] for lane in lanes if depth < len(lane))
+        return order
+
+    def _eta(self, position: int) -> float | None:
+        if self.avg_service_seconds is None:
+            return None
+        return math.ceil(position / self.max_in_flight) * self.avg_service_seconds
+
+    def _notify(self) -> None:
+        order = self._waiting_order()
+        self.max_waiting_seen = max(self.max_waiting_seen, len(order))
+        for position, ticket in enumerate(order, 1):
+            if ticket.on_status:
+                ticket.on_status(QueueStatus(position, len(order), self.in_flight, self._eta(position)))
+
+    def _dispatch(self) -> None:
+        while self.in_flight < self.max_in_flight:
+            ticket = self._pop_next()
+            if ticket is None:
+                break
+            self.in_flight += 1
+            self.admitted += 1
+            ticket.started = time.monotonic()
+            ticket.future.set_result(None)
+            if ticket.on_status:
+                ticket.on_status(QueueStatus(0, 0, self.in_flight, None))
+        self._notify()
+
+    def _pop_next(self) -> _Ticket | None:
+        for priority in sorted(self._queues):
+            owners = self._queues[priority]
+            if owners:
+                owner, tickets = next(iter(owners.items()))
+                ticket = tickets.popleft()
+                del owners[owner]
+                if tickets:
+                    owners[owner] = tickets   # back of the rotation
+                return ticket
+        return None
+
+    def _remove(self, ticket: _Ticket) -> None:
+        owners = self._queues[ticket.priority]
+        tickets = owners.get(ticket.owner)
+        if tickets and ticket in tickets:
+            tickets.remove(ticket)
+            if not tickets:
+                del owners[ticket.owner]
+
+    # --- Public API ---------------------------------------------------------
+
+    async def acquire(
+        self,
+        owner: str,
+        priority: int = INTERACTIVE,
+        on_status: Callable[[QueueStatus], None] | None = None,
+        key: str | None = None,
+    ) -> _Ticket:
+        """Wait for a slot; *on_status* is told the queue position as it changes.
+
+        While it waits, the request can be promoted by *key* (see :meth:`promote`).
+        """
+        ticket = _Ticket(owner, priority, on_status)
+        self._queues[priority].setdefault(owner, deque()).append(ticket)
+        if key is not None:
+            self._keyed[key] = ticket
+        self._dispatch()
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                self.release(ticket)    # admitted just as the caller gave up
+            else:
+                self._remove(ticket)
+                self._notify()
+            raise
+        finally:
+            if key is not None and self._keyed.get(key) is ticket:
+                del self._keyed[key]
+        return ticket
+
+    def promote(self, key: str, owner: str, priority: int) -> None:
+        """Queue the request waiting under *key* as *owner*'s, at *priority*,
+        if that is more urgent than its own; no-op once it is running."""
+        ticket = self._keyed.get(key)
+        if ticket is None or ticket.future.done() or priority >= ticket.priority:
+            return
+        self._remove(ticket)
+        ticket.owner, ticket.priority = owner, priority
+        self._queues[priority].setdefault(owner, deque()).append(ticket)
+        self._dispatch()
+
+    def try_acquire(self, owner: str, priority: int = INTERACTIVE) -> _Ticket | None:
+        """Take a slot at once, or return None if none is free or others are waiting."""
+        if self.in_flight >= self.max_in_flight or any(self._queues.values()):
+            return None
+        ticket = _Ticket(owner, priority, None)
+        ticket.started = time.monotonic()
+        ticket.future.set_result(None)
+        self.in_flight += 1
+        self.admitted += 1
+        return ticket
+
+    def release(self, ticket: _Ticket) -> None:
+        held = time.monotonic() - ticket.started
+        if self.avg_service_seconds is None:
+            self.avg_service_seconds = held
+        else:
+            self.avg_service_seconds += _SERVICE_TIME_WEIGHT * (held - self.avg_service_seconds)
+        self.in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        owner: str,
+        priority: int = INTERACTIVE,
+        on_status: Callable[[QueueStatus], None] | None = None,
+        key: str | None = None,
+    ) -> AsyncIterator[None]:
+        ticket = await self.acquire(owner, priority, on_status, key)
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    def set_max_in_flight(self, max_in_flight: int) -> None:
+        self.max_in_flight = max(1, max_in_flight)
+        self._dispatch()
+
+    def snapshot(self) -> dict:
+        """Current load: slots in use and waiting requests per owner and class."""
+        waiting = [
+            {"owner": owner, "priority": PRIORITY_NAMES[priority], "waiting": len(tickets)}
+            for priority, owners in sorted(self._queues.items())
+            for owner, tickets in owners.items()
+        ]
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "waiting": sum(entry["waiting"] for entry in waiting),
+            "by_owner": waiting,
+            "admitted": self.admitted,
+            "max_waiting_seen": self.max_waiting_seen,
+            "avg_service_seconds": self.avg_service_seconds,
+        }
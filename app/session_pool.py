@@ -0,0 +1,348 @@
+"""Bounded pool of warm Claude CLI sessions.
+
+Every generation used to spawn a fresh ``claude`` subprocess and pay the
+initialize handshake before the model saw a single token.  The pool keeps
+connected ``ClaudeSDKClient`` sessions ready on the shared background event
+loop (``app.event_loop``) so a request only waits for the model:
+
+- Each session is owned by a dedicated task (the SDK requires connect, query
+  and disconnect to happen in the same task); requests reach it through an
+  inbox queue.
+- A session serves at most ``max_uses`` requests.  The default of 1 keeps
+  every prompt in its own conversation: a CLI session is one conversation, so
+  a reused session would answer with the earlier prompts and replies in its
+  context, making the reply depend on which session served it (and leaking
+  one course's content into another's).  Instead the handshake is hidden by
+  ``warm_spares`` sessions connected ahead of demand, by default one per
+  concurrent request, so a burst of requests all find one connected.
+- At most ``max_size`` sessions exist at once (idle, connecting or busy);
+  further requests wait for a free slot.
+- Sessions are health-checked on checkout (owner task alive, CLI process
+  running), closed after ``idle_timeout`` seconds without use and recycled
+  after ``max_age`` seconds.
+- A request that is cancelled or times out while the model is answering
+  aborts its session: the owner task is cancelled and disconnects, which
+  stops the CLI subprocess instead of letting it finish an unwanted reply.
+- :meth:`SessionPool.probe` connects a session without sending a prompt; it
+  is the backend health check behind ``app.circuit_breaker``.
+"""
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+DEFAULT_MAX_SIZE = 4
+DEFAULT_IDLE_TIMEOUT = 600.0    # close sessions unused for 10 minutes
+DEFAULT_MAX_AGE = 1800.0        # recycle every session after 30 minutes
+DEFAULT_MAX_USES = 1            # one prompt per conversation (see above)
+DEFAULT_WARM_SPARES = DEFAULT_MAX_SIZE  # connected sessions kept ready for the next requests
+REAP_INTERVAL = 30.0
+
+
+class SessionError(RuntimeError):
+    """Raised when a pooled CLI session fails to connect or dies mid-request."""
+
+
+async def _collect_response(
+    client: Any, prompt: str, on_text: Callable[[str], None] | None = None
+) -> str:
+    """Send *prompt* on a connected client and join the text blocks of the reply.
+
+    *on_text* receives text deltas as they arrive: partial-message stream
+    events when the CLI emits them, otherwise each complete text block.
+    """
+    # Imported on first use to keep the SDK out of app start-up.
+    from claude_agent_sdk import AssistantMessage, TextBlock
+    from claude_agent_sdk.types import StreamEvent
+
+    await client.query(prompt)
+    parts: list[str] = []
+    streamed = False
+    async for message in client.receive_response():
+        if isinstance(message, StreamEvent):
+            event = message.event
+            delta = event.get("delta") or {}
+            if event.get("type") == "content_block_delta" and delta.get("type") == "text_delta":
+                if on_text and delta.get("text"):
+                    on_text(delta["text"])
+                streamed = True
+        elif isinstance(message, AssistantMessage):
+            for block in message.content:
+                if isinstance(block, TextBlock):
+                    parts.append(block.text)
+                    if on_text and not streamed:
+                        on_text(block.text)
+            streamed = False
+    return "".join(parts)
+
+
+class _PooledSession:
+    """One connected CLI client plus the task that owns its lifecycle."""
+
+    def __init__(self, client_factory: Callable[[], Any]) -> None:
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+        self.error: BaseException | None = None
+        self.ready = asyncio.Event()
+        self._client: Any = None
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run(client_factory))
+
+    async def _run(self, client_factory: Callable[[], Any]) -> None:
+        client = client_factory()
+        try:
+            await client.connect()
+            self._client = client
+            self.ready.set()
+            while True:
+                request = await self._inbox.get()
+                if request is None:
+                    break
+                prompt, future, on_text = request
+                try:
+                    text = await _collect_response(client, prompt, on_text)
+                except Exception as e:
+                    # The conversation state is unknown now; fail the caller
+                    # and retire the session rather than reuse it.
+                    self.error = e
+                    if not future.done():
+                        future.set_exception(e)
+                    break
+                if not future.done():
+                    future.set_result(text)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ready.set()
+            self._client = None
+            self._fail_pending()
+            try:
+                await client.disconnect()
+            except Exception:
+                pass
+
+    def _fail_pending(self) -> None:
+        while not self._inbox.empty():
+            request = self._inbox.get_nowait()
+            if request is not None and not request[1].done():
+                request[1].set_exception(SessionError("CLI session closed before the request ran"))
+
+    def is_healthy(self, max_age: float) -> bool:
+        if self.error is not None or self._task.done():
+            return False
+        if time.monotonic() - self.created_at > max_age:
+            return False
+        transport = getattr(self._client, "_transport", None)
+        is_ready = getattr(transport, "is_ready", None)
+        if callable(is_ready) and not is_ready():
+            return False
+        return True
+
+    async def ask(self, prompt: str, on_text: Callable[[str], None] | None = None) -> str:
+        await self.ready.wait()
+        if self.error is not None:
+            raise SessionError(f"Claude CLI session failed: {self.error}") from self.error
+        future = asyncio.get_running_loop().create_future()
+        self.uses += 1
+        self._inbox.put_nowait((prompt, future, on_text))
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # Nobody wants the reply any more; stop the CLI generating it.
+            self.abort()
+            raise
+        finally:
+            self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        """Ask the owner task to disconnect once it has finished any request."""
+        if self.ready.is_set():
+            self._inbox.put_nowait(None)
+        else:
+            self._task.cancel()
+
+    def abort(self) -> None:
+        """Cancel the owner task mid-request; it disconnects (killing the CLI) as it exits."""
+        if self.error is None:
+            self.error = SessionError("CLI session aborted")
+        self._task.cancel()
+
+
+class SessionPool:
+    """Bounded, self-healing pool of warm ``ClaudeSDKClient`` sessions.
+
+    *client_factory* returns a new, unconnected client.  All pool state lives
+    on one event loop: every coroutine method must be awaited on the shared
+    loop from ``app.event_loop``.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        max_size: int = DEFAULT_MAX_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_age: float = DEFAULT_MAX_AGE,
+        max_uses: int = DEFAULT_MAX_USES,
+        warm_spares: int = DEFAULT_WARM_SPARES,
+    ) -> None:
+        self.client_factory = client_factory
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age
+        self.max_uses = max(1, max_uses)
+        self.warm_spares = max(0, min(warm_spares, self.max_size))
+        self._idle: list[_PooledSession] = []
+        self._live = 0
+        self._cond: asyncio.Condition | None = None
+        self._reaper: asyncio.Task | None = None
+        self._aborted = 0
+
+    # --- Checkout / checkin (run on the shared loop) ----------------------
+
+    def _condition(self) -> asyncio.Condition:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+            self._reaper = asyncio.get_running_loop().create_task(self._reap_forever())
+        return self._cond
+
+    def _spawn(self) -> _PooledSession:
+        self._live += 1
+        return _PooledSession(self.client_factory)
+
+    def _retire(self, session: _PooledSession) -> None:
+        self._live -= 1
+        session.close()
+
+    def _is_fresh(self, session: _PooledSession) -> bool:
+        idle_for = time.monotonic() - session.last_used
+        return session.is_healthy(self.max_age) and idle_for <= self.idle_timeout
+
+    def _prune_idle(self) -> None:
+        keep = []
+        for session in self._idle:
+            if self._is_fresh(session):
+                keep.append(session)
+            else:
+                self._retire(session)
+        self._idle = keep
+
+    async def _acquire(self) -> _PooledSession:
+        cond = self._condition()
+        async with cond:
+            while True:
+                self._prune_idle()
+                if self._idle:
+                    return self._idle.pop()
+                if self._live < self.max_size:
+                    return self._spawn()
+                await cond.wait()
+
+    async def _release(self, session: _PooledSession) -> None:
+        cond = self._condition()
+        async with cond:
+            if session.uses >= self.max_uses or not session.is_healthy(self.max_age):
+                self._retire(session)
+            else:
+                self._idle.append(session)
+            # Keep warm spares connected so the next request skips cold start.
+            while len(self._idle) < self.warm_spares and self._live < self.max_size:
+                self._idle.append(self._spawn())
+            cond.notify_all()
+
+    async def _reap_forever(self) -> None:
+        while True:
+            await asyncio.sleep(REAP_INTERVAL)
+            cond = self._condition()
+            async with cond:
+                self._prune_idle()
+                cond.notify_all()
+
+    async def generate(
+        self,
+        prompt: str,
+        on_text: Callable[[str], None] | None = None,
+        on_dispatch: Callable[[], None] | None = None,
+    ) -> str:
+        """Run one prompt on a pooled session and return the raw reply text.
+
+        *on_text* is called on the pool loop with each text delta and
+        *on_dispatch* once a session has been acquired for the prompt.
+        """
+        session = await self._acquire()
+        if on_dispatch:
+            on_dispatch()
+        try:
+            return await session.ask(prompt, on_text)
+        except asyncio.CancelledError:
+            self._aborted += 1
+            raise
+        finally:
+            await self._release(session)
+
+    async def probe(self) -> None:
+        """Connect a new session as a health check, keeping it as a warm spare.
+
+        No prompt is sent.  Raises :class:`SessionError` if the CLI cannot be
+        started or does not complete the handshake.  Like a request, the probe
+        waits for a free slot when ``max_size`` sessions are busy; an idle
+        session is retired to make room for it.
+        """
+        cond = self._condition()
+        async with cond:
+            self._prune_idle()
+            while self._live >= self.max_size:
+                if self._idle:
+                    self._retire(self._idle.pop(0))
+                else:
+                    await cond.wait()
+                    self._prune_idle()
+            session = self._spawn()
+        try:
+            await session.ready.wait()
+        except asyncio.CancelledError:
+            session.abort()
+            raise
+        finally:
+            await self._release(session)
+        if session.error is not None:
+            raise SessionError(f"Claude CLI session failed: {session.error}") from session.error
+
+    async def resize(self, max_size: int, warm_spares: int | None = None) -> None:
+        """Change ``max_size`` (and ``warm_spares``, default: the new size).
+
+        Busy sessions above a lowered limit finish their request first; idle
+        ones beyond the new spare count are closed at once.
+        """
+        cond = self._condition()
+        async with cond:
+            self.max_size = max(1, max_size)
+            spares = self.max_size if warm_spares is None else warm_spares
+            self.warm_spares = max(0, min(spares, self.max_size))
+            while len(self._idle) > self.warm_spares:
+                self._retire(self._idle.pop(0))
+            cond.notify_all()
+
+    async def prewarm(self) -> None:
+        """Start connecting warm spares ahead of the first request."""
+        async with self._condition():
+            while len(self._idle) < self.warm_spares and self._live < self.max_size:
+                self._idle.append(self._spawn())
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "live": self._live, "idle": len(self._idle), "max_size": self.max_size,
+            "aborted": self._aborted,
+        }
+
+    async def aclose(self) -> None:
+        """Disconnect every idle session and stop the reaper."""
+        for session in self._idle:
+            self._retire(session)
+        self._idle = []
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        self._cond = None
+        # Give owner tasks a moment to disconnect their CLI subprocesses.
+        await asyncio.sleep(0.5)
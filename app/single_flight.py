@@ -0,0 +1,116 @@
+"""Coalescing of identical concurrent generation requests.
+
+A double-clicked "Generate" button, or several sessions importing the same
+CP, send the same prompt through ``_agenerate`` at the same time.
+:class:`SingleFlight` lets the first caller for a key (the leader) run the
+model call while later callers with the same key wait for it and receive the
+same result, or the same error.  Followers that stream also receive the
+leader's text deltas: everything produced so far is replayed to them first,
+then new deltas as they arrive.
+
+All callers run on the shared event loop (``app.event_loop``).  If the
+leader is cancelled, its followers are not: the first of them takes over and
+makes the call itself, under its own context (owner, priority), after
+sending :data:`resilience.RESTART` to its stream if it had been replayed any
+of the leader's text.  A publisher may send ``RESTART`` as well.
+"""
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from app.resilience import RESTART
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        # Followers may all be gone by the time the leader fails.
+        self.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._chunks: list[str] = []
+        self._sinks: list[Callable[[str], None]] = []
+
+    def subscribe(self, on_text: Callable[[str], None]) -> None:
+        for chunk in self._chunks:
+            on_text(chunk)
+        self._sinks.append(on_text)
+
+    def unsubscribe(self, on_text: Callable[[str], None]) -> None:
+        if on_text in self._sinks:
+            self._sinks.remove(on_text)
+
+    def publish(self, text: str) -> None:
+        if text is RESTART:
+            self._chunks.clear()
+        else:
+            self._chunks.append(text)
+        for sink in self._sinks:
+            sink(text)
+
+
+class SingleFlight:
+    """Single-flight group keyed by request identity; use from one event loop."""
+
+    def __init__(self) -> None:
+        self.leaders = 0
+        self.coalesced = 0
+        self._flights: dict[str, _Flight] = {}
+
+    async def run(
+        self,
+        key: str,
+        fn: Callable[[Callable[[str], None]], Awaitable[str]],
+        on_text: Callable[[str], None] | None = None,
+        on_follow: Callable[[], None] | None = None,
+    ) -> tuple[str, bool]:
+        """Return ``(await fn(publish), shared)``, running *fn* once per concurrent *key*.
+
+        *fn* receives a callback for its text deltas, which are forwarded to
+        *on_text* of the leader and every follower.  *shared* is True for
+        followers that reused another caller's in-flight call.  *on_follow*
+        is called when this caller starts waiting on another's call (e.g. to
+        raise that call's queue priority to its own).
+        """
+        while (flight := self._flights.get(key)) is not None:
+            self.coalesced += 1
+            if on_text:
+                flight.subscribe(on_text)
+            if on_follow:
+                on_follow()
+            try:
+                return await asyncio.shield(flight.future), True
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise
+                # The leader was cancelled, not us: make the call ourselves,
+                # after voiding the leader's text already replayed to us.
+                self.coalesced -= 1
+                if on_text and flight._chunks:
+                    on_text(RESTART)
+            finally:
+                # A cancelled follower must not keep receiving the leader's deltas.
+                if on_text:
+                    flight.unsubscribe(on_text)
+
+        flight = self._flights[key] = _Flight()
+        self.leaders += 1
+        if on_text:
+            flight.subscribe(on_text)
+        try:
+            result = await fn(flight.publish)
+        except asyncio.CancelledError:
+            flight.future.cancel()
+            raise
+        except BaseException as e:
+            flight.future.set_exception(e)
+            raise
+        else:
+            flight.future.set_result(result)
+            return result, False
+        finally:
+            del self._flights[key]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights),
+        }
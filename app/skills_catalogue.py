@@ -0,0 +1,337 @@
+"""In-memory catalogue of CASL unique skills.
+
+The skills list (``.claude/skills/generate_topics/skills_description.csv``)
+feeds the CASL "Unique Skill Name" picker and the skill context of topic
+generation.  :func:`load_skills_catalogue` parses it once per process and
+returns the same :class:`SkillsCatalogue` until the file's modification time
+or size changes.  A missing file yields an empty catalogue rather than an
+error, so the app still starts in WSQ mode without it.
+
+Names and descriptions are kept in parallel tuples indexed by skill id (CSV
+order).  Exact lookups go through a name -> id dict; type-ahead search uses a
+sorted list of word-start keys for short queries and a trigram index for
+longer ones.
+
+:meth:`SkillsCatalogue.rank` scores every skill against free text (a course
+title) with BM25 over the skill name and description.  The term index is
+built on first use and saved to ``settings/config/skills_index.json``, tagged
+with the CSV version it was built from, so later processes load it instead
+of re-tokenising the whole list.
+"""
+import bisect
+import csv
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from array import array
+from pathlib import Path
+
+DEFAULT_SKILLS_CSV = (
+    Path(__file__).resolve().parent.parent / ".claude" / "skills" / "generate_topics" / "skills_description.csv"
+)
+DEFAULT_INDEX_PATH = Path(__file__).resolve().parent.parent / "settings" / "config" / "skills_index.json"
+
+_WORD_START_RE = re.compile(r"(?<![^\W_])\w")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "as", "at", "be", "by", "for", "from", "in", "into", "is", "of", "on", "or",
+    "the", "their", "to", "with", "within", "using", "use", "course", "introduction", "fundamentals",
+})
+# BM25 parameters; the name is counted twice so a title word that names the
+# skill outweighs the same word buried in a long description.
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_NAME_WEIGHT = 2
+
+
+def _fold(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _terms(text: str) -> list[str]:
+    """Lower-cased word tokens minus stopwords, with plurals folded to singular."""
+    terms = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("ies"):
+            token = token[:-3] + "y"
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+
+class _RelevanceIndex:
+    """BM25 inverted index: term -> [(skill id, term frequency), ...]."""
+
+    def __init__(self, postings: dict[str, list[tuple[int, int]]], doc_lengths: list[int]) -> None:
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self._avg_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+        n = len(doc_lengths)
+        self._idf = {
+            term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in postings.items()
+        }
+
+    @classmethod
+    def build(cls, documents: list[str]) -> "_RelevanceIndex":
+        postings: dict[str, list[tuple[int, int]]] = {}
+        doc_lengths = []
+        for doc_id, text in enumerate(documents):
+            counts: dict[str, int] = {}
+            terms = _terms(text)
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+            doc_lengths.append(len(terms))
+        return cls(postings, doc_lengths)
+
+    def top(self, text: str, limit: int) -> list[tuple[int, float]]:
+        scores: dict[int, float] = {}
+        for term in set(_terms(text)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[term]:
+                norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * self.doc_lengths[doc_id] / self._avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (_BM25_K1 + 1) / (tf + norm)
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+    def save(self, path: Path, version: tuple[int, int]) -> None:
+        data = {
+            "version": list(version),
+            "doc_lengths": self.doc_lengths,
+            "postings": {term: [i for pair in docs for i in pair] for term, docs in self.postings.items()},
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, version: tuple[int, int], size: int) -> "_RelevanceIndex | None":
+        """The saved index if it was built from this CSV version, else None."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data["version"] != list(version) or len(data["doc_lengths"]) != size:
+                return None
+            postings = {
+                term: list(zip(flat[::2], flat[1::2])) for term, flat in data["postings"].items()
+            }
+            return cls(postings, data["doc_lengths"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+class SkillsCatalogue:
+    """Skill names and descriptions with exact and type-ahead lookup."""
+
+    def __init__(
+        self,
+        rows: list[tuple[str, str]],
+        version: tuple[int, int] | None = None,
+        index_path: Path | None = None,
+    ) -> None:
+        ids: dict[str, int] = {}
+        names: list[str] = []
+        descriptions: list[str] = []
+        for name, description in rows:
+            if name not in ids:
+                ids[name] = len(names)
+                names.append(name)
+                descriptions.append(description)
+        self.names: tuple[str, ...] = tuple(names)
+        self.descriptions: tuple[str, ...] = tuple(descriptions)
+        self._ids = ids
+        self._folded: tuple[str, ...] = tuple(_fold(name) for name in names)
+        self._folded_ids: dict[str, int] = {}
+        for skill_id, folded in enumerate(self._folded):
+            self._folded_ids.setdefault(folded, skill_id)
+
+        # Every word-start suffix of every name, sorted, for prefix search
+        # ("fin" finds "Financial Analysis" and "Corporate Finance").
+        self._word_starts: tuple[tuple[int, ...], ...] = tuple(
+            tuple(match.start() for match in _WORD_START_RE.finditer(folded)) for folded in self._folded
+        )
+        keys = [
+            (folded[start:], skill_id)
+            for skill_id, folded in enumerate(self._folded)
+            for start in self._word_starts[skill_id]
+        ]
+        keys.sort()
+        self._prefix_keys = [key for key, _ in keys]
+        self._prefix_ids = array("I", (skill_id for _, skill_id in keys))
+
+        postings: dict[str, list[int]] = {}
+        for skill_id, folded in enumerate(self._folded):
+            for gram in _trigrams(folded):
+                postings.setdefault(gram, []).append(skill_id)
+        self._trigrams = {gram: array("I", ids_) for gram, ids_ in postings.items()}
+
+        self.version = version
+        self._index_path = index_path
+        self._relevance: _RelevanceIndex | None = None
+        self._relevance_lock = threading.Lock()
+
+    @classmethod
+    def from_csv(
+        cls,
+        path: str | os.PathLike,
+        version: tuple[int, int] | None = None,
+        index_path: Path | None = None,
+    ) -> "SkillsCatalogue":
+        """Parse the skills CSV (two header rows, then S/N, Skill, Description).
+
+        *version* identifies the file contents; with *index_path* it lets
+        :meth:`rank` reuse a relevance index saved by an earlier process.
+        """
+        rows: list[tuple[str, str]] = []
+        with open(path, encoding="utf-8", errors="replace", newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)  # skip header row 1 (title)
+            next(reader, None)  # skip header row 2 (S/N, Skill, Skills Description)
+            for row in reader:
+                if len(row) >= 3 and row[1].strip():
+                    rows.append((row[1].strip(), row[2].strip()))
+        return cls(rows, version, index_path)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._ids
+
+    def description(self, name: str) -> str:
+        """Description of *name* ("" if unknown); case-insensitive fallback."""
+        skill_id = self._ids.get(name)
+        if skill_id is None:
+            skill_id = self._folded_ids.get(_fold(name))
+        return "" if skill_id is None else self.descriptions[skill_id]
+
+    def canonical_name(self, name: str) -> str | None:
+        """The catalogue's spelling of *name*, matched case-insensitively."""
+        if name in self._ids:
+            return name
+        skill_id = self._folded_ids.get(_fold(name))
+        return None if skill_id is None else self.names[skill_id]
+
+    def search(self, query: str, limit: int = 20) -> list[str]:
+        """Names matching *query*, best first.
+
+        Exact matches rank first, then names starting with the query, then
+        names with a word starting with it, then (for queries of three or
+        more characters) names containing it anywhere; ties keep CSV order.
+        """
+        q = _fold(query)
+        if not q:
+            return list(self.names[:limit])
+        if len(q) < 3:
+            candidates = self._word_prefix_ids(q)
+        else:
+            candidates = self._trigram_ids(q)
+        ranked = sorted(candidates, key=lambda skill_id: (self._rank(skill_id, q), skill_id))
+        return [self.names[skill_id] for skill_id in ranked[:limit]]
+
+    def rank(self, text: str, limit: int = 10) -> list[tuple[str, float]]:
+        """The *limit* skills most relevant to *text*, as (name, BM25 score), best first.
+
+        Skills sharing no term with *text* are left out, so the result may
+        be shorter than *limit* (or empty).
+        """
+        index = self._relevance_index()
+        return [(self.names[skill_id], score) for skill_id, score in index.top(text, limit)]
+
+    def _relevance_index(self) -> _RelevanceIndex:
+        with self._relevance_lock:
+            if self._relevance is None:
+                can_persist = self.version is not None and self._index_path is not None
+                if can_persist:
+                    self._relevance = _RelevanceIndex.load(self._index_path, self.version, len(self))
+                if self._relevance is None:
+                    self._relevance = _RelevanceIndex.build([
+                        " ".join([name] * _NAME_WEIGHT + [description])
+                        for name, description in zip(self.names, self.descriptions)
+                    ])
+                    if can_persist:
+                        try:
+                            self._relevance.save(self._index_path, self.version)
+                        except OSError:
+                            pass
+            return self._relevance
+
+    def _word_prefix_ids(self, q: str) -> set[int]:
+        start = bisect.bisect_left(self._prefix_keys, q)
+        found: set[int] = set()
+        for i in range(start, len(self._prefix_keys)):
+            if not self._prefix_keys[i].startswith(q):
+                break
+            found.add(self._prefix_ids[i])
+        return found
+
+    def _trigram_ids(self, q: str) -> set[int]:
+        postings = []
+        for gram in _trigrams(q):
+            ids_ = self._trigrams.get(gram)
+            if ids_ is None:
+                return set()
+            postings.append(ids_)
+        postings.sort(key=len)
+        found = set(postings[0])
+        for ids_ in postings[1:]:
+            found.intersection_update(ids_)
+            if not found:
+                break
+        return {skill_id for skill_id in found if q in self._folded[skill_id]}
+
+    def _rank(self, skill_id: int, q: str) -> int:
+        folded = self._folded[skill_id]
+        if folded == q:
+            return 0
+        if folded.startswith(q):
+            return 1
+        if any(folded.startswith(q, start) for start in self._word_starts[skill_id]):
+            return 2
+        return 3
+
+
+_CACHE: dict[Path, tuple[tuple[int, int] | None, SkillsCatalogue]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def load_skills_catalogue(
+    path: str | os.PathLike = DEFAULT_SKILLS_CSV,
+    index_path: str | os.PathLike | None = DEFAULT_INDEX_PATH,
+) -> SkillsCatalogue:
+    """Return the catalogue for *path*, re-parsing only when the file changes.
+
+    *index_path* is where the relevance index behind
+    :meth:`SkillsCatalogue.rank` is persisted (None keeps it in memory only).
+    """
+    path = Path(path)
+    try:
+        st = path.stat()
+        version = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        version = None
+    with _CACHE_LOCK:
+        cached = _CACHE.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        try:
+            catalogue = SkillsCatalogue([]) if version is None else SkillsCatalogue.from_csv(
+                path, version, Path(index_path) if index_path is not None else None
+            )
+        except OSError:
+            version, catalogue = None, SkillsCatalogue([])
+        _CACHE[path] = (version, catalogue)
+        return catalogue
@@ -0,0 +1,228 @@
+"""Per-call generation telemetry.
+
+Every ``generate_*`` call records one :class:`CallRecord` (generator and
+template name, prompt/response size, queue wait, time to first token, total
+latency, cache hit and outcome) into a small SQLite store next to the
+response cache.  The store keeps the newest ``DEFAULT_MAX_ROWS`` calls and
+feeds the in-app "Performance" page, which summarises latency percentiles
+per generator.  Failures are stored with their traceback, replacing the old
+``ai_generator_error.log`` appends.
+
+Timing marks from inside the event loop (session acquired, first token) are
+reported through :data:`current_call`, which ``_generate_async`` sets for
+the duration of each call.
+"""
+import contextvars
+import math
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+DEFAULT_TELEMETRY_PATH = Path(__file__).resolve().parent.parent / "settings" / "config" / "telemetry.db"
+DEFAULT_MAX_ROWS = 20_000
+_TRIM_EVERY = 100   # inserts between rotations
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    generator TEXT NOT NULL,
+    template TEXT NOT NULL,
+    prompt_chars INTEGER NOT NULL,
+    response_chars INTEGER NOT NULL,
+    queue_wait REAL,
+    ttft REAL,
+    latency REAL NOT NULL,
+    cache_hit INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    error TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    hedged INTEGER NOT NULL DEFAULT 0,
+    coalesced INTEGER NOT NULL DEFAULT 0,
+    normalised INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_calls_generator ON calls (generator);
+"""
+# Columns added after the first release: name -> definition.
+_ADDED_COLUMNS = {
+    "attempts": "INTEGER NOT NULL DEFAULT 1",
+    "hedged": "INTEGER NOT NULL DEFAULT 0",
+    "coalesced": "INTEGER NOT NULL DEFAULT 0",
+    "normalised": "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+@dataclass
+class CallRecord:
+    """Measurements for one generation call; times are in seconds."""
+    generator: str
+    template: str
+    prompt_chars: int
+    response_chars: int = 0
+    queue_wait: float | None = None     # dispatch -> backend started work
+    ttft: float | None = None           # dispatch -> first text delta
+    latency: float = 0.0                # whole call, including cache lookup
+    cache_hit: bool = False
+    outcome: str = "ok"                 # ok | error | cancelled | unavailable
+    error: str = ""
+    attempts: int = 1                   # model attempts, including retries/hedges
+    hedged: bool = False
+    coalesced: bool = False             # shared an identical in-flight call
+    normalised: bool = False            # cache hit only thanks to input canonicalisation
+    started_at: float = field(default_factory=time.time)
+    _start: float = field(default_factory=time.monotonic, repr=False)
+
+    def mark_dispatched(self) -> None:
+        if self.queue_wait is None:
+            self.queue_wait = time.monotonic() - self._start
+
+    def mark_first_token(self) -> None:
+        if self.ttft is None:
+            self.ttft = time.monotonic() - self._start
+
+    def finish(self, response: str = "", error: str = "") -> "CallRecord":
+        self.latency = time.monotonic() - self._start
+        self.response_chars = len(response)
+        if error:
+            self.outcome, self.error = "error", error
+        return self
+
+
+# The call being served by the current event-loop task, if any.
+current_call: contextvars.ContextVar[CallRecord | None] = contextvars.ContextVar(
+    "current_call", default=None
+)
+
+
+def mark_dispatched() -> None:
+    """Record that the backend has started working on the current call."""
+    record = current_call.get()
+    if record is not None:
+        record.mark_dispatched()
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of *values*, or None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class TelemetryStore:
+    """SQLite-backed call log keeping the newest *max_rows* records."""
+
+    def __init__(self, path: Path = DEFAULT_TELEMETRY_PATH, max_rows: int = DEFAULT_MAX_ROWS) -> None:
+        self.path = Path(path)
+        self.max_rows = max_rows
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._inserts = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(calls)")}
+            for name, definition in _ADDED_COLUMNS.items():
+                if name not in existing:
+                    self._conn.execute(f"ALTER TABLE calls ADD COLUMN {name} {definition}")
+        return self._conn
+
+    def record(self, record: CallRecord) -> None:
+        row = asdict(record)
+        row.pop("_start")
+        row["cache_hit"] = int(row["cache_hit"])
+        row["hedged"] = int(row["hedged"])
+        row["coalesced"] = int(row["coalesced"])
+        row["normalised"] = int(row["normalised"])
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                f"INSERT INTO calls ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                tuple(row.values()),
+            )
+            self._inserts += 1
+            if self._inserts % _TRIM_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM calls WHERE id <= (SELECT MAX(id) FROM calls) - ?", (self.max_rows,)
+                )
+            conn.commit()
+
+    def recent(self, limit: int = 100, errors_only: bool = False) -> list[dict]:
+        """Return the newest *limit* calls, newest first."""
+        where = "WHERE outcome = 'error'" if errors_only else ""
+        with self._lock:
+            cursor = self._connection().execute(
+                f"SELECT * FROM calls {where} ORDER BY id DESC LIMIT ?", (limit,)
+            )
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def summary(self, since: float = 0.0) -> list[dict]:
+        """Per-generator call counts and p50/p95 latency, TTFT and queue wait.
+
+        Percentiles of latency/TTFT/queue wait cover calls that reached the
+        model; cache hits and calls coalesced onto an identical in-flight call
+        are counted separately.
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT generator, cache_hit, outcome, latency, ttft, queue_wait, attempts, hedged, coalesced, normalised "
+                "FROM calls WHERE started_at >= ?",
+                (since,),
+            ).fetchall()
+        by_generator: dict[str, list[tuple]] = {}
+        for row in rows:
+            by_generator.setdefault(row[0], []).append(row[1:])
+        summary = []
+        for generator, calls in sorted(by_generator.items()):
+            model_calls = [c for c in calls if not c[0] and not c[7] and c[1] == "ok"]
+            latency = [c[2] for c in model_calls]
+            ttft = [c[3] for c in model_calls if c[3] is not None]
+            queue_wait = [c[4] for c in model_calls if c[4] is not None]
+            summary.append({
+                "generator": generator,
+                "calls": len(calls),
+                "cache_hits": sum(1 for c in calls if c[0]),
+                "errors": sum(1 for c in calls if c[1] == "error"),
+                "cancelled": sum(1 for c in calls if c[1] == "cancelled"),
+                "unavailable": sum(1 for c in calls if c[1] == "unavailable"),
+                "retries": sum(max(0, c[5] - 1) for c in calls),
+                "hedged": sum(1 for c in calls if c[6]),
+                "coalesced": sum(1 for c in calls if c[7]),
+                "normalised": sum(1 for c in calls if c[8]),
+                "p50_latency": percentile(latency, 50),
+                "p95_latency": percentile(latency, 95),
+                "p50_ttft": percentile(ttft, 50),
+                "p95_ttft": percentile(ttft, 95),
+                "p50_queue_wait": percentile(queue_wait, 50),
+                "p95_queue_wait": percentile(queue_wait, 95),
+            })
+        return summary
+
+    def latency_percentile(
+        self, generator: str, pct: float, min_samples: int = 20, window: int = 200
+    ) -> float | None:
+        """Percentile of the last *window* successful model-call latencies of *generator*.
+
+        Returns None until at least *min_samples* calls have been recorded.
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT latency FROM calls WHERE generator = ? AND cache_hit = 0 "
+                "AND coalesced = 0 AND outcome = 'ok' ORDER BY id DESC LIMIT ?",
+                (generator, window),
+            ).fetchall()
+        if len(rows) < min_samples:
+            return None
+        return percentile([row[0] for row in rows], pct)
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM calls")
+            conn.commit()
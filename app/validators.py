@@ -0,0 +1,256 @@
+"""Local checks for the rules stated in the generator prompts.
+
+Each ``check_*`` function takes generated text and returns a list of
+human-readable problems (empty when the text satisfies its contract).  Hard
+caps such as "must NOT exceed 2000 characters" are checked exactly; soft
+targets such as "100-200 words" allow ``WORD_TOLERANCE`` either side, since
+regenerating for a few words over is not worth a model round-trip.
+
+:data:`CHECKS` registers the checks by generator name; :func:`check` runs
+the one for a generator.  The ``split_*`` / ``parse_*`` helpers expose the
+individual items (job roles, titles, learning outcomes) so that callers can
+repair only the failing ones.
+"""
+import re
+from collections.abc import Callable, Mapping
+
+MAX_SECTION_CHARS = 2000
+WORD_TOLERANCE = 0.2
+
+_BULLET = re.compile(r"^\s*•")
+_DASH_BULLET = re.compile(r"^\s*-\s+")
+_LIST_OR_HEADING = re.compile(r"^\s*(?:[-*•]\s|\d+[.)]\s|#)")
+
+
+def _word_count(text: str) -> int:
+    return len(text.split())
+
+
+def _count_lines(text: str, pattern: re.Pattern) -> int:
+    return sum(1 for line in text.splitlines() if pattern.match(line))
+
+
+def _check_not_empty(text: str) -> list[str]:
+    return [] if text and text.strip() else ["Section is empty"]
+
+
+def _check_char_cap(text: str, limit: int = MAX_SECTION_CHARS) -> list[str]:
+    if len(text) > limit:
+        return [f"{len(text)} characters exceeds the {limit}-character limit"]
+    return []
+
+
+def _check_word_range(text: str, low: int, high: int) -> list[str]:
+    words = _word_count(text)
+    if words < low * (1 - WORD_TOLERANCE) or words > high * (1 + WORD_TOLERANCE):
+        return [f"{words} words is outside the {low}-{high} word range"]
+    return []
+
+
+def check_about_course(text: str) -> list[str]:
+    """About This Course: prose only, at most 2000 characters."""
+    problems = _check_not_empty(text)
+    if problems:
+        return problems
+    problems += _check_char_cap(text)
+    if _count_lines(text, _LIST_OR_HEADING):
+        problems.append("Contains bullet points, numbered lists or headings")
+    return problems
+
+
+def check_what_youll_learn(text: str) -> list[str]:
+    """What You'll Learn: 3-5 '•' bullets, at most 2000 characters."""
+    problems = _check_not_empty(text)
+    if problems:
+        return problems
+    problems += _check_char_cap(text)
+    bullets = _count_lines(text, _BULLET)
+    if not 3 <= bullets <= 5:
+        problems.append(f"Has {bullets} '•' bullet points; expected 3-5")
+    return problems
+
+
+def check_background_part_a(text: str) -> list[str]:
+    """Background Part A: 100-200 words of prose."""
+    problems = _check_not_empty(text)
+    if problems:
+        return problems
+    problems += _check_word_range(text, 100, 200)
+    return problems
+
+
+def check_background_part_b(text: str) -> list[str]:
+    """Background Part B: gap/identification paragraphs plus 3-5 '- ' benefit bullets."""
+    problems = _check_not_empty(text)
+    if problems:
+        return problems
+    bullets = _count_lines(text, _DASH_BULLET)
+    if not 3 <= bullets <= 5:
+        problems.append(f"Has {bullets} '- ' benefit bullet points; expected 3-5")
+    return problems
+
+
+MAX_LEARNING_OUTCOME_WORDS = 25   # "less than 25 words"
+JOB_ROLE_COUNT = 10
+TITLE_SUGGESTION_COUNT = 20
+
+# "## Topic 1: Name", "Topic 1 - Name", "T1: Name"
+_TOPIC_LINE = re.compile(r"^\s*#*\s*(?:topic|t)\s*(\d+)\s*[:.)\-]\s*(.+?)\s*$", re.IGNORECASE)
+# "LO1: ...", "**LO1:** ..."
+_LEARNING_OUTCOME_LINE = re.compile(r"^\s*\**\s*LO\s*(\d+)\s*\**\s*[:.\-]\s*\**\s*(.+?)\s*$", re.IGNORECASE)
+_NUMBERED_LINE = re.compile(r"^\s*\d+\s*[.)]\s*(.+?)\s*$")
+
+
+def topic_names(course_topics: str) -> dict[int, str]:
+    """Topic number -> name for the numbered topic headers in a Course Topics input."""
+    topics: dict[int, str] = {}
+    for line in course_topics.splitlines():
+        match = _TOPIC_LINE.match(line)
+        if match:
+            topics.setdefault(int(match.group(1)), match.group(2).strip("*# "))
+    return topics
+
+
+def parse_learning_outcomes(text: str) -> dict[int, str]:
+    """LO number -> outcome text (the first occurrence of each number)."""
+    outcomes: dict[int, str] = {}
+    for line in text.splitlines():
+        match = _LEARNING_OUTCOME_LINE.match(line)
+        if match:
+            outcomes.setdefault(int(match.group(1)), match.group(2))
+    return outcomes
+
+
+def replace_learning_outcomes(text: str, outcomes: Mapping[int, str]) -> str:
+    """Rewrite the LO lines of *text* from *outcomes*, dropping repeated LO numbers."""
+    lines: list[str] = []
+    seen: set[int] = set()
+    for line in text.splitlines():
+        match = _LEARNING_OUTCOME_LINE.match(line)
+        if match:
+            number = int(match.group(1))
+            if number in seen:
+                continue
+            seen.add(number)
+            line = f"LO{number}: {outcomes.get(number, match.group(2))}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def missing_learning_outcomes(text: str, course_topics: str) -> list[int]:
+    """Numbers of input topics that have no learning outcome."""
+    outcomes = parse_learning_outcomes(text)
+    return [number for number in topic_names(course_topics) if number not in outcomes]
+
+
+def long_learning_outcomes(text: str) -> list[int]:
+    """Numbers of learning outcomes that are not under MAX_LEARNING_OUTCOME_WORDS words."""
+    return [
+        number for number, outcome in parse_learning_outcomes(text).items()
+        if _word_count(outcome) >= MAX_LEARNING_OUTCOME_WORDS
+    ]
+
+
+def check_learning_outcomes(text: str, course_topics: str = "") -> list[str]:
+    """Learning Outcomes: one LO per input topic, each under 25 words."""
+    problems = _check_not_empty(text)
+    if problems:
+        return problems
+    counts: dict[int, int] = {}
+    for line in text.splitlines():
+        match = _LEARNING_OUTCOME_LINE.match(line)
+        if match:
+            counts[int(match.group(1))] = counts.get(int(match.group(1)), 0) + 1
+    if not counts:
+        return ["No 'LO1: ...' learning outcome lines found"]
+    missing = missing_learning_outcomes(text, course_topics)
+    if missing:
+        problems.append("No learning outcome for " + ", ".join(f"T{n}" for n in missing))
+    duplicated = [number for number, count in counts.items() if count > 1]
+    if duplicated:
+        problems.append("More than one learning outcome for " + ", ".join(f"T{n}" for n in duplicated))
+    long = long_learning_outcomes(text)
+    if long:
+        problems.append(
+            ", ".join(f"LO{n}" for n in long) + f" not under {MAX_LEARNING_OUTCOME_WORDS} words"
+        )
+    return problems
+
+
+def split_job_roles(text: str) -> list[str]:
+    """The job roles of a comma-separated (or one-per-line) reply, numbering and
+    bullets removed, duplicates (ignoring case) dropped."""
+    roles: list[str] = []
+    seen: set[str] = set()
+    for part in re.split(r"[,\n]", text):
+        role = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", part).strip(" *.\"'")
+        if role and role.casefold() not in seen:
+            seen.add(role.casefold())
+            roles.append(role)
+    return roles
+
+
+def check_job_roles(text: str) -> list[str]:
+    """Job Roles: exactly 10 distinct roles on one comma-separated line."""
+    problems = _check_not_empty(text)
+    if problems:
+        return problems
+    roles = split_job_roles(text)
+    if len(roles) != JOB_ROLE_COUNT:
+        problems.append(f"Has {len(roles)} distinct job roles; expected {JOB_ROLE_COUNT}")
+    if len(text.strip().splitlines()) > 1:
+        problems.append("Job roles are not on a single comma-separated line")
+    return problems
+
+
+def split_titles(text: str) -> list[str]:
+    """The titles of a numbered list, duplicates (ignoring case) dropped."""
+    titles: list[str] = []
+    seen: set[str] = set()
+    for line in text.splitlines():
+        match = _NUMBERED_LINE.match(line)
+        if match:
+            title = match.group(1).strip(" *\"'")
+            if title and title.casefold() not in seen:
+                seen.add(title.casefold())
+                titles.append(title)
+    return titles
+
+
+def check_course_title_suggestions(text: str) -> list[str]:
+    """Course Title Suggestions: exactly 20 distinct titles numbered 1-20."""
+    problems = _check_not_empty(text)
+    if problems:
+        return problems
+    titles = split_titles(text)
+    if len(titles) != TITLE_SUGGESTION_COUNT:
+        problems.append(f"Has {len(titles)} distinct numbered titles; expected {TITLE_SUGGESTION_COUNT}")
+    return problems
+
+
+def check_course_outline(text: str) -> list[str]:
+    """Course Outline: at most 2000 characters."""
+    return _check_not_empty(text) or _check_char_cap(text)
+
+
+# Generator name -> check(text, inputs) for the prompts' built-in contracts;
+# *inputs* are the generator's keyword arguments (e.g. course_topics).
+CHECKS: dict[str, Callable[[str, Mapping[str, str]], list[str]]] = {
+    "generate_about_course": lambda text, inputs: check_about_course(text),
+    "generate_what_youll_learn": lambda text, inputs: check_what_youll_learn(text),
+    "generate_background_part_a": lambda text, inputs: check_background_part_a(text),
+    "generate_background_part_b": lambda text, inputs: check_background_part_b(text),
+    "generate_learning_outcomes": lambda text, inputs: check_learning_outcomes(
+        text, inputs.get("course_topics", "")
+    ),
+    "generate_job_roles": lambda text, inputs: check_job_roles(text),
+    "generate_course_title_suggestions": lambda text, inputs: check_course_title_suggestions(text),
+    "generate_course_outline": lambda text, inputs: check_course_outline(text),
+}
+
+
+def check(generator: str, text: str, **inputs: str) -> list[str]:
+    """Problems with *text* as the output of *generator* (a ``generate_*``
+    function name); always empty for generators without a registered check."""
+    checker = CHECKS.get(generator)
+    return checker(text, inputs) if checker else []
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Benchmark the app's own generation overhead against the offline fixture backend.
+
+No Claude CLI or network is needed: every prompt is answered by
+app.backends.FixtureBackend with a fixed artificial latency, so anything
+above that latency is time spent in the app (caching, event loop, pipeline).
+
+    python bench_generation.py --latency 0.5 --jitter 0.1 --calls 20
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app import ai_generator as ai
+from app.backends import FixtureBackend
+from app.pipeline import build_cp_pipeline, critical_path_seconds, run_pipeline
+from app.response_cache import ResponseCache
+from app.telemetry import TelemetryStore
+
+COURSE_TITLE = "Business Innovation with Agentic AI"
+COURSE_TOPICS = "\n".join(f"T{i}: Topic {i}" for i in range(1, 5))
+SESSION = {
+    "saved_course_title": COURSE_TITLE,
+    "saved_course_topics": COURSE_TOPICS,
+    "saved_instr_methods": ["Interactive Presentation", "Case Study"],
+    "saved_assess_methods": ["Written Exam", "Practical Exam"],
+    "saved_course_duration": 16,
+    "saved_num_topics": 4,
+    "cv_industry": "Retail",
+}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def report(label: str, seconds: list[float], baseline: float | None = None) -> None:
+    line = (
+        f"{label:<28} n={len(seconds):<4} "
+        f"p50={percentile(seconds, 50):.3f}s  p95={percentile(seconds, 95):.3f}s  "
+        f"max={max(seconds):.3f}s"
+    )
+    if baseline is not None:
+        line += f"  mean overhead={statistics.mean(seconds) - baseline:+.3f}s"
+    print(line)
+
+
+def bench_single(calls: int, latency: float) -> None:
+    seconds = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        ai.generate_about_course(COURSE_TITLE, COURSE_TOPICS, bypass_cache=True)
+        seconds.append(time.perf_counter() - start)
+    report("generate_about_course", seconds, latency)
+
+    seconds = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        ai.generate_about_course(COURSE_TITLE, COURSE_TOPICS)
+        seconds.append(time.perf_counter() - start)
+    report("generate_about_course cached", seconds, 0.0)
+
+
+def bench_pipeline(runs: int, combine_sections: bool, cache_dir: Path) -> None:
+    label = "pipeline (combined)" if combine_sections else "pipeline"
+    walls, overheads = [], []
+    for run in range(runs):
+        # Fresh cache per run so every node reaches the backend.
+        ai._RESPONSE_CACHE = ResponseCache(cache_dir / f"{label}-{run}.db")
+        session = dict(SESSION)
+        nodes = build_cp_pipeline(session, combine_sections=combine_sections)
+        start = time.perf_counter()
+        results = run_pipeline(nodes, session)
+        wall = time.perf_counter() - start
+        failed = [r.name for r in results.values() if r.status != "done"]
+        if failed:
+            print(f"  run {run}: nodes not done: {failed}")
+        walls.append(wall)
+        overheads.append(wall - critical_path_seconds(results))
+    report(label, walls)
+    print(f"{'':<28} mean wall - critical path = {statistics.mean(overheads):+.3f}s "
+          f"({len(nodes)} nodes)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="fixture latency per call (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± latency jitter (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="injected failure probability")
+    parser.add_argument("--calls", type=int, default=10, help="sequential single-section calls")
+    parser.add_argument("--runs", type=int, default=3, help="full CP pipeline runs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    backend = FixtureBackend(
+        latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate, seed=args.seed
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep benchmark calls out of the app's real cache and telemetry.
+        cache_dir = Path(tmp)
+        ai._RESPONSE_CACHE = ResponseCache(cache_dir / "single.db")
+        ai._TELEMETRY = TelemetryStore(cache_dir / "telemetry.db")
+        ai.set_backend(backend)
+        print(f"Fixture backend: latency={args.latency}s ±{args.jitter}s, "
+              f"failure rate={args.failure_rate:.0%}")
+        print("=" * 60)
+
+        bench_single(args.calls, args.latency)
+        bench_pipeline(args.runs, False, cache_dir)
+        bench_pipeline(args.runs, True, cache_dir)
+
+    print("=" * 60)
+    print(f"Backend calls: {backend.calls}, injected failures: {backend.failures}")
+
+if __name__ == "__main__":
+    main()
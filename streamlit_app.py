@@ -1,7 +1,9 @@
 import html
+import json
 import os
 import re
 import tempfile
+import time
 from pathlib import Path
 
 # CRITICAL FIX: Unset CLAUDECODE before any other imports
@@ -10,6 +12,7 @@ if "CLAUDECODE" in os.environ:
     del os.environ["CLAUDECODE"]
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 from app.ai_generator import (
     ABOUT_COURSE_PROMPT_TEMPLATE,
@@ -21,35 +24,59 @@ from app.ai_generator import (
     COURSE_OUTLINE_PROMPT_TEMPLATE,
     COURSE_TOPICS_PROMPT_TEMPLATE,
     COURSE_VALIDATION_PROMPT_TEMPLATE,
+    COURSE_VALIDATION_SET_PROMPT_TEMPLATE,
     INSTRUCTION_METHOD_PROMPT_TEMPLATE,
     LEARNING_OUTCOME_PROMPT_TEMPLATE,
     LESSON_PLAN_PROMPT_TEMPLATE,
     INSTRUCTION_METHODS_LIST,
     LU_SEQUENCING_TYPES,
     LU_SEQUENCING_TEMPLATES,
-    UNIQUE_SKILL_NAMES_LIST,
-    SKILL_DESCRIPTIONS,
     JOB_ROLES_PROMPT_TEMPLATE,
     MINIMUM_ENTRY_REQUIREMENT_PROMPT_TEMPLATE,
     WHAT_YOULL_LEARN_PROMPT_TEMPLATE,
+    cancel_generation_job,
+    check_backend_health,
+    clear_telemetry,
     generate_about_course,
-    generate_assessment_method,
+    generate_assessment_methods,
     generate_background_part_a,
     generate_background_part_b,
     generate_course_title_suggestions,
     generate_course_outline,
     generate_course_topics,
     generate_course_validation,
-    generate_instruction_method,
+    generate_course_validation_sets,
+    generate_instruction_methods,
     generate_learning_outcomes,
     generate_lesson_plan_content,
-    parse_ai_lesson_plan,
     generate_lu_sequencing_rationale,
+    generate_lu_sequencing_rationales,
     generate_job_roles,
     generate_minimum_entry_requirement,
     generate_what_youll_learn,
+    get_backend_health,
+    get_cache_stats,
+    get_contract_stats,
+    get_outline_compaction_stats,
+    get_performance_summary,
+    get_prefetch_stats,
+    get_recent_calls,
+    get_queue_status,
+    get_retry_policy,
+    get_single_flight_stats,
+    get_generation_job,
+    get_skills_catalogue,
+    prefetch_sections,
+    rank_skills_for_course,
+    set_max_in_flight,
+    set_request_owner,
+    submit_batch_generation_job,
+    submit_generation_job,
 )
 from app.extractor import build_course_outline, build_course_topics, extract_data
+from app.jobs import CANCELLED as JOB_CANCELLED, DONE as JOB_DONE
+from app.lesson_plan_parser import LessonPlanParser
+from app.pipeline import build_cp_pipeline, critical_path_seconds, run_pipeline
 from app.simple_lesson_plan import DEFAULT_RESOURCES, build_simple_lesson_plan
 from app.generator_docx import generate_audit_report
 from app.generator_lesson_plan import (
@@ -63,6 +90,15 @@ from app.generator_lesson_plan_pdf import (
 
 st.set_page_config(page_title="CASL Course Document Generator", page_icon="📄", layout="wide")
 
+# Queue this browser session's AI requests fairly against other sessions.
+_script_ctx = get_script_run_ctx()
+if _script_ctx is not None:
+    set_request_owner(_script_ctx.session_id)
+
+# Settings shared by every session (e.g. the AI concurrency limit) are only
+# editable in the app when the server is started with CP_ADMIN_CONTROLS=1.
+_ADMIN_CONTROLS = os.environ.get("CP_ADMIN_CONTROLS", "") == "1"
+
 
 LIGHT_THEME_CSS = """
 <style>
@@ -133,15 +169,182 @@ def apply_theme(light: bool) -> None:
         st.markdown(LIGHT_THEME_CSS, unsafe_allow_html=True)
 
 
-def _render_lesson_plan_table(rows: list[dict]) -> str:
+_SIMPLE_LESSON_PLAN_COLUMNS = [
+    ("Time", "time", "15%"),
+    ("Topics", "topic", "45%"),
+    ("Instructional Methods", "method", "22%"),
+    ("Resources", "resources", "18%"),
+]
+_AI_LESSON_PLAN_COLUMNS = [
+    ("Time", "timing", "18%"),
+    ("Topics", "description", "47%"),
+    ("Duration", "duration", "12%"),
+    ("Instructional Methods", "methods", "23%"),
+]
+
+
+def _start_job(target_key: str, label: str, error_prefix: str, generator, *args, on_done=None, **kwargs) -> None:
+    """Run ``generator(*args, **kwargs)`` as a background job whose result is stored in
+    ``st.session_state[target_key]`` when it finishes, even if the user has moved on
+    (reruns no longer abandon the call).  *on_done(result)*, if given, returns the
+    value to store instead.  A job still filling *target_key* is cancelled: its
+    result would be overwritten anyway."""
+    _track_job(target_key, error_prefix, on_done, submit_generation_job(label, generator, *args, **kwargs))
+
+
+def _start_batch_job(target_key: str, label: str, error_prefix: str, generator, *args, **kwargs) -> None:
+    """Like :func:`_start_job` for the generators returning {name: text}; that dict is stored."""
+    _track_job(target_key, error_prefix, json.loads, submit_batch_generation_job(label, generator, *args, **kwargs))
+
+
+def _track_job(target_key: str, error_prefix: str, on_done, job_id: str) -> None:
+    pending = st.session_state.setdefault("pending_jobs", {})
+    for old_id, (key, *_) in list(pending.items()):
+        if key == target_key:
+            cancel_generation_job(old_id)
+            del pending[old_id]
+    pending[job_id] = (target_key, error_prefix, on_done)
+    st.session_state.get("job_errors", {}).pop(target_key, None)
+
+
+def _attach_finished_jobs() -> None:
+    """Copy the results of this session's finished background jobs into session state."""
+    pending = st.session_state.get("pending_jobs", {})
+    for job_id, (target_key, error_prefix, on_done) in list(pending.items()):
+        job = get_generation_job(job_id)
+        if job is not None and job.active:
+            continue
+        del pending[job_id]
+        if job is not None and job.status == JOB_DONE:
+            st.session_state[target_key] = on_done(job.result) if on_done else job.result
+        elif job is not None and job.status == JOB_CANCELLED:
+            continue
+        else:
+            error = job.error if job is not None else "The job record was lost."
+            st.session_state.setdefault("job_errors", {})[target_key] = f"{error_prefix}: {error}"
+
+
+@st.fragment(run_every=1.0)
+def _job_progress(job_id: str, render=None) -> None:
+    job = get_generation_job(job_id)
+    if job is None or not job.active:
+        st.rerun()  # whole app: _attach_finished_jobs picks up the result
+    if job.partial_text:
+        if render:
+            render(job.partial_text)
+        else:
+            st.code(job.partial_text, language=None, wrap_lines=True)
+    state = "waiting to start" if job.status == "queued" else "running"
+    col_status, col_cancel = st.columns([5, 1])
+    col_status.caption(
+        f"{job.label}… ({state}, {job.elapsed:.0f}s). You can keep working on other pages; "
+        "the result will appear here when it is ready."
+    )
+    if col_cancel.button("Cancel", key=f"cancel_job_{job_id}", use_container_width=True):
+        cancel_generation_job(job_id)
+        st.rerun()
+
+
+def _course_topics_generated(result: str) -> str:
+    """Job callback for generated course topics: also updates the topic count."""
+    # Auto-detect actual topic count from generated result
+    generated_count = len(re.findall(r"^##\s*Topic\s*\d+", result, re.MULTILINE))
+    if generated_count > 0:
+        st.session_state["saved_num_topics"] = generated_count
+    return result
+
+
+def _lesson_plan_generated(result: str) -> str:
+    """Job callback for the AI lesson plan: its documents are rebuilt on the Lesson Plan page."""
+    st.session_state["lp_generated"] = False
+    st.session_state["lp_build_docs"] = True
+    return result
+
+
+def _show_backend_health() -> None:
+    """Banner shown on every page while the AI backend is marked unhealthy."""
+    health = get_backend_health()
+    if health["state"] == "half-open":
+        st.info("🔄 The Claude CLI passed a health check; the next AI request will confirm it is working again.")
+    if health["state"] != "open":
+        return
+    since = time.strftime("%H:%M", time.localtime(health["opened_at"])) if health["opened_at"] else "recently"
+    next_check = health["next_probe_at"]
+    col_message, col_check = st.columns([5, 1])
+    col_message.error(
+        f"⚠️ AI generation is unavailable (since {since}): {health['last_error']}\n\n"
+        "AI requests fail immediately until the Claude CLI responds again. Make sure Claude Code "
+        "is installed and logged in (run `claude` in a terminal)."
+        + (f" Checking again in {max(0, next_check - time.time()):.0f}s." if next_check else "")
+    )
+    if col_check.button("Check now", key="backend_health_check", use_container_width=True):
+        with st.spinner("Checking the Claude CLI..."):
+            check_backend_health()
+        st.rerun()
+
+
+def _show_job(target_key: str, render=None) -> None:
+    """Show the live progress of the background job filling *target_key*, or its error.
+    *render(text)* draws the text streamed so far (default: as a code block)."""
+    error = st.session_state.get("job_errors", {}).pop(target_key, None)
+    if error:
+        st.error(error)
+    for job_id, (key, *_) in st.session_state.get("pending_jobs", {}).items():
+        if key == target_key:
+            _job_progress(job_id, render)
+            break
+
+
+def _start_prefetch(course_title: str, course_topics: str) -> None:
+    """Generate About / What You'll Learn / Background into the response cache in
+    the background, using the prompt templates those pages will use."""
+    prefetch = st.session_state.get("prefetch")
+    if prefetch and prefetch["details"] == (course_title, course_topics):
+        return
+    if prefetch:
+        prefetch["token"].cancel()
+    st.session_state["prefetch"] = {
+        "details": (course_title, course_topics),
+        "token": prefetch_sections(course_title, course_topics, {
+            "generate_about_course": st.session_state.get("about_prompt"),
+            "generate_what_youll_learn": st.session_state.get("wyl_prompt"),
+            "generate_background_part_a": st.session_state.get("bg_prompt"),
+            "generate_background_part_b": st.session_state.get("bgb_prompt"),
+        }),
+    }
+
+
+def _cancel_stale_prefetch() -> None:
+    """Abandon a running prefetch once the saved course details no longer match it."""
+    prefetch = st.session_state.get("prefetch")
+    details = (st.session_state.get("saved_course_title", ""), st.session_state.get("saved_course_topics", ""))
+    if prefetch and prefetch["details"] != details:
+        prefetch["token"].cancel()
+        del st.session_state["prefetch"]
+
+
+def _show_lesson_plan_preview(text: str) -> None:
+    """Render a partly generated lesson plan as tables that grow row by row."""
+    parser = LessonPlanParser()
+    parser.feed(text)
+    if not parser.schedule:
+        st.code(text, language=None, wrap_lines=True)
+    for day, rows in parser.schedule.items():
+        st.markdown(f"**Day {day}**")
+        st.markdown(_render_lesson_plan_table(rows, _AI_LESSON_PLAN_COLUMNS), unsafe_allow_html=True)
+
+
+def _show_batch_preview(text: str) -> None:
+    """Render the ``### name`` sections a batch job has streamed so far."""
+    for name, body in re.findall(r"^### ([^\n]+)\n(.*?)(?=^### |\Z)", text, re.MULTILINE | re.DOTALL):
+        st.markdown(f"### {name}")
+        st.code(body.strip(), language=None, wrap_lines=True)
+
+
+def _render_lesson_plan_table(rows: list[dict], cols: list[tuple[str, str, str]] = _SIMPLE_LESSON_PLAN_COLUMNS) -> str:
     """Render a day's lesson plan rows as a theme-friendly HTML table that wraps
-    long topic text and shows all four columns within the container width."""
-    cols = [
-        ("Time", "time", "15%"),
-        ("Topics", "topic", "45%"),
-        ("Instructional Methods", "method", "22%"),
-        ("Resources", "resources", "18%"),
-    ]
+    long topic text and shows all columns within the container width.
+    *cols* lists (header, row key, width) per column."""
     border = "1px solid rgba(128,128,128,0.4)"
     th = (
         f"text-align:left;padding:6px 10px;border:{border};"
@@ -154,7 +357,7 @@ def _render_lesson_plan_table(rows: list[dict]) -> str:
     body = ""
     for r in rows:
         body += "<tr>" + "".join(
-            f'<td style="{td}">{html.escape(str(r[key]))}</td>' for _, key, _ in cols
+            f'<td style="{td}">{html.escape(str(r.get(key, "")))}</td>' for _, key, _ in cols
         ) + "</tr>"
     return (
         '<table style="width:100%;border-collapse:collapse;font-size:0.9rem;'
@@ -204,8 +407,8 @@ def populate_session_from_cp(data) -> list[str]:
 
     # --- Course Details: CASL unique skill name ---
     if st.session_state.get("cp_mode") == "CASL" and p.unique_skill_names:
-        usn = p.unique_skill_names[0]
-        if usn in UNIQUE_SKILL_NAMES_LIST:
+        usn = get_skills_catalogue().canonical_name(p.unique_skill_names[0])
+        if usn:
             st.session_state["saved_unique_skill_name"] = usn
             st.session_state["cd_unique_skill_name"] = usn
 
@@ -235,6 +438,10 @@ def populate_session_from_cp(data) -> list[str]:
 
     return populated
 
+# --- Results of background generation jobs that finished since the last run ---
+_attach_finished_jobs()
+_cancel_stale_prefetch()
+
 # --- Sidebar Navigation ---
 if "active_page" not in st.session_state:
     st.session_state["active_page"] = "Course Details"
@@ -309,6 +516,15 @@ with st.sidebar:
         st.session_state["active_page"] = "CP Quality Audit"
         st.rerun()
 
+    st.markdown("---")
+    st.caption("DIAGNOSTICS")
+    if st.button("Performance", use_container_width=True,
+                 type="primary" if st.session_state["active_page"] == "Performance" else "secondary"):
+        st.session_state["active_page"] = "Performance"
+        st.rerun()
+    if st.session_state.get("pending_jobs"):
+        st.caption(f"⏳ {len(st.session_state['pending_jobs'])} AI job(s) running in the background")
+
     st.markdown("---")
     st.caption("Powered by Tertiary Infotech Academy Pte Ltd")
 
@@ -322,6 +538,9 @@ with _top_right:
 # --- Apply selected theme (dark default via config; light via CSS overrides) ---
 apply_theme(light_mode)
 
+# --- AI backend health (circuit breaker) banner ---
+_show_backend_health()
+
 # --- Helper: saved course details from session state ---
 saved_title = st.session_state.get("saved_course_title", "")
 saved_topics = st.session_state.get("saved_course_topics", "")
@@ -435,15 +654,17 @@ if active_page == "Course Details":
             if not course_title:
                 st.warning("Please enter a course topic in the Course Title field first.")
             else:
-                with st.spinner("Generating course title suggestions..."):
-                    try:
-                        result = generate_course_title_suggestions(
-                            course_title,
-                            prompt_template=st.session_state.get("ct_prompt"),
-                        )
-                        st.session_state["ct_suggestions"] = result
-                    except Exception as e:
-                        st.error(f"Failed to generate title suggestions: {e}")
+                _start_job(
+                    "ct_suggestions",
+                    "Generating course title suggestions",
+                    "Failed to generate title suggestions",
+                    generate_course_title_suggestions,
+                    course_title,
+                    prompt_template=st.session_state.get("ct_prompt"),
+                    bypass_cache=True,
+                )
+
+        _show_job("ct_suggestions")
 
         if st.session_state.get("ct_suggestions"):
             st.divider()
@@ -452,16 +673,38 @@ if active_page == "Course Details":
 
     # --- CASL-specific fields ---
     if st.session_state.get("cp_mode") == "CASL":
-        if "cd_unique_skill_name" not in st.session_state:
-            _saved_usn = st.session_state.get("saved_unique_skill_name", "")
-            st.session_state["cd_unique_skill_name"] = (
-                _saved_usn if _saved_usn in UNIQUE_SKILL_NAMES_LIST else UNIQUE_SKILL_NAMES_LIST[0]
+        skills = get_skills_catalogue()
+        if not skills:
+            st.warning("Skills list not found (.claude/skills/generate_topics/skills_description.csv).")
+            unique_skill_name = st.session_state.get("saved_unique_skill_name", "")
+        else:
+            if st.session_state.get("cd_unique_skill_name") not in skills:
+                _saved_usn = st.session_state.get("saved_unique_skill_name", "")
+                st.session_state["cd_unique_skill_name"] = (
+                    _saved_usn if _saved_usn in skills else skills.names[0]
+                )
+            skill_query = st.text_input(
+                "Search Skills",
+                placeholder="Type part of a skill name to narrow the list",
+                key="cd_skill_search",
+            )
+            if skill_query:
+                skill_options = skills.search(skill_query, limit=50)
+                suggested = set()
+            else:
+                # Skills most relevant to the course title first, then the rest in list order.
+                ranked = [name for name, _ in rank_skills_for_course(course_title or "", limit=10)]
+                suggested = set(ranked)
+                skill_options = ranked + [name for name in skills.names if name not in suggested]
+            if st.session_state["cd_unique_skill_name"] not in skill_options:
+                skill_options.insert(0, st.session_state["cd_unique_skill_name"])
+            unique_skill_name = st.selectbox(
+                "Unique Skill Name",
+                options=skill_options,
+                format_func=lambda name: f"★ {name}" if name in suggested else name,
+                key="cd_unique_skill_name",
+                help="★ marks the skills that best match the course title.",
             )
-        unique_skill_name = st.selectbox(
-            "Unique Skill Name",
-            options=UNIQUE_SKILL_NAMES_LIST,
-            key="cd_unique_skill_name",
-        )
 
     # --- WSQ-specific fields ---
     if st.session_state.get("cp_mode") == "WSQ":
@@ -490,7 +733,7 @@ if active_page == "Course Details":
         # Show skill description context for CASL mode
         if st.session_state.get("cp_mode") == "CASL":
             selected_skill = st.session_state.get("cd_unique_skill_name", "")
-            skill_desc_preview = SKILL_DESCRIPTIONS.get(selected_skill, "")
+            skill_desc_preview = get_skills_catalogue().description(selected_skill)
             if skill_desc_preview:
                 st.info(f"**Skill:** {selected_skill}\n\n**Description:** {skill_desc_preview[:300]}{'...' if len(skill_desc_preview) > 300 else ''}")
             else:
@@ -519,26 +762,23 @@ if active_page == "Course Details":
             if not course_title:
                 st.warning("Please enter a course title first.")
             else:
-                with st.spinner("Generating course topics..."):
-                    try:
-                        # In CASL mode, look up the skill description for context
-                        skill_desc = ""
-                        if st.session_state.get("cp_mode") == "CASL":
-                            selected_skill = st.session_state.get("cd_unique_skill_name", "")
-                            skill_desc = SKILL_DESCRIPTIONS.get(selected_skill, "")
-                        result = generate_course_topics(
-                            course_title, num_days_est,
-                            skill_description=skill_desc,
-                            special_requirements=special_req,
-                        )
-                        st.session_state["cd_course_topics"] = result
-                        # Auto-detect actual topic count from generated result
-                        generated_count = len(re.findall(r"^##\s*Topic\s*\d+", result, re.MULTILINE))
-                        if generated_count > 0:
-                            st.session_state["saved_num_topics"] = generated_count
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Failed to generate topics: {e}")
+                # In CASL mode, look up the skill description for context
+                skill_desc = ""
+                if st.session_state.get("cp_mode") == "CASL":
+                    selected_skill = st.session_state.get("cd_unique_skill_name", "")
+                    skill_desc = get_skills_catalogue().description(selected_skill)
+                _start_job(
+                    "cd_course_topics",
+                    "Generating course topics",
+                    "Failed to generate topics",
+                    generate_course_topics,
+                    course_title, num_days_est,
+                    skill_description=skill_desc,
+                    special_requirements=special_req,
+                    bypass_cache=True,
+                    on_done=_course_topics_generated,
+                )
+        _show_job("cd_course_topics")
 
     # --- Course Topics (outside form, editable) ---
     course_topics = st.text_area(
@@ -620,6 +860,13 @@ if active_page == "Course Details":
                 "Written Exam", "Practical Exam",
             ]),
         )
+        prefetch_enabled = st.checkbox(
+            "Prepare About, What You'll Learn and Background in the background after saving",
+            value=os.environ.get("CP_PREFETCH_SECTIONS", "") == "1",
+            key="cd_prefetch_sections",
+            help="Generates those sections at low priority as soon as the details are saved, so "
+                 "opening their pages and clicking Generate is near-instant. Uses extra AI calls.",
+        )
         submitted = st.form_submit_button("Save Course Details", type="primary", use_container_width=True)
 
     if submitted:
@@ -645,6 +892,8 @@ if active_page == "Course Details":
             if st.session_state.get("cp_mode") == "WSQ":
                 st.session_state["saved_tsc_ref_code"] = tsc_ref_code
                 st.session_state["saved_tsc_title"] = tsc_title
+            if prefetch_enabled:
+                _start_prefetch(course_title, course_topics)
             st.rerun()
 
     # --- Show saved details ---
@@ -695,6 +944,65 @@ if active_page == "Course Details":
         }
         st.dataframe(summary_data, use_container_width=True, hide_index=True)
 
+        # --- Generate every CP section in one go ---
+        st.divider()
+        st.subheader("Generate Entire CP with AI")
+        st.markdown(
+            "Generate every Prepare/Submit CP section from the saved course details. "
+            "Independent sections run in parallel; LU Sequencing waits for the "
+            "Learning Outcomes and Course Outline, and Course Validation (only when an "
+            "industry is set on its page) waits for the Learning Outcomes."
+        )
+        cp_combine = st.checkbox(
+            "Request About, What You'll Learn and Background A/B together in one AI call",
+            value=False,
+            key="cd_cp_combine",
+            help="Faster: one round-trip for all four sections. Sections that fail their "
+                 "length/format rules are regenerated individually.",
+        )
+        if st.button("Generate Entire CP", type="primary", use_container_width=True, key="cd_generate_cp"):
+            cp_nodes = build_cp_pipeline(st.session_state, combine_sections=cp_combine)
+            cp_status = st.empty()
+            cp_rows = {node.name: {"Section": node.label, "Status": "pending", "Time (s)": ""} for node in cp_nodes}
+
+            def _show_cp_progress(node_result) -> None:
+                cp_rows[node_result.name]["Status"] = node_result.status
+                if node_result.status in ("done", "failed"):
+                    cp_rows[node_result.name]["Time (s)"] = f"{node_result.seconds:.1f}"
+                cp_status.dataframe(list(cp_rows.values()), use_container_width=True, hide_index=True)
+
+            cp_started = time.monotonic()
+            with st.spinner(f"Generating {len(cp_nodes)} CP sections..."):
+                cp_results = run_pipeline(cp_nodes, st.session_state, on_update=_show_cp_progress)
+            cp_status.empty()
+            st.session_state["cp_pipeline_report"] = {
+                "wall": time.monotonic() - cp_started,
+                "critical_path": critical_path_seconds(cp_results),
+                "rows": [
+                    {
+                        "Section": r.label,
+                        "Status": r.status,
+                        "Started (s)": f"{r.started_at:.1f}",
+                        "Time (s)": f"{r.seconds:.1f}",
+                        "Error": r.error,
+                    }
+                    for r in cp_results.values()
+                ],
+            }
+
+        cp_report = st.session_state.get("cp_pipeline_report")
+        if cp_report:
+            failed = [row["Section"] for row in cp_report["rows"] if row["Status"] != "done"]
+            if failed:
+                st.warning("Not generated: " + ", ".join(failed))
+            else:
+                st.success("All CP sections generated. Open each page to review the results.")
+            st.caption(
+                f"Completed in {cp_report['wall']:.1f}s "
+                f"(longest dependency chain: {cp_report['critical_path']:.1f}s)"
+            )
+            st.dataframe(cp_report["rows"], use_container_width=True, hide_index=True)
+
 
 # ============================================================
 # PAGE: About This Course
@@ -743,15 +1051,17 @@ elif active_page == "About This Course":
         if not has_course_details:
             st.warning("Please enter course details first on the **Course Details** page.")
         else:
-            with st.spinner("Generating description..."):
-                try:
-                    result = generate_about_course(
-                        saved_title, saved_topics,
-                        prompt_template=st.session_state.get("about_prompt"),
-                    )
-                    st.session_state["about_course_text"] = result
-                except Exception as e:
-                    st.error(f"Failed to generate text: {e}")
+            _start_job(
+                "about_course_text",
+                "Generating description",
+                "Failed to generate text",
+                generate_about_course,
+                saved_title, saved_topics,
+                prompt_template=st.session_state.get("about_prompt"),
+                bypass_cache=regenerate_clicked,
+            )
+
+    _show_job("about_course_text")
 
     # --- Display Result ---
     if st.session_state.get("about_course_text"):
@@ -806,15 +1116,17 @@ elif active_page == "What You'll Learn":
         if not has_course_details:
             st.warning("Please enter course details first on the **Course Details** page.")
         else:
-            with st.spinner("Generating learning outcomes..."):
-                try:
-                    result = generate_what_youll_learn(
-                        saved_title, saved_topics,
-                        prompt_template=st.session_state.get("wyl_prompt"),
-                    )
-                    st.session_state["wyl_text"] = result
-                except Exception as e:
-                    st.error(f"Failed to generate text: {e}")
+            _start_job(
+                "wyl_text",
+                "Generating learning outcomes",
+                "Failed to generate text",
+                generate_what_youll_learn,
+                saved_title, saved_topics,
+                prompt_template=st.session_state.get("wyl_prompt"),
+                bypass_cache=wyl_regenerate,
+            )
+
+    _show_job("wyl_text")
 
     # --- Display Result ---
     if st.session_state.get("wyl_text"):
@@ -869,15 +1181,17 @@ elif active_page == "Background Part A":
         if not has_course_details:
             st.warning("Please enter course details first on the **Course Details** page.")
         else:
-            with st.spinner("Generating background section..."):
-                try:
-                    result = generate_background_part_a(
-                        saved_title, saved_topics,
-                        prompt_template=st.session_state.get("bg_prompt"),
-                    )
-                    st.session_state["bg_text"] = result
-                except Exception as e:
-                    st.error(f"Failed to generate text: {e}")
+            _start_job(
+                "bg_text",
+                "Generating background section",
+                "Failed to generate text",
+                generate_background_part_a,
+                saved_title, saved_topics,
+                prompt_template=st.session_state.get("bg_prompt"),
+                bypass_cache=bg_regenerate,
+            )
+
+    _show_job("bg_text")
 
     # --- Display Result ---
     if st.session_state.get("bg_text"):
@@ -932,15 +1246,17 @@ elif active_page == "Background Part B":
         if not has_course_details:
             st.warning("Please enter course details first on the **Course Details** page.")
         else:
-            with st.spinner("Generating performance gaps section..."):
-                try:
-                    result = generate_background_part_b(
-                        saved_title, saved_topics,
-                        prompt_template=st.session_state.get("bgb_prompt"),
-                    )
-                    st.session_state["bgb_text"] = result
-                except Exception as e:
-                    st.error(f"Failed to generate text: {e}")
+            _start_job(
+                "bgb_text",
+                "Generating performance gaps section",
+                "Failed to generate text",
+                generate_background_part_b,
+                saved_title, saved_topics,
+                prompt_template=st.session_state.get("bgb_prompt"),
+                bypass_cache=bgb_regenerate,
+            )
+
+    _show_job("bgb_text")
 
     # --- Display Result ---
     if st.session_state.get("bgb_text"):
@@ -995,15 +1311,17 @@ elif active_page == "Learning Outcomes":
         if not has_course_details:
             st.warning("Please enter course details first on the **Course Details** page.")
         else:
-            with st.spinner("Generating learning outcomes..."):
-                try:
-                    result = generate_learning_outcomes(
-                        saved_title, saved_topics,
-                        prompt_template=st.session_state.get("lo_prompt"),
-                    )
-                    st.session_state["lo_text"] = result
-                except Exception as e:
-                    st.error(f"Failed to generate text: {e}")
+            _start_job(
+                "lo_text",
+                "Generating learning outcomes",
+                "Failed to generate text",
+                generate_learning_outcomes,
+                saved_title, saved_topics,
+                prompt_template=st.session_state.get("lo_prompt"),
+                bypass_cache=lo_regenerate,
+            )
+
+    _show_job("lo_text")
 
     # --- Display Result ---
     if st.session_state.get("lo_text"):
@@ -1062,18 +1380,17 @@ elif active_page == "Instructional Methods":
         if not has_course_details or not saved_im:
             st.warning("Please enter course details and select instruction methods first.")
         else:
-            results = {}
-            for method in saved_im:
-                with st.spinner(f"Generating for {method}..."):
-                    try:
-                        result = generate_instruction_method(
-                            saved_title, saved_topics, method,
-                            prompt_template=st.session_state.get("im_prompt"),
-                        )
-                        results[method] = result
-                    except Exception as e:
-                        results[method] = f"Error: {e}"
-            st.session_state["im_results"] = results
+            _start_batch_job(
+                "im_results",
+                f"Generating {len(saved_im)} instructional method(s)",
+                "Failed to generate instructional methods",
+                generate_instruction_methods,
+                saved_title, saved_topics, saved_im,
+                prompt_template=st.session_state.get("im_prompt"),
+                bypass_cache=im_regenerate,
+            )
+
+    _show_job("im_results", render=_show_batch_preview)
 
     # --- Display Results ---
     if st.session_state.get("im_results"):
@@ -1139,19 +1456,18 @@ elif active_page == "Assessment Methods":
             import math
             am_total_hours = st.session_state.get("saved_course_duration", 8)
             am_num_days = max(1, math.ceil(am_total_hours / 8))
-            results = {}
-            for method in saved_am:
-                with st.spinner(f"Generating for {method}..."):
-                    try:
-                        result = generate_assessment_method(
-                            saved_title, saved_topics, method,
-                            prompt_template=st.session_state.get("am_prompt"),
-                            num_days=am_num_days,
-                        )
-                        results[method] = result
-                    except Exception as e:
-                        results[method] = f"Error: {e}"
-            st.session_state["am_results"] = results
+            _start_batch_job(
+                "am_results",
+                f"Generating {len(saved_am)} assessment method(s)",
+                "Failed to generate assessment methods",
+                generate_assessment_methods,
+                saved_title, saved_topics, saved_am,
+                prompt_template=st.session_state.get("am_prompt"),
+                bypass_cache=am_regenerate,
+                num_days=am_num_days,
+            )
+
+    _show_job("am_results", render=_show_batch_preview)
 
     # --- Display Results ---
     if st.session_state.get("am_results"):
@@ -1215,16 +1531,18 @@ elif active_page == "Min Entry Requirements":
         if not has_course_details:
             st.warning("Please enter course details first on the **Course Details** page.")
         else:
-            with st.spinner("Generating entry requirements..."):
-                try:
-                    result = generate_minimum_entry_requirement(
-                        saved_title, saved_topics,
-                        prompt_template=st.session_state.get("mer_prompt"),
-                        special_requirements=mer_special_req,
-                    )
-                    st.session_state["mer_text"] = result
-                except Exception as e:
-                    st.error(f"Failed to generate text: {e}")
+            _start_job(
+                "mer_text",
+                "Generating entry requirements",
+                "Failed to generate text",
+                generate_minimum_entry_requirement,
+                saved_title, saved_topics,
+                prompt_template=st.session_state.get("mer_prompt"),
+                special_requirements=mer_special_req,
+                bypass_cache=mer_regenerate,
+            )
+
+    _show_job("mer_text")
 
     # --- Display Result ---
     if st.session_state.get("mer_text"):
@@ -1279,15 +1597,17 @@ elif active_page == "Job Roles":
         if not has_course_details:
             st.warning("Please enter course details first on the **Course Details** page.")
         else:
-            with st.spinner("Generating job roles..."):
-                try:
-                    result = generate_job_roles(
-                        saved_title, saved_topics,
-                        prompt_template=st.session_state.get("jr_prompt"),
-                    )
-                    st.session_state["jr_text"] = result
-                except Exception as e:
-                    st.error(f"Failed to generate text: {e}")
+            _start_job(
+                "jr_text",
+                "Generating job roles",
+                "Failed to generate text",
+                generate_job_roles,
+                saved_title, saved_topics,
+                prompt_template=st.session_state.get("jr_prompt"),
+                bypass_cache=jr_regenerate,
+            )
+
+    _show_job("jr_text")
 
     # --- Display Result ---
     if st.session_state.get("jr_text"):
@@ -1353,18 +1673,20 @@ elif active_page == "Course Outline":
             duration_per_topic = saved_duration * 60 / saved_num_topics
             saved_im = st.session_state.get("saved_instr_methods", [])
 
-            with st.spinner("Generating course outline..."):
-                try:
-                    result = generate_course_outline(
-                        saved_title,
-                        saved_topics,
-                        ", ".join(saved_im),
-                        f"{duration_per_topic:.0f}",
-                        prompt_template=st.session_state.get("co_prompt"),
-                    )
-                    st.session_state["co_text"] = result
-                except Exception as e:
-                    st.error(f"Failed to generate course outline: {e}")
+            _start_job(
+                "co_text",
+                "Generating course outline",
+                "Failed to generate course outline",
+                generate_course_outline,
+                saved_title,
+                saved_topics,
+                ", ".join(saved_im),
+                f"{duration_per_topic:.0f}",
+                prompt_template=st.session_state.get("co_prompt"),
+                bypass_cache=co_regenerate_clicked,
+            )
+
+    _show_job("co_text")
 
     # --- Display Result ---
     if st.session_state.get("co_text"):
@@ -1524,65 +1846,76 @@ elif active_page == "Lesson Plan":
             key="lp_regen",
         )
 
-    # --- Build schedule & generate documents ---
+    # --- Collect course details ---
+    lp_duration = st.session_state.get("saved_course_duration", 16)
+    lp_instr_hrs = st.session_state.get("saved_instructional_duration", 14)
+    lp_assess_hrs = st.session_state.get("saved_assessment_duration", 2)
+    lp_im = st.session_state.get("saved_instr_methods", [])
+    lp_am = st.session_state.get("saved_assess_methods", [])
+
+    # --- AI generation first ---
     if lp_generate or lp_regenerate:
         if not has_course_details:
             st.warning("Please enter course details first on the **Course Details** page.")
         else:
-            # --- Collect course details ---
-            lp_duration = st.session_state.get("saved_course_duration", 16)
-            lp_instr_hrs = st.session_state.get("saved_instructional_duration", 14)
-            lp_assess_hrs = st.session_state.get("saved_assessment_duration", 2)
-            lp_num_topics = st.session_state.get("saved_num_topics", 4)
-            lp_im = st.session_state.get("saved_instr_methods", [])
-            lp_am = st.session_state.get("saved_assess_methods", [])
-
-            # --- AI generation first ---
-            with st.spinner("Generating lesson plan with AI..."):
-                try:
-                    result = generate_lesson_plan_content(
-                        course_title=saved_title,
-                        course_topics=saved_topics,
-                        course_duration=lp_duration,
-                        instructional_duration=lp_instr_hrs,
-                        assessment_duration=lp_assess_hrs,
-                        instructional_methods=lp_im,
-                        assessment_methods=lp_am,
-                        prompt_template=st.session_state.get("lp_prompt"),
-                    )
-                    st.session_state["lp_text"] = result
-                except Exception as e:
-                    st.error(f"Failed to generate AI lesson plan: {e}")
+            _start_job(
+                "lp_text",
+                "Generating lesson plan",
+                "Failed to generate AI lesson plan",
+                generate_lesson_plan_content,
+                course_title=saved_title,
+                course_topics=saved_topics,
+                course_duration=lp_duration,
+                instructional_duration=lp_instr_hrs,
+                assessment_duration=lp_assess_hrs,
+                instructional_methods=lp_im,
+                assessment_methods=lp_am,
+                prompt_template=st.session_state.get("lp_prompt"),
+                bypass_cache=lp_regenerate,
+                on_done=_lesson_plan_generated,
+            )
 
-            # --- Parse AI output into schedule for documents ---
-            if st.session_state.get("lp_text"):
-                schedule = parse_ai_lesson_plan(st.session_state["lp_text"])
+    _show_job("lp_text", render=_show_lesson_plan_preview)
+
+    # --- Parse AI output into schedule & generate documents ---
+    if st.session_state.pop("lp_build_docs", False) and st.session_state.get("lp_text"):
+        lp_parser = LessonPlanParser()
+        lp_parser.feed(st.session_state["lp_text"])
+        lp_parser.close()
+        schedule = lp_parser.schedule
+        if lp_parser.malformed:
+            with st.expander(f"{len(lp_parser.malformed)} line(s) of the AI lesson plan were not understood"):
+                st.dataframe(
+                    [{"Line": m.line_no, "Text": m.text, "Problem": m.reason} for m in lp_parser.malformed],
+                    hide_index=True,
+                    use_container_width=True,
+                )
 
-                if schedule:
-                    with st.spinner("Generating lesson plan documents..."):
-                        try:
-                            with tempfile.TemporaryDirectory() as tmp_dir:
-                                docx_path = Path(tmp_dir) / "lesson_plan.docx"
-                                generate_lesson_plan_table(
-                                    saved_title, lp_duration, lp_instr_hrs, lp_assess_hrs,
-                                    schedule, docx_path,
-                                    instructional_methods=lp_im,
-                                )
-                                st.session_state["lp_docx_bytes"] = docx_path.read_bytes()
+        if schedule:
+            with st.spinner("Generating lesson plan documents..."):
+                try:
+                    with tempfile.TemporaryDirectory() as tmp_dir:
+                        docx_path = Path(tmp_dir) / "lesson_plan.docx"
+                        generate_lesson_plan_table(
+                            saved_title, lp_duration, lp_instr_hrs, lp_assess_hrs,
+                            schedule, docx_path,
+                            instructional_methods=lp_im,
+                        )
+                        st.session_state["lp_docx_bytes"] = docx_path.read_bytes()
 
-                                pdf_path = Path(tmp_dir) / "lesson_plan.pdf"
-                                generate_lesson_plan_pdf_table(
-                                    saved_title, lp_duration, lp_instr_hrs, lp_assess_hrs,
-                                    schedule, pdf_path,
-                                    instructional_methods=lp_im,
-                                )
-                                st.session_state["lp_pdf_bytes"] = pdf_path.read_bytes()
+                        pdf_path = Path(tmp_dir) / "lesson_plan.pdf"
+                        generate_lesson_plan_pdf_table(
+                            saved_title, lp_duration, lp_instr_hrs, lp_assess_hrs,
+                            schedule, pdf_path,
+                            instructional_methods=lp_im,
+                        )
+                        st.session_state["lp_pdf_bytes"] = pdf_path.read_bytes()
 
-                            st.session_state["lp_generated"] = True
-                        except Exception as e:
-                            st.error(f"Failed to generate documents: {e}")
-                else:
-                    st.warning("Could not parse the AI lesson plan into a schedule. Documents were not generated.")
+                    st.session_state["lp_generated"] = True
+                except Exception as e:
+                    st.error(f"Failed to generate documents: {e}")
+        else:
+            st.warning("Could not parse the AI lesson plan into a schedule. Documents were not generated.")
 
     # --- Downloads ---
     if st.session_state.get("lp_generated"):
@@ -1951,18 +2284,20 @@ elif active_page == "LU Sequencing Rationale":
         elif not lu_course_outline.strip():
             st.warning("Please enter the course outline.")
         else:
-            with st.spinner(f"Generating {sequencing_type} sequencing rationale..."):
-                try:
-                    result = generate_lu_sequencing_rationale(
-                        course=saved_title,
-                        learning_outcomes=lu_learning_outcomes,
-                        course_outline=lu_course_outline,
-                        sequencing_type=sequencing_type,
-                        prompt_template=st.session_state.get(f"lu_seq_prompt_{sequencing_type}"),
-                    )
-                    st.session_state["lu_seq_text"] = result
-                except Exception as e:
-                    st.error(f"Failed to generate rationale: {e}")
+            _start_job(
+                "lu_seq_text",
+                f"Generating {sequencing_type} sequencing rationale",
+                "Failed to generate rationale",
+                generate_lu_sequencing_rationale,
+                course=saved_title,
+                learning_outcomes=lu_learning_outcomes,
+                course_outline=lu_course_outline,
+                sequencing_type=sequencing_type,
+                prompt_template=st.session_state.get(f"lu_seq_prompt_{sequencing_type}"),
+                bypass_cache=lu_regenerate,
+            )
+
+    _show_job("lu_seq_text")
 
     # --- Display Result ---
     if st.session_state.get("lu_seq_text"):
@@ -1970,6 +2305,54 @@ elif active_page == "LU Sequencing Rationale":
         st.markdown(f"**Generated Rationale ({st.session_state.get('lu_seq_type', 'Step by Step')} Sequencing):**")
         st.code(st.session_state["lu_seq_text"], language=None, wrap_lines=True)
 
+    # --- All frameworks at once ---
+    st.divider()
+    st.markdown(
+        f"Or generate a rationale for all {len(LU_SEQUENCING_TYPES)} frameworks at once "
+        "(run in parallel; each appears as soon as it is ready)."
+    )
+    col_all, col_all_regen = st.columns([1, 1])
+    with col_all:
+        lu_generate_all = st.button(
+            "Generate All Frameworks",
+            use_container_width=True,
+            key="lu_seq_gen_all",
+        )
+    with col_all_regen:
+        lu_regenerate_all = st.button(
+            "Regenerate All Frameworks",
+            use_container_width=True,
+            key="lu_seq_regen_all",
+        )
+
+    if lu_generate_all or lu_regenerate_all:
+        if not has_course_details:
+            st.warning("Please enter course details first on the **Course Details** page.")
+        elif not lu_learning_outcomes.strip():
+            st.warning("Please enter the learning outcomes.")
+        elif not lu_course_outline.strip():
+            st.warning("Please enter the course outline.")
+        else:
+            _start_batch_job(
+                "lu_seq_all_results",
+                f"Generating {len(LU_SEQUENCING_TYPES)} sequencing rationales",
+                "Failed to generate sequencing rationales",
+                generate_lu_sequencing_rationales,
+                saved_title, lu_learning_outcomes, lu_course_outline,
+                prompt_templates={
+                    seq_type: st.session_state.get(f"lu_seq_prompt_{seq_type}")
+                    for seq_type in LU_SEQUENCING_TYPES
+                },
+                bypass_cache=lu_regenerate_all,
+            )
+
+    _show_job("lu_seq_all_results", render=_show_batch_preview)
+
+    if st.session_state.get("lu_seq_all_results"):
+        for seq_type, text in st.session_state["lu_seq_all_results"].items():
+            st.markdown(f"### {seq_type} Sequencing")
+            st.code(text, language=None, wrap_lines=True)
+
 # ============================================================
 # PAGE: Course Validation
 # ============================================================
@@ -2003,16 +2386,36 @@ elif active_page == "Course Validation":
         placeholder="Paste your learning outcomes here (e.g. from the Learning Outcomes page).",
     )
 
+    cv_parallel = st.checkbox(
+        "Write the 5 sets as parallel, independent requests (faster)",
+        value=st.session_state.get("cv_parallel", True),
+        help="Each set is generated separately from a different perspective, and "
+             "appears as soon as it is ready. Untick to ask for all five sets in one request.",
+        key="cv_parallel_input",
+    )
+    st.session_state["cv_parallel"] = cv_parallel
+
     # --- Editable prompt template ---
     with st.expander("Prompt Template", expanded=False):
-        cv_prompt = st.text_area(
-            "Edit the prompt template used for generation. "
-            "Use `{course}`, `{industry}`, and `{learning_outcomes}` as placeholders.",
-            value=st.session_state.get("cv_prompt", COURSE_VALIDATION_PROMPT_TEMPLATE),
-            height=300,
-            key="cv_prompt_input",
-        )
-        st.session_state["cv_prompt"] = cv_prompt
+        if cv_parallel:
+            cv_set_prompt = st.text_area(
+                "Edit the prompt template used for each set. "
+                "Use `{course}`, `{industry}`, `{learning_outcomes}`, `{set_number}`, "
+                "and `{perspective}` as placeholders.",
+                value=st.session_state.get("cv_set_prompt", COURSE_VALIDATION_SET_PROMPT_TEMPLATE),
+                height=300,
+                key="cv_set_prompt_input",
+            )
+            st.session_state["cv_set_prompt"] = cv_set_prompt
+        else:
+            cv_prompt = st.text_area(
+                "Edit the prompt template used for generation. "
+                "Use `{course}`, `{industry}`, and `{learning_outcomes}` as placeholders.",
+                value=st.session_state.get("cv_prompt", COURSE_VALIDATION_PROMPT_TEMPLATE),
+                height=300,
+                key="cv_prompt_input",
+            )
+            st.session_state["cv_prompt"] = cv_prompt
 
     # --- Generate Buttons ---
     col_gen, col_regen = st.columns([1, 1])
@@ -2039,20 +2442,190 @@ elif active_page == "Course Validation":
         elif not cv_learning_outcomes.strip():
             st.warning("Please enter the learning outcomes.")
         else:
-            with st.spinner("Generating course validation responses..."):
-                try:
-                    result = generate_course_validation(
-                        course=saved_title,
-                        industry=cv_industry,
-                        learning_outcomes=cv_learning_outcomes,
-                        prompt_template=st.session_state.get("cv_prompt"),
-                    )
-                    st.session_state["cv_text"] = result
-                except Exception as e:
-                    st.error(f"Failed to generate validation: {e}")
+            _start_job(
+                "cv_text",
+                "Generating course validation responses",
+                "Failed to generate validation",
+                generate_course_validation_sets if cv_parallel else generate_course_validation,
+                course=saved_title,
+                industry=cv_industry,
+                learning_outcomes=cv_learning_outcomes,
+                prompt_template=st.session_state.get("cv_set_prompt" if cv_parallel else "cv_prompt"),
+                bypass_cache=cv_regenerate,
+            )
+
+    _show_job("cv_text")
 
     # --- Display Result ---
     if st.session_state.get("cv_text"):
         st.divider()
         st.markdown("**Generated Course Validation Responses:**")
         st.code(st.session_state["cv_text"], language=None, wrap_lines=True)
+
+
+# ============================================================
+# PAGE: Performance
+# ============================================================
+elif active_page == "Performance":
+    st.header("Performance")
+    st.markdown(
+        "Latency of every AI generation call, per generator. Percentiles cover "
+        "calls answered by the model; cache hits are counted separately."
+    )
+
+    perf_window = st.selectbox(
+        "Time window",
+        ["Last hour", "Last 24 hours", "Last 7 days", "All recorded calls"],
+        index=1,
+        key="perf_window",
+    )
+    window_seconds = {"Last hour": 3600, "Last 24 hours": 86400, "Last 7 days": 7 * 86400}
+    since = time.time() - window_seconds[perf_window] if perf_window in window_seconds else 0.0
+
+    def _fmt_seconds(value):
+        return "—" if value is None else f"{value:.1f}s"
+
+    perf_summary = get_performance_summary(since)
+    if not perf_summary:
+        st.info("No generation calls recorded in this window yet.")
+    else:
+        st.dataframe(
+            [
+                {
+                    "Generator": row["generator"].removeprefix("generate_").replace("_", " ").title(),
+                    "Calls": row["calls"],
+                    "Cache hits": row["cache_hits"],
+                    "Errors": row["errors"],
+                    "Retries": row["retries"],
+                    "Hedged": row["hedged"],
+                    "De-duplicated": row["coalesced"],
+                    "Cancelled": row["cancelled"],
+                    "Failed fast (backend down)": row["unavailable"],
+                    "Reused (normalised input)": row["normalised"],
+                    "p50 latency": _fmt_seconds(row["p50_latency"]),
+                    "p95 latency": _fmt_seconds(row["p95_latency"]),
+                    "p50 first token": _fmt_seconds(row["p50_ttft"]),
+                    "p95 first token": _fmt_seconds(row["p95_ttft"]),
+                    "p50 queue wait": _fmt_seconds(row["p50_queue_wait"]),
+                    "p95 queue wait": _fmt_seconds(row["p95_queue_wait"]),
+                }
+                for row in perf_summary
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    retry_policy = get_retry_policy()
+    hedge_help = (
+        "When a generation runs past its generator's p95 latency, send the same prompt "
+        "on a second session and use whichever answers first. Uses extra Claude quota."
+    )
+    if _ADMIN_CONTROLS:
+        retry_policy.hedge = st.toggle(
+            "Hedge slow requests (all users)",
+            value=retry_policy.hedge,
+            key="perf_hedge",
+            help=hedge_help,
+        )
+    else:
+        st.caption(
+            f"Hedging slow requests: {'on' if retry_policy.hedge else 'off'} "
+            "(set with `CP_HEDGE_REQUESTS`).",
+            help=hedge_help,
+        )
+    st.caption(
+        f"Failed calls are retried up to {retry_policy.max_attempts} times with jittered "
+        f"backoff, each attempt limited to {retry_policy.attempt_timeout:.0f}s and the whole "
+        f"call to {retry_policy.deadline:.0f}s."
+    )
+    health = get_backend_health()
+    st.caption(
+        f"Backend health: {health['state']} · {health['opened']} outage(s) detected · "
+        f"{health['fast_failed']} requests failed fast · {health['probes']} health checks"
+    )
+
+    queue_status = get_queue_status()
+    col_slots, col_queue = st.columns([1, 2])
+    with col_slots:
+        if _ADMIN_CONTROLS:
+            max_in_flight = st.number_input(
+                "Max concurrent AI requests (all users)",
+                min_value=1,
+                max_value=16,
+                value=queue_status["max_in_flight"],
+                key="perf_max_in_flight",
+                help="Requests beyond this wait in a fair queue; single sections go ahead of bulk jobs.",
+            )
+            if max_in_flight != queue_status["max_in_flight"]:
+                set_max_in_flight(int(max_in_flight))
+        else:
+            st.metric("Max concurrent AI requests (all users)", queue_status["max_in_flight"])
+            st.caption("Set with `CP_MAX_IN_FLIGHT`.")
+    with col_queue:
+        avg_service = queue_status["avg_service_seconds"]
+        st.markdown("**AI request queue**")
+        st.caption(
+            f"{queue_status['in_flight']} running · {queue_status['waiting']} waiting · "
+            f"{queue_status['admitted']} admitted since start (peak queue "
+            f"{queue_status['max_waiting_seen']})"
+            + (f" · avg {avg_service:.1f}s per request" if avg_service is not None else "")
+        )
+        for entry in queue_status["by_owner"]:
+            st.caption(f"Session …{entry['owner'][-6:]}: {entry['waiting']} {entry['priority']} waiting")
+
+    cache_stats = get_cache_stats()
+    outline_stats = get_outline_compaction_stats()
+    col_cache, col_outline = st.columns(2)
+    flight_stats = get_single_flight_stats()
+    with col_cache:
+        st.markdown("**Response cache (since server start)**")
+        st.caption(
+            f"{cache_stats['hits']} hits, {cache_stats['misses']} misses · "
+            f"{cache_stats['entries']} entries ({cache_stats['bytes'] / 1024:.0f} KB) on disk"
+        )
+        st.caption(
+            f"{flight_stats['coalesced']} duplicate requests shared an identical in-flight call "
+            f"({flight_stats['leaders']} calls made)"
+        )
+        normalised = sum(row["normalised"] for row in perf_summary)
+        if normalised:
+            st.caption(
+                f"{normalised} generations avoided because the course title/topics matched an "
+                "earlier course once spacing, casing, numbering and bullet order were normalised"
+            )
+    with col_outline:
+        st.markdown("**Course outline length budget (since server start)**")
+        st.caption(
+            f"{outline_stats['outlines']} outlines · {outline_stats['compacted_locally']} compacted "
+            f"locally · {outline_stats['condense_calls']} AI condense calls"
+        )
+        contract_stats = get_contract_stats()
+        st.markdown("**Output rule checks (since server start)**")
+        st.caption(
+            f"{contract_stats['checked']} outputs checked · {contract_stats['passed']} passed · "
+            f"{contract_stats['fixed_locally']} fixed locally · {contract_stats['repaired']} repaired "
+            f"with {contract_stats['repair_calls']} targeted AI calls · "
+            f"{contract_stats['still_failing']} still failing"
+        )
+    prefetch_stats = get_prefetch_stats()
+    if prefetch_stats["started"]:
+        st.caption(
+            f"Section prefetch: {prefetch_stats['completed']} of {prefetch_stats['started']} ready · "
+            f"{prefetch_stats['cancelled']} cancelled after course details changed · "
+            f"{prefetch_stats['failed']} failed"
+        )
+
+    recent_errors = get_recent_calls(limit=20, errors_only=True)
+    with st.expander(f"Recent errors ({len(recent_errors)})", expanded=False):
+        if not recent_errors:
+            st.caption("No failed generation calls recorded.")
+        for call in recent_errors:
+            st.markdown(
+                f"**{call['generator']}** · {call['template']} · "
+                f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(call['started_at']))}"
+            )
+            st.code(call["error"], language=None)
+
+    if st.button("Clear recorded calls", key="perf_clear"):
+        clear_telemetry()
+        st.rerun()
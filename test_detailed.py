@@ -14,10 +14,11 @@ print("Testing AI generation with detailed error output...")
 print("=" * 60)
 
 try:
-    from app.ai_generator import _generate, _CLAUDE_CLI_PATH
+    from app.ai_generator import _generate, get_claude_cli_path
 
-    print(f"Claude CLI Path: {_CLAUDE_CLI_PATH}")
-    print(f"Path exists: {os.path.exists(_CLAUDE_CLI_PATH) if _CLAUDE_CLI_PATH else False}")
+    cli_path = get_claude_cli_path()
+    print(f"Claude CLI Path: {cli_path}")
+    print(f"Path exists: {os.path.exists(cli_path) if cli_path else False}")
     print()
 
     # Test with a simple prompt
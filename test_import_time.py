@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Check that the AI modules stay cheap to import (app cold start).
+
+Each module is imported in a fresh interpreter with ``-X importtime``; the
+median cumulative time over a few runs must stay within its budget, and the
+Claude Agent SDK must not be imported until the first generation.
+"""
+
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+BUDGETS = {                    # seconds, cumulative import time
+    "app.ai_generator": 0.5,
+    "app.pipeline": 0.5,
+}
+DEFERRED_MODULES = ["claude_agent_sdk"]
+
+
+def import_time(module: str) -> tuple[float, list[tuple[float, str]], list[str]]:
+    """Return (cumulative seconds, slowest imports, deferred modules loaded) for one cold import."""
+    check = f"import sys, {module}; print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check],
+        capture_output=True, text=True, check=True,
+    )
+    total = 0.0
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue          # header row
+        seconds = int(cumulative) / 1_000_000
+        imports.append((seconds, name.strip()))
+        if name.strip() == module:
+            total = seconds
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return total, sorted(imports, reverse=True)[:5], loaded
+
+
+print("Measuring cold import time...")
+print("=" * 60)
+
+failed = False
+for module, budget in BUDGETS.items():
+    runs = [import_time(module) for _ in range(RUNS)]
+    median = statistics.median(seconds for seconds, _, _ in runs)
+    loaded = runs[-1][2]
+    status = "OK" if median <= budget and not loaded else "FAIL"
+    failed |= status == "FAIL"
+    print(f"{status:<5} {module}: {median * 1000:.0f} ms (budget {budget * 1000:.0f} ms)")
+    for seconds, name in runs[-1][1]:
+        print(f"        {seconds * 1000:7.0f} ms  {name}")
+    if loaded:
+        print(f"        imported at start-up but should be deferred: {', '.join(loaded)}")
+
+print("=" * 60)
+if failed:
+    print("ERROR: import-time budget exceeded")
+    sys.exit(1)
+print("SUCCESS: all modules within their import-time budget")
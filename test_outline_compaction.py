@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Check that local course outline compaction never cuts a description mid-phrase.
+
+A compacted description must be the description's first sentence, or that
+sentence cut at a clause boundary (``,`` / ``;``); one that cannot be
+shortened that way is left as it was, for the LLM condense step.  Topic
+and method names, including ones that contain " - ", are never changed.
+"""
+
+import re
+import sys
+
+from app.outline_compaction import MIN_DESCRIPTION_WORDS, compact_course_outline
+
+LONG_CLAUSES = (
+    "covers budgeting for small teams, forecasting cash flow over several quarters, "
+    "reporting variances to senior management; and reviewing controls with auditors"
+)
+NO_CLAUSES = "This topic covers a great many things in considerable detail across several workplace scenarios"
+
+outline = "\n".join(
+    ["(1) The list of topics covered in this course"]
+    + [f"T{i}: Topic {i} - This topic {LONG_CLAUSES}. A second sentence that is dropped first." for i in range(1, 9)]
+    + [f"T{i}: Topic {i} - {NO_CLAUSES}." for i in range(9, 12)]
+    + [f"T12: Pre - Assessment Planning vs. Review - This topic {LONG_CLAUSES}. A second sentence."]
+    + ["", "(2) Instructional methods",
+       f"Lecture - The trainer {LONG_CLAUSES}.",
+       f"Case Study - {NO_CLAUSES}.",
+       "", "(3) Duration for each topic"]
+    + [f"Topic {i}: 60mins" for i in range(1, 13)]
+)
+# Split at the last " - ": names may contain one, descriptions here do not.
+originals = dict(re.findall(r"^(.+) - (.+)$", outline, re.MULTILINE))
+
+
+def allowed_cuts(desc: str) -> set[str]:
+    sentence = re.split(r"(?<=[.!?])\s+", desc, maxsplit=1)[0]
+    cuts = {sentence}
+    for match in re.finditer(r"\s*[,;]\s+", sentence):
+        head = sentence[:match.start()]
+        if len(head.split()) >= MIN_DESCRIPTION_WORDS:
+            cuts.add(head + ".")
+    return cuts
+
+
+print("Checking compacted outline descriptions...")
+print("=" * 60)
+failed = []
+for limit in (2000, 1500, 1000):
+    compacted = compact_course_outline(outline, char_limit=limit)
+    for head, desc in re.findall(r"^(.+) - (.+)$", compacted, re.MULTILINE):
+        if head not in originals:
+            failed.append(f"{limit}: name changed: {head} - {desc}")
+        elif desc not in allowed_cuts(originals[head]):
+            failed.append(f"{limit}: {head} - {desc}")
+    print(f"limit {limit}: {len(outline)} -> {len(compacted)} chars")
+
+print("=" * 60)
+if failed:
+    print("ERROR: names changed or descriptions cut mid-phrase:")
+    for line in failed:
+        print(f"  {line}")
+    sys.exit(1)
+print("SUCCESS: names kept and every description ends at a sentence or clause boundary")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Check that "Generate Entire CP" honours prompt templates edited in the session.
+
+The pipeline nodes run on worker threads, where Streamlit's session state is
+an empty stand-in; the session here behaves the same way, so a template that
+is only read lazily by a node falls back to the default and the check fails.
+Runs offline against the fixture backend.
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+from app import ai_generator as ai
+from app.backends import FixtureBackend
+from app.pipeline import build_cp_pipeline, run_pipeline
+from app.response_cache import ResponseCache
+from app.telemetry import TelemetryStore
+
+
+class ThreadBoundSession(dict):
+    """Session state that, like Streamlit's, is empty off the script thread."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._owner = threading.current_thread()
+
+    def get(self, key, default=None):
+        if threading.current_thread() is not self._owner:
+            return default
+        return super().get(key, default)
+
+
+class RecordingBackend(FixtureBackend):
+    def __init__(self) -> None:
+        super().__init__(latency=0, ttft=0)
+        self.prompts: list[str] = []
+
+    async def generate(self, prompt, on_text=None, template=""):
+        self.prompts.append(prompt)
+        return await super().generate(prompt, on_text, template)
+
+
+CUSTOM_TEMPLATES = {
+    "about_prompt": "EDITED-ABOUT {course_title} {course_topics}",
+    "co_prompt": "EDITED-OUTLINE {course_title} {course_topics} {instructional_methods} {duration_per_topic}",
+    "im_prompt": "EDITED-IM {course_title} {course_topics} {method_name}",
+    "cv_set_prompt": "EDITED-CV-SET {course} {industry} {learning_outcomes} {set_number} {perspective}",
+}
+
+session = ThreadBoundSession(
+    saved_course_title="Pipeline Template Check",
+    saved_course_topics="T1: Basics\nT2: Practice",
+    saved_instr_methods=["Lecture"],
+    saved_assess_methods=[],
+    saved_course_duration=8,
+    saved_num_topics=2,
+    cv_industry="Retail",
+    cv_parallel=True,
+    **CUSTOM_TEMPLATES,
+)
+
+backend = RecordingBackend()
+with tempfile.TemporaryDirectory() as tmp:
+    # Fresh stores, so every prompt reaches the backend and none is kept.
+    ai._RESPONSE_CACHE = ResponseCache(Path(tmp) / "cache.db")
+    ai._TELEMETRY = TelemetryStore(Path(tmp) / "telemetry.db")
+    previous = ai.set_backend(backend)
+    try:
+        nodes = build_cp_pipeline(session)
+        results = run_pipeline(nodes, session)
+    finally:
+        ai.set_backend(previous)
+
+print("Checking edited templates reach the generators...")
+print("=" * 60)
+failed = [name for name, result in results.items() if result.status != "done"]
+for key, template in CUSTOM_TEMPLATES.items():
+    marker = template.split()[0]
+    used = any(prompt.startswith(marker) for prompt in backend.prompts)
+    print(f"{'OK' if used else 'FAIL':<5} {key}")
+    if not used:
+        failed.append(key)
+
+print("=" * 60)
+if failed:
+    print(f"ERROR: {', '.join(failed)}")
+    sys.exit(1)
+print("SUCCESS: the pipeline used every edited template")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Check single-flight followers' streams and queue priority.
+
+A leader streams deltas while two followers with the same key wait on it;
+one follower is cancelled mid-stream.  The cancelled follower's callback
+(e.g. a Streamlit placeholder that no longer exists) must get nothing
+after its cancellation, while the other follower still receives every delta
+and the result.  When the leader itself is cancelled, the follower that
+takes over must not show the leader's text twice, and an interactive
+follower must lift a bulk call still waiting for a scheduler slot.
+"""
+
+import asyncio
+import sys
+
+from app import scheduler
+from app.resilience import RESTART
+from app.single_flight import SingleFlight
+
+CHUNKS = [f"chunk {i} " for i in range(10)]
+
+
+async def leader_call(publish) -> str:
+    for chunk in CHUNKS:
+        publish(chunk)
+        await asyncio.sleep(0.02)
+    return "".join(CHUNKS)
+
+
+async def main() -> tuple[list[str], int]:
+    flight = SingleFlight()
+    received: dict[str, list[str]] = {"leader": [], "kept": [], "cancelled": []}
+
+    leader = asyncio.create_task(flight.run("key", leader_call, received["leader"].append))
+    await asyncio.sleep(0.01)
+    kept = asyncio.create_task(flight.run("key", leader_call, received["kept"].append))
+    cancelled = asyncio.create_task(flight.run("key", leader_call, received["cancelled"].append))
+    await asyncio.sleep(0.07)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    seen_at_cancel = len(received["cancelled"])
+    (text, _), (kept_text, shared) = await asyncio.gather(leader, kept)
+
+    failures = []
+    if not cancelled.cancelled():
+        failures.append("the follower task was not cancelled")
+    if len(received["cancelled"]) != seen_at_cancel:
+        failures.append(
+            f"cancelled follower got {len(received['cancelled']) - seen_at_cancel} deltas after cancellation"
+        )
+    if "".join(received["kept"]) != text or kept_text != text or not shared:
+        failures.append("the remaining follower missed deltas or the shared result")
+    if flight.stats()["in_flight"]:
+        failures.append("the flight was not cleaned up")
+    return failures, seen_at_cancel
+
+
+class Preview:
+    """A stream consumer that, like the job and Streamlit previews, honours RESTART."""
+
+    def __init__(self) -> None:
+        self.chunks: list[str] = []
+
+    def __call__(self, text: str) -> None:
+        if text is RESTART:
+            self.chunks.clear()
+        else:
+            self.chunks.append(text)
+
+
+async def takeover() -> list[str]:
+    flight = SingleFlight()
+    preview = Preview()
+
+    async def follower_call(publish) -> str:
+        for chunk in ("own ", "text"):
+            publish(chunk)
+        return "own text"
+
+    leader = asyncio.create_task(flight.run("key", leader_call))
+    await asyncio.sleep(0.05)
+    follower = asyncio.create_task(flight.run("key", follower_call, preview))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    text, shared = await follower
+    if shared or text != "own text":
+        return ["the follower did not make the call itself after the leader was cancelled"]
+    if "".join(preview.chunks) != text:
+        return [f"the follower's preview shows {''.join(preview.chunks)!r}, not its own result"]
+    return []
+
+
+async def promotion() -> list[str]:
+    queue = scheduler.GenerationScheduler(max_in_flight=1)
+    admitted: list[str] = []
+    busy = await queue.acquire("someone")
+
+    async def call(name: str, owner: str, priority: int, key: str | None = None) -> None:
+        async with queue.slot(owner, priority, key=key):
+            admitted.append(name)
+
+    waiting = [
+        asyncio.create_task(call("other bulk", "b", scheduler.BULK)),
+        asyncio.create_task(call("prefetch", "a", scheduler.BULK, key="about")),
+        asyncio.create_task(call("interactive", "c", scheduler.INTERACTIVE)),
+    ]
+    await asyncio.sleep(0)
+    queue.promote("about", "d", scheduler.INTERACTIVE)   # an interactive follower joins
+    queue.release(busy)
+    await asyncio.gather(*waiting)
+    if admitted != ["interactive", "prefetch", "other bulk"]:
+        return [f"admission order after promotion was {admitted}"]
+    return []
+
+
+print("Checking single-flight follower cancellation...")
+print("=" * 60)
+failures, seen_at_cancel = asyncio.run(main())
+print(f"{len(CHUNKS)} deltas streamed; one follower cancelled after {seen_at_cancel}")
+failures += asyncio.run(takeover())
+print("leader cancelled mid-stream; the follower re-ran the call")
+failures += asyncio.run(promotion())
+print("queued bulk call promoted by an interactive follower")
+print("=" * 60)
+if failures:
+    print("ERROR: " + "; ".join(failures))
+    sys.exit(1)
+print("SUCCESS: followers see only their own stream, at their own priority")